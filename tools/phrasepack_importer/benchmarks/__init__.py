@@ -0,0 +1 @@
+"""Benchmarks for the normalization and phrasepack assembly hot path."""
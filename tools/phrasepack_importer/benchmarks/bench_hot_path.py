@@ -0,0 +1,20 @@
+"""pytest-benchmark entry point (not collected by the default test run).
+
+    pytest benchmarks/bench_hot_path.py --benchmark-autosave
+    pytest benchmarks/bench_hot_path.py --benchmark-compare
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from .run import cases
+from .synthetic import make_items
+
+SIZE = 10_000
+_CASES = cases(make_items(SIZE))
+
+
+@pytest.mark.parametrize("name", list(_CASES))
+def test_hot_path(benchmark, name):
+    benchmark.extra_info["items"] = SIZE
+    benchmark(_CASES[name])
@@ -0,0 +1,72 @@
+"""Frozen copy of the original multi-pass normalizers.
+
+Kept as the oracle for the differential tests and as the "before" side of the
+normalizer benchmarks. Do not optimize this file.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+
+_PUNCT_TRANSLATION = str.maketrans(
+    {
+        "“": '"',
+        "”": '"',
+        "„": '"',
+        "’": "'",
+        "‘": "'",
+        "`": "'",
+        "–": "-",
+        "—": "-",
+        "…": "...",
+        "\u00a0": " ",
+    }
+)
+
+_SENTENCE_START_RE = re.compile(r"(^|[!?]\s+|\.\s+)([a-zåäö])")
+_OCR_APOSTROPHE_RE = re.compile(r"\b[iI][’'](?=[a-z])")
+_SENTENCE_PERIOD_RE = re.compile(r"\.(\s|$)")
+_LEADING_SRC_JUNK_RE = re.compile(r'^[\".]+\s*(?=[^\W\d_])')
+
+
+def normalize_text(value: str) -> str:
+    normalized = value.translate(_PUNCT_TRANSLATION)
+    normalized = re.sub(r"\s+", " ", normalized).strip()
+    return normalized
+
+
+def normalize_src_text(value: str) -> str:
+    normalized = normalize_text(value)
+    normalized = normalized.replace("*", "")
+    normalized = _OCR_APOSTROPHE_RE.sub("l'", normalized)
+    normalized = _LEADING_SRC_JUNK_RE.sub("", normalized)
+    if normalized.lower() == "si":
+        normalized = "s\u00ec"
+    return normalized
+
+
+def normalize_dst_text(value: str) -> str:
+    normalized = normalize_text(value)
+    normalized = normalized.replace("?; ", "? ").replace("!; ", "! ").replace(".; ", ". ")
+    normalized = re.sub(r";\s+(?=[a-zåäö])", ", ", normalized)
+    should_case = False
+    if "?" in normalized or "!" in normalized:
+        should_case = True
+    elif "." in normalized and _SENTENCE_PERIOD_RE.search(normalized):
+        should_case = True
+
+    if should_case:
+        normalized = _SENTENCE_START_RE.sub(
+            lambda match: f"{match.group(1)}{match.group(2).upper()}", normalized
+        )
+    return normalized
+
+
+def slugify(value: str) -> str:
+    normalized = normalize_text(value).lower()
+    normalized = normalized.replace("'", "")
+    normalized = unicodedata.normalize("NFKD", normalized)
+    normalized = normalized.encode("ascii", "ignore").decode("ascii")
+    normalized = re.sub(r"[^a-z0-9]+", "-", normalized)
+    normalized = normalized.strip("-")
+    return normalized or "item"
@@ -0,0 +1,200 @@
+"""Standalone benchmark runner: items/sec and peak memory per hot-path function.
+
+    python -m benchmarks.run --sizes 10000 100000 --save benchmarks/baselines/local.json
+    python -m benchmarks.run --sizes 10000 100000 --compare benchmarks/baselines/local.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from phrasepack_importer.normalize import (
+    IdAllocator,
+    ensure_unique_id,
+    normalize_dst_batch,
+    normalize_dst_text,
+    normalize_src_batch,
+    normalize_src_text,
+    slugify,
+    slugify_batch,
+    split_gendered_dst,
+    split_surface_and_lemmas,
+)
+from phrasepack_importer.phrasepack import build_phrasepack
+from phrasepack_importer.schema import (
+    ExtractedItem,
+    ExtractedPayload,
+    Phrasepack,
+    parse_extracted_json,
+    phrasepack_json,
+    serialize_phrasepack,
+)
+
+from . import reference_normalize as reference
+from .synthetic import make_colliding_items, make_items
+
+DEFAULT_SIZES = [10_000, 100_000]
+
+
+def _each(fn: Callable[[str], object], values: list[str]) -> Callable[[], object]:
+    return lambda: [fn(value) for value in values]
+
+
+def _unique_ids(slugs: list[str]) -> Callable[[], object]:
+    def run() -> set[str]:
+        seen: set[str] = set()
+        for slug in slugs:
+            ensure_unique_id(slug, seen)
+        return seen
+
+    return run
+
+
+def _allocate(slugs: list[str]) -> Callable[[], object]:
+    def run() -> set[str]:
+        ids = IdAllocator()
+        for slug in slugs:
+            ids.allocate(slug)
+        return ids.ids
+
+    return run
+
+
+def _build(items: list[ExtractedItem]) -> Callable[[], object]:
+    return lambda: build_phrasepack(
+        pack_id="bench", title="Bench", src_lang="it", dst_lang="fi", extracted_items=items
+    )
+
+
+def _reference_parse(raw: str) -> ExtractedPayload:
+    # The original two-pass parse: json.loads, then validate the dict.
+    return ExtractedPayload.model_validate(json.loads(raw))
+
+
+def _reference_serialize(phrasepack: Phrasepack) -> bytes:
+    # The original model_dump + json.dumps write path.
+    text = json.dumps(serialize_phrasepack(phrasepack), ensure_ascii=False, indent=2) + "\n"
+    return text.encode("utf-8")
+
+
+def cases(items: list[ExtractedItem]) -> dict[str, Callable[[], object]]:
+    """Benchmark name -> zero-argument callable processing all `items` once."""
+    surfaces = [item.resolved_surface() for item in items]
+    dsts = [item.dst or "" for item in items]
+    normalized = [normalize_src_text(surface) for surface in surfaces]
+    response = ExtractedPayload(items=items).model_dump_json(exclude_none=True)
+    phrasepack = build_phrasepack(
+        pack_id="bench", title="Bench", src_lang="it", dst_lang="fi", extracted_items=items
+    )
+    return {
+        "normalize_src_text": _each(normalize_src_text, surfaces),
+        "normalize_dst_text": _each(normalize_dst_text, dsts),
+        "split_surface_and_lemmas": _each(
+            lambda value: split_surface_and_lemmas(value, None), normalized
+        ),
+        "split_gendered_dst": _each(lambda value: split_gendered_dst(value, "fi", 2), dsts),
+        "slugify": _each(slugify, normalized),
+        "normalize_src_batch": lambda: normalize_src_batch(surfaces),
+        "normalize_dst_batch": lambda: normalize_dst_batch(dsts),
+        "slugify_batch": lambda: slugify_batch(normalized),
+        # The original multi-pass normalizers, for a same-run speedup figure.
+        "reference_normalize_src_text": _each(reference.normalize_src_text, surfaces),
+        "reference_normalize_dst_text": _each(reference.normalize_dst_text, dsts),
+        "reference_slugify": _each(reference.slugify, normalized),
+        # Like build_phrasepack, allocate ids only for distinct (src, dst) pairs.
+        "ensure_unique_id": _unique_ids(
+            [slugify(src) for src, _ in dict.fromkeys(zip(normalized, dsts))]
+        ),
+        "build_phrasepack": _build(items),
+        # Every item collides with thousands of others; must stay linear.
+        "allocate_ids_colliding": _allocate(
+            [slugify(item.resolved_surface()) for item in make_colliding_items(len(items))]
+        ),
+        "build_phrasepack_colliding": _build(make_colliding_items(len(items))),
+        # One model response / one written pack holding all items.
+        "parse_extracted_json": lambda: parse_extracted_json(response),
+        "reference_parse_extracted_json": lambda: _reference_parse(response),
+        "phrasepack_json": lambda: phrasepack_json(phrasepack),
+        "reference_serialize_phrasepack": lambda: _reference_serialize(phrasepack),
+    }
+
+
+def measure(fn: Callable[[], object], count: int, *, repeat: int = 3) -> dict[str, float]:
+    """Best-of-`repeat` throughput plus peak traced memory of one extra run."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "seconds": round(best, 6),
+        "items_per_sec": round(count / best, 1) if best else float("inf"),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run(sizes: list[int], *, repeat: int = 3, only: list[str] | None = None) -> dict:
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for size in sizes:
+        items = make_items(size)
+        results[str(size)] = {
+            name: measure(fn, size, repeat=repeat)
+            for name, fn in cases(items).items()
+            if not only or name in only
+        }
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def format_report(report: dict, baseline: dict | None = None) -> str:
+    lines = [f"{'size':>9}  {'case':<30}{'items/s':>14}{'peak KiB':>12}{'vs base':>10}"]
+    for size, by_case in report["results"].items():
+        for name, stats in by_case.items():
+            change = ""
+            base = (baseline or {}).get("results", {}).get(size, {}).get(name)
+            if base:
+                change = f"{stats['items_per_sec'] / base['items_per_sec']:.2f}x"
+            lines.append(
+                f"{size:>9}  {name:<30}{stats['items_per_sec']:>14,.0f}"
+                f"{stats['peak_kib']:>12,.0f}{change:>10}"
+            )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="Run only these cases.")
+    parser.add_argument("--save", help="Write results to this JSON baseline file.")
+    parser.add_argument("--compare", help="Show speed relative to this baseline file.")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, repeat=args.repeat, only=args.only)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print(format_report(report, baseline))
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Saved baseline: {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""CLI startup cost from `python -X importtime`, checked against a budget.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --top 20
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Generous for slow CI machines; the lazy imports keep it near 50 ms locally,
+# while an eager google.genai import alone costs about 500 ms.
+STARTUP_BUDGET_MS = 250
+
+# Must not be imported until a remote call or a parse actually needs them.
+HEAVY_MODULES = ("google.genai", "pydantic", "PIL")
+
+ENTRY_POINTS = {
+    "import": ["-c", "import phrasepack_importer.cli"],
+    "help": ["-m", "phrasepack_importer", "--help"],
+}
+
+
+def import_profile(args: list[str]) -> dict[str, int]:
+    """Module name -> cumulative import time in microseconds for one interpreter run."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def heavy_imports(profile: dict[str, int]) -> list[str]:
+    """The HEAVY_MODULES packages that were imported."""
+    return [
+        heavy
+        for heavy in HEAVY_MODULES
+        if any(name == heavy or name.startswith(f"{heavy}.") for name in profile)
+    ]
+
+
+def cli_import_ms(profile: dict[str, int]) -> float:
+    return profile.get("phrasepack_importer.cli", 0) / 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list.")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for label, entry in ENTRY_POINTS.items():
+        profile = import_profile(entry)
+        spent = cli_import_ms(profile)
+        heavy = heavy_imports(profile)
+        ok = ok and spent <= STARTUP_BUDGET_MS and not heavy
+        print(f"{label}: phrasepack_importer.cli {spent:.1f} ms (budget {STARTUP_BUDGET_MS} ms)")
+        if heavy:
+            print(f"  heavy modules loaded: {', '.join(heavy)}")
+        slowest = sorted(profile.items(), key=lambda entry: entry[1], reverse=True)[: args.top]
+        for name, cumulative in slowest:
+            print(f"  {cumulative / 1000:>8.1f} ms  {name}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""Synthetic extracted word lists with the noise real textbook pages produce."""
+from __future__ import annotations
+
+import random
+
+from phrasepack_importer.schema import ExtractedItem
+
+_STEMS = [
+    "cas", "amic", "alber", "ragazz", "bambin", "student", "profess", "gatt",
+    "cavall", "libr", "tavol", "cappell", "medic", "nipot", "figli", "zi",
+    "cugin", "vicin", "camerier", "cuoc", "sart", "maestr", "segretari", "nonn",
+]
+_FI_WORDS = [
+    "talo", "ystävä", "puu", "poika", "lapsi", "opiskelija", "opettaja", "kissa",
+    "hevonen", "kirja", "pöytä", "hattu", "lääkäri", "lapsenlapsi", "lapsi", "setä",
+    "serkku", "naapuri", "tarjoilija", "kokki", "räätäli", "opettaja", "sihteeri", "isovanhempi",
+]
+_NATIONALITIES = [
+    ("italiano", "italiana", "italialainen"),
+    ("francese", "francese", "ranskalainen"),
+    ("tedesco", "tedesca", "saksalainen"),
+    ("spagnolo", "spagnola", "espanjalainen"),
+    ("svedese", "svedese", "ruotsalainen"),
+]
+_VERBS = [("vado", "andare", "menen", "mennä"), ("faccio", "fare", "teen", "tehdä"),
+          ("sono", "essere", "olen", "olla"), ("ho", "avere", "minulla on", "olla jollakin")]
+_PHRASES = [
+    ("Come stai?", "mitä kuuluu?"),
+    ("Piacere!", "hauska tutustua!"),
+    ("a presto", "nähdään pian"),
+    ("di dove sei?", "mistä olet kotoisin?"),
+    ("buongiorno", "hyvää huomenta; hyvää päivää"),
+]
+_SUFFIXES = ["o", "a", "i", "e"]
+
+
+def _noisy(rng: random.Random, text: str) -> str:
+    roll = rng.random()
+    if roll < 0.05:
+        return f"  {text}  "
+    if roll < 0.08:
+        return f"*{text}"
+    if roll < 0.10:
+        return f'"{text}'
+    if roll < 0.13:
+        return text.replace("'", "’")
+    return text
+
+
+def _item(rng: random.Random, index: int) -> ExtractedItem:
+    kind = rng.random()
+    if kind < 0.45:
+        stem = rng.randrange(len(_STEMS))
+        # The index keeps most words distinct so id collisions stay realistic.
+        surface = f"{_STEMS[stem]}{rng.choice(_SUFFIXES)}{index % 97 or ''}"
+        if rng.random() < 0.15:
+            surface = f"i'{surface}"  # OCR misread of l'
+        return ExtractedItem(surface=_noisy(rng, surface), dst=_noisy(rng, _FI_WORDS[stem]))
+    if kind < 0.60:
+        masc, fem, dst = rng.choice(_NATIONALITIES)
+        return ExtractedItem(
+            surface=f"{masc}, {fem}",
+            dst=f"{dst} (mies, nainen)" if rng.random() < 0.8 else f"{dst} (nainen, mies)",
+        )
+    if kind < 0.80:
+        form, lemma, form_dst, lemma_dst = rng.choice(_VERBS)
+        return ExtractedItem(
+            surface=f"{form} ({lemma})", lemma=lemma, lemma_dst=lemma_dst, dst=form_dst
+        )
+    src, dst = rng.choice(_PHRASES)
+    return ExtractedItem(surface=_noisy(rng, src), dst=_noisy(rng, dst))
+
+
+def make_items(count: int, *, seed: int = 0, duplicate_rate: float = 0.1) -> list[ExtractedItem]:
+    """`count` extracted items with OCR apostrophes, lemmas, gendered pairs and duplicates."""
+    rng = random.Random(seed)
+    items: list[ExtractedItem] = []
+    for index in range(count):
+        if items and rng.random() < duplicate_rate:
+            items.append(items[rng.randrange(len(items))])
+        else:
+            items.append(_item(rng, index))
+    return items
+
+
+_COLLIDING_SURFACES = ["e", "è", "perché", "perche", "città", "citta", "più", "piu", "né", "ne"]
+
+
+def make_colliding_items(count: int, *, seed: int = 0) -> list[ExtractedItem]:
+    """Distinct items whose surfaces slugify to a handful of ids (`è`/`e`, `perché`/`perche`)."""
+    rng = random.Random(seed)
+    return [
+        ExtractedItem(surface=rng.choice(_COLLIDING_SURFACES), dst=f"sana {index}")
+        for index in range(count)
+    ]
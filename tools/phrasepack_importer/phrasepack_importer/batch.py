@@ -0,0 +1,604 @@
+"""Batch import of many wordlist images in one run."""
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from .cache import ResponseCache
+from .gemini_client import (
+    DEFAULT_CHUNK_PAIRS,
+    GeminiSession,
+    extract_raw_pairs,
+    pairs_to_items_chunked,
+    split_raw_pairs,
+)
+from .ingest import PDF_SUFFIXES, Tile, TilingOptions, extract_tiles, split_source
+from .io import (
+    ImageOptions,
+    OutputOptions,
+    WriteResult,
+    preprocess_image,
+    read_image_bytes,
+    write_json,
+)
+from .metrics import RunMetrics, labels, measure
+from .normalize import slugify
+from .phrasepack import build_phrasepack, pack_inputs
+from .prompt import build_image_pairs_prompt, build_pairs_to_items_prompt
+from .renormalize import extracted_record
+from .schema import ExtractedPayload, RawPairsPayload, assert_non_empty, phrasepack_json
+from .workdir import ITEMS, PACK, RAW_PAIRS, WorkDir, image_key
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+SOURCE_SUFFIXES = IMAGE_SUFFIXES | PDF_SUFFIXES
+
+
+class ManifestError(ValueError):
+    """Raised when a batch manifest cannot be read or its jobs clash."""
+
+
+@dataclass(frozen=True)
+class ImportJob:
+    """One image to turn into one phrasepack."""
+
+    image_path: Path
+    pack_id: str
+    title: str
+    src_lang: str
+    dst_lang: str
+    output_path: Path
+
+
+@dataclass(frozen=True)
+class ImportStats:
+    item_count: int
+    image_bytes_before: int = 0
+    image_bytes_after: int = 0
+    # Stages taken from work-dir checkpoints instead of being run again.
+    resumed: tuple[str, ...] = ()
+    # PDF pages / image tiles sent to step 1 separately.
+    tiles: int = 1
+    # Step-2 calls the raw pairs were split into, and the estimated input tokens
+    # that compact JSON saved over indented JSON (0 when step 2 was resumed).
+    chunks: int = 1
+    tokens_saved: int = 0
+    # The pack file written (None when the pack was resumed).
+    output: WriteResult | None = None
+
+
+@dataclass(frozen=True)
+class JobResult:
+    job: ImportJob
+    stats: ImportStats | None = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def item_count(self) -> int:
+        return self.stats.item_count if self.stats else 0
+
+
+def _title_from_stem(stem: str) -> str:
+    words = stem.replace("_", " ").replace("-", " ").split()
+    title = " ".join(words)
+    return title[:1].upper() + title[1:]
+
+
+def check_unique_jobs(jobs: list[ImportJob]) -> list[ImportJob]:
+    """Return `jobs`, or raise ManifestError if two share a pack id or output file.
+
+    Two such jobs would run concurrently and race on the same pack.
+    """
+    pack_ids: dict[str, ImportJob] = {}
+    outputs: dict[Path, ImportJob] = {}
+    for job in jobs:
+        clash = pack_ids.setdefault(job.pack_id, job)
+        if clash is not job:
+            raise ManifestError(
+                f"{clash.image_path} and {job.image_path} both have pack id '{job.pack_id}'."
+            )
+        clash = outputs.setdefault(job.output_path.resolve(), job)
+        if clash is not job:
+            raise ManifestError(
+                f"{clash.image_path} and {job.image_path} both write {job.output_path}."
+            )
+    return jobs
+
+
+def jobs_from_directory(
+    directory: Path,
+    *,
+    src_lang: str,
+    dst_lang: str,
+    out_dir: Path,
+) -> list[ImportJob]:
+    """One job per image or PDF in a directory; ids and titles come from file names.
+
+    Example: bella_vista_1_ch_1.jpg -> id bella-vista-1-ch-1, title "Bella vista 1 ch 1".
+    Raises ManifestError when two file names give the same id.
+    """
+    images = sorted(
+        path
+        for path in directory.iterdir()
+        if path.is_file() and path.suffix.lower() in SOURCE_SUFFIXES
+    )
+    jobs = []
+    for image_path in images:
+        pack_id = slugify(image_path.stem)
+        jobs.append(
+            ImportJob(
+                image_path=image_path,
+                pack_id=pack_id,
+                title=_title_from_stem(image_path.stem),
+                src_lang=src_lang,
+                dst_lang=dst_lang,
+                output_path=out_dir / f"{pack_id}.json",
+            )
+        )
+    return check_unique_jobs(jobs)
+
+
+def load_manifest(
+    path: Path,
+    *,
+    src_lang: str | None,
+    dst_lang: str | None,
+    out_dir: Path,
+) -> list[ImportJob]:
+    """Read jobs from a JSON manifest.
+
+    The manifest is either a list of entries or {"packs": [...]}. Each entry needs
+    "image", "id" and "title"; "src", "dst" and "out" override the CLI defaults.
+    Relative paths are resolved against the manifest's folder. Pack ids and
+    output files must be unique.
+    """
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, json.JSONDecodeError) as exc:
+        raise ManifestError(f"Could not read manifest {path}: {exc}") from exc
+
+    entries = data.get("packs") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ManifestError(f"Manifest {path} must be a list or contain a 'packs' list.")
+
+    base_dir = path.parent
+    jobs = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            raise ManifestError(f"Manifest entry {index} must be an object.")
+        missing = [key for key in ("image", "id", "title") if not entry.get(key)]
+        src = entry.get("src") or src_lang
+        dst = entry.get("dst") or dst_lang
+        if not src:
+            missing.append("src")
+        if not dst:
+            missing.append("dst")
+        if missing:
+            raise ManifestError(
+                f"Manifest entry {index} is missing: {', '.join(missing)}."
+            )
+        if entry.get("out"):
+            output_path = base_dir / entry["out"]
+        else:
+            output_path = out_dir / f"{entry['id']}.json"
+        jobs.append(
+            ImportJob(
+                image_path=base_dir / entry["image"],
+                pack_id=entry["id"],
+                title=entry["title"],
+                src_lang=src,
+                dst_lang=dst,
+                output_path=output_path,
+            )
+        )
+    return check_unique_jobs(jobs)
+
+
+def write_pack(
+    job: ImportJob,
+    extracted: ExtractedPayload,
+    *,
+    output: OutputOptions | None = None,
+    metrics: RunMetrics | None = None,
+    log: Callable[[str], None] | None = None,
+) -> tuple[int, WriteResult]:
+    """Validate extracted items, assemble the pack and write it.
+
+    Returns the item count and what was written; an unchanged file is left alone.
+    """
+    say = log or (lambda _message: None)
+
+    say("Validating extracted items...")
+    with measure(metrics, "validate"):
+        items = assert_non_empty(extracted.items)
+
+    say("Building phrasepack...")
+    with measure(metrics, "build_phrasepack", items=len(items)):
+        phrasepack = build_phrasepack(
+            pack_id=job.pack_id,
+            title=job.title,
+            src_lang=job.src_lang,
+            dst_lang=job.dst_lang,
+            extracted_items=items,
+        )
+    say("Writing output...")
+    output = output or OutputOptions()
+    with measure(metrics, "write_json"):
+        written = write_json(
+            job.output_path, phrasepack_json(phrasepack, minify=output.minify), output
+        )
+    return len(phrasepack.items), written
+
+
+@dataclass(frozen=True)
+class Checkpoints:
+    """One image's view of a WorkDir: what shaped each stage's output.
+
+    Without a work dir every lookup misses and nothing is saved.
+    """
+
+    workdir: WorkDir | None
+    key: str
+    job: ImportJob
+    model: str
+    image_options: ImageOptions | None
+    tiling: TilingOptions | None = None
+    output: OutputOptions | None = None
+
+    @classmethod
+    def open(
+        cls,
+        workdir: WorkDir | None,
+        job: ImportJob,
+        image_bytes: bytes,
+        *,
+        model: str,
+        image_options: ImageOptions | None,
+        tiling: TilingOptions | None = None,
+        output: OutputOptions | None = None,
+    ) -> Checkpoints:
+        key = image_key(image_bytes) if workdir is not None else ""
+        return cls(workdir, key, job, model, image_options, tiling, output)
+
+    def _raw_inputs(self, prompt: str) -> tuple[str, ...]:
+        return (
+            self.model,
+            prompt,
+            repr(self.image_options or ImageOptions()),
+            repr(self.tiling or TilingOptions()),
+        )
+
+    def _pack_inputs(self, items_json: str) -> tuple[str, ...]:
+        job = self.job
+        return (
+            *pack_inputs(
+                pack_id=job.pack_id,
+                title=job.title,
+                src_lang=job.src_lang,
+                dst_lang=job.dst_lang,
+                output_path=job.output_path,
+                output=self.output,
+            ),
+            items_json,
+        )
+
+    def raw_pairs(self, prompt: str) -> RawPairsPayload | None:
+        if self.workdir is None:
+            return None
+        text = self.workdir.get(self.key, RAW_PAIRS, *self._raw_inputs(prompt))
+        return RawPairsPayload.model_validate_json(text) if text is not None else None
+
+    def save_raw_pairs(self, prompt: str, payload: RawPairsPayload) -> None:
+        if self.workdir is not None:
+            self.workdir.put(
+                self.key, RAW_PAIRS, *self._raw_inputs(prompt), text=payload.model_dump_json()
+            )
+
+    def items(self, prompt: str, pairs_json: str) -> ExtractedPayload | None:
+        if self.workdir is None:
+            return None
+        text = self.workdir.get(self.key, ITEMS, self.model, prompt, pairs_json)
+        return ExtractedPayload.model_validate_json(text) if text is not None else None
+
+    def save_items(self, prompt: str, pairs_json: str, payload: ExtractedPayload) -> None:
+        if self.workdir is not None:
+            self.workdir.put(
+                self.key, ITEMS, self.model, prompt, pairs_json, text=payload.model_dump_json()
+            )
+
+    def written_pack(self, extracted: ExtractedPayload) -> int | None:
+        """Item count of the pack, if it was already written from these items and is unchanged."""
+        if self.workdir is None:
+            return None
+        record = self.workdir.get_file(
+            self.key,
+            PACK,
+            *self._pack_inputs(extracted.model_dump_json()),
+            path=self.job.output_path,
+        )
+        return int(record["items"]) if record is not None else None
+
+    def save_pack(self, extracted: ExtractedPayload, item_count: int) -> None:
+        if self.workdir is not None:
+            self.workdir.put_file(
+                self.key,
+                PACK,
+                *self._pack_inputs(extracted.model_dump_json()),
+                path=self.job.output_path,
+                items=item_count,
+            )
+
+    def save_extracted(self, extracted: ExtractedPayload) -> None:
+        """Keep the pack's cleaned items for `renormalize`."""
+        if self.workdir is not None:
+            job = self.job
+            self.workdir.put_extracted(
+                job.output_path,
+                extracted_record(
+                    image_key=self.key,
+                    pack_id=job.pack_id,
+                    title=job.title,
+                    src_lang=job.src_lang,
+                    dst_lang=job.dst_lang,
+                    output_path=job.output_path,
+                    extracted=extracted,
+                ),
+            )
+
+
+def finish_pack(
+    checkpoints: Checkpoints,
+    extracted: ExtractedPayload,
+    *,
+    metrics: RunMetrics | None = None,
+    log: Callable[[str], None] | None = None,
+) -> tuple[int, WriteResult | None]:
+    """`write_pack` unless an identical pack was already written.
+
+    Returns the item count and what was written (None when the pack was reused).
+    """
+    count = checkpoints.written_pack(extracted)
+    written = None
+    if count is not None:
+        if log:
+            log(f"Pack unchanged since the last run: {checkpoints.job.output_path}")
+    else:
+        count, written = write_pack(
+            checkpoints.job, extracted, output=checkpoints.output, metrics=metrics, log=log
+        )
+        checkpoints.save_pack(extracted, count)
+    checkpoints.save_extracted(extracted)
+    return count, written
+
+
+def import_job(
+    job: ImportJob,
+    *,
+    model: str,
+    session: GeminiSession,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    image_options: ImageOptions | None = None,
+    tiling: TilingOptions | None = None,
+    workdir: WorkDir | None = None,
+    chunk_size: int | None = DEFAULT_CHUNK_PAIRS,
+    output: OutputOptions | None = None,
+    log: Callable[[str], None] | None = None,
+) -> ImportStats:
+    """Run extraction + assembly for one image (or PDF) and write the pack.
+
+    PDFs are split into pages, and with `tiling.tile_height` tall pages into
+    overlapping tiles; each piece is transcribed concurrently and the pairs are
+    merged before step 2 (see `ingest`). Step 2 cleans the pairs in chunks of at
+    most `chunk_size` (see `split_raw_pairs`).
+
+    With a `workdir`, each stage's output is checkpointed; when it was opened with
+    `resume=True`, stages that already completed for this image are skipped.
+    """
+    with labels(image=job.image_path.name), measure(session.metrics, "import"):
+        return _import_job(
+            job,
+            model=model,
+            session=session,
+            allow_repair=allow_repair,
+            cache=cache,
+            image_options=image_options,
+            tiling=tiling,
+            workdir=workdir,
+            chunk_size=chunk_size,
+            output=output,
+            say=log or (lambda _message: None),
+        )
+
+
+def _import_job(
+    job: ImportJob,
+    *,
+    model: str,
+    session: GeminiSession,
+    allow_repair: bool,
+    cache: ResponseCache | None,
+    image_options: ImageOptions | None,
+    tiling: TilingOptions | None,
+    workdir: WorkDir | None,
+    chunk_size: int | None,
+    output: OutputOptions | None,
+    say: Callable[[str], None],
+) -> ImportStats:
+    metrics = session.metrics
+    say("Building prompts...")
+    with measure(metrics, "build_prompts"):
+        image_prompt = build_image_pairs_prompt(job.src_lang, job.dst_lang)
+        transform_prompt = build_pairs_to_items_prompt(job.src_lang, job.dst_lang)
+    say("Reading image...")
+    with measure(metrics, "read_image"):
+        data = read_image_bytes(job.image_path)
+        checkpoints = Checkpoints.open(
+            workdir,
+            job,
+            data,
+            model=model,
+            image_options=image_options,
+            tiling=tiling,
+            output=output,
+        )
+        raw_pairs = checkpoints.raw_pairs(image_prompt)
+        # A checkpointed step 1 makes splitting, preprocessing and the upload unnecessary.
+        tiles = split_source(data, tiling) if raw_pairs is None else []
+    resumed: list[str] = []
+    uploaded: list[int] = []
+    if raw_pairs is not None:
+        say("Reusing step-1 pairs from the work dir...")
+        resumed.append(RAW_PAIRS)
+    else:
+        if len(tiles) > 1:
+            say(f"Split into {len(tiles)} pages/tiles; extracting them concurrently...")
+
+        def extract_tile(tile: Tile) -> RawPairsPayload:
+            with measure(metrics, "preprocess_image"):
+                image = preprocess_image(tile.data, image_options or ImageOptions())
+            uploaded.append(len(image.data))
+            if len(tiles) == 1 and image_options and not image_options.is_noop:
+                say(f"Preprocessed image: {image.size_summary}")
+            return extract_raw_pairs(
+                image_bytes=image.data,
+                prompt=image_prompt,
+                model=model,
+                mime_type=image.mime_type,
+                allow_repair=allow_repair,
+                cache=cache,
+                session=session,
+            )
+
+        say("Extracting pairs with Gemini...")
+        raw_pairs = extract_tiles(tiles, extract_tile, workers=session.max_concurrency)
+        checkpoints.save_raw_pairs(image_prompt, raw_pairs)
+
+    chunks = split_raw_pairs(raw_pairs, chunk_size=chunk_size)
+    tokens_saved = 0
+    extracted = checkpoints.items(transform_prompt, chunks.key)
+    if extracted is not None:
+        say("Reusing cleaned items from the work dir...")
+        resumed.append(ITEMS)
+    else:
+        if len(chunks.chunks) > 1:
+            say(f"Cleaning pairs in {len(chunks.chunks)} chunks concurrently...")
+        extracted = pairs_to_items_chunked(
+            chunks=chunks,
+            prompt=transform_prompt,
+            model=model,
+            allow_repair=allow_repair,
+            cache=cache,
+            session=session,
+        )
+        tokens_saved = chunks.tokens_saved
+        checkpoints.save_items(transform_prompt, chunks.key, extracted)
+
+    count, written = finish_pack(checkpoints, extracted, metrics=metrics, log=say)
+    if written is None:
+        resumed.append(PACK)
+    return ImportStats(
+        item_count=count,
+        image_bytes_before=len(data),
+        image_bytes_after=sum(uploaded) if uploaded else len(data),
+        resumed=tuple(resumed),
+        tiles=max(1, len(tiles)),
+        chunks=len(chunks.chunks),
+        tokens_saved=tokens_saved,
+        output=written,
+    )
+
+
+def run_batch(
+    jobs: list[ImportJob],
+    run_job: Callable[[ImportJob], ImportStats],
+    *,
+    workers: int = 4,
+    on_result: Callable[[JobResult], None] | None = None,
+) -> list[JobResult]:
+    """Run jobs on a bounded thread pool.
+
+    A failing job is recorded in its JobResult instead of aborting the batch.
+    `on_result` is called as each job finishes; results are returned in job order.
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+
+    def timed(job: ImportJob) -> JobResult:
+        started = time.perf_counter()
+        try:
+            stats = run_job(job)
+        except Exception as exc:  # noqa: BLE001 - one bad page must not stop the batch
+            return JobResult(
+                job=job,
+                error=f"{type(exc).__name__}: {exc}",
+                elapsed=time.perf_counter() - started,
+            )
+        return JobResult(job=job, stats=stats, elapsed=time.perf_counter() - started)
+
+    results: dict[int, JobResult] = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(timed, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result:
+                on_result(result)
+    return [results[index] for index in range(len(jobs))]
+
+
+def format_summary(results: list[JobResult]) -> str:
+    """Human-readable per-image summary for the end of a batch run."""
+    lines = []
+    for result in results:
+        name = result.job.image_path.name
+        if result.ok:
+            details = [f"{result.item_count} items"]
+            stats = result.stats
+            if stats and stats.tiles > 1:
+                details.append(f"{stats.tiles} pages/tiles")
+            if stats and stats.chunks > 1:
+                details.append(f"{stats.chunks} step-2 chunks")
+            if stats and stats.image_bytes_after != stats.image_bytes_before:
+                details.append(
+                    f"image {stats.image_bytes_before} -> {stats.image_bytes_after} bytes"
+                )
+            if stats and stats.output:
+                details.append(f"pack {stats.output.summary()}")
+            if stats and stats.resumed:
+                details.append(f"resumed {', '.join(stats.resumed)}")
+            details.append(f"{result.elapsed:.1f}s")
+            lines.append(
+                f"  OK    {name} -> {result.job.output_path} ({', '.join(details)})"
+            )
+        else:
+            lines.append(f"  FAIL  {name}: {result.error}")
+    all_stats = [result.stats for result in results if result.stats]
+    tokens_saved = sum(entry.tokens_saved for entry in all_stats)
+    if tokens_saved:
+        chunks = sum(entry.chunks for entry in all_stats)
+        lines.append(
+            f"Step 2: {chunks} chunks; compact JSON saved ~{tokens_saved} input tokens."
+        )
+    written = [entry.output for entry in all_stats if entry.output]
+    if written:
+        unchanged = sum(1 for entry in written if not entry.changed)
+        sizes = [f"{sum(entry.size for entry in written)} B"]
+        for suffix, _size in written[0].compressed:
+            total = sum(dict(entry.compressed)[suffix] for entry in written)
+            sizes.append(f"{suffix[1:]} {total} B")
+        lines.append(
+            f"Output: {len(written)} packs, {', '.join(sizes)}; {unchanged} unchanged."
+        )
+    failed = sum(1 for result in results if not result.ok)
+    lines.append(f"{len(results) - failed} succeeded, {failed} failed.")
+    return "\n".join(lines)
@@ -0,0 +1,154 @@
+"""Content-addressed on-disk cache for validated Gemini responses."""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+# Bump when the stored payload format changes so old entries stop matching.
+CACHE_VERSION = "1"
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 60 * 60
+
+
+def default_cache_dir() -> Path:
+    """Per-user cache folder (honors XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME")
+    root = Path(base) if base else Path.home() / ".cache"
+    return root / "phrasepack_importer" / "responses"
+
+
+def hash_key(*parts: str | bytes) -> str:
+    """Stable sha256 key over ordered parts (length-prefixed, so no ambiguity)."""
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Stores one text payload per key under `root/<key[:2]>/<key>.json`.
+
+    Entries older than `max_age` seconds are ignored and removed; when the cache
+    grows past `max_bytes`, the least recently used entries are evicted.
+    With `refresh=True` every lookup misses, but new responses are still stored.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        max_bytes: int | None = DEFAULT_MAX_BYTES,
+        max_age: float | None = DEFAULT_MAX_AGE_SECONDS,
+        refresh: bool = False,
+    ) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._size: int | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _expired(self, mtime: float, now: float) -> bool:
+        return self.max_age is not None and now - mtime > self.max_age
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        text = None
+        if not self.refresh:
+            try:
+                stat = path.stat()
+                if self._expired(stat.st_mtime, time.time()):
+                    path.unlink(missing_ok=True)
+                else:
+                    text = path.read_text(encoding="utf-8")
+                    # Touch so size eviction drops the least recently used entries.
+                    os.utime(path)
+            except FileNotFoundError:
+                text = None
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def discard(self, key: str) -> None:
+        """Drop an entry that `get` returned but turned out unusable; count it a miss."""
+        self._path(key).unlink(missing_ok=True)
+        with self._lock:
+            self.hits -= 1
+            self.misses += 1
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = text.encode("utf-8")
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+
+        with self._lock:
+            self.writes += 1
+            if self._size is not None:
+                self._size += len(data)
+            over_budget = self.max_bytes is not None and (
+                self._size is None or self._size > self.max_bytes
+            )
+        if over_budget:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then oldest entries until under `max_bytes`."""
+        now = time.time()
+        entries = []
+        removed = 0
+        for path in self.root.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self._expired(stat.st_mtime, now):
+                path.unlink(missing_ok=True)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        if self.max_bytes is not None and total > self.max_bytes:
+            for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        with self._lock:
+            self._size = total
+            self.evictions += removed
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+            }
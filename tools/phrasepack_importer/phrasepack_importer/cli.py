@@ -3,28 +3,92 @@ from __future__ import annotations
 
 import argparse
 import sys
+import time
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from .gemini_client import extract_pairs
-from .io import default_phrasepack_output_path, read_image_bytes, write_json
-from .phrasepack import build_phrasepack
-from .prompt import build_image_pairs_prompt, build_pairs_to_items_prompt
-from .schema import ParseError, assert_non_empty, serialize_phrasepack
+from .cache import (
+    DEFAULT_MAX_AGE_SECONDS,
+    DEFAULT_MAX_BYTES,
+    ResponseCache,
+    default_cache_dir,
+)
+from .ingest import DEFAULT_PDF_DPI, DEFAULT_TILE_OVERLAP, TilingOptions
+from .io import (
+    ImageOptions,
+    ImagePreprocessError,
+    OutputError,
+    OutputOptions,
+    default_phrasepack_dir,
+    default_phrasepack_output_path,
+)
+from .metrics import RunMetrics
+from .normalize import DEFAULT_MEMO_SIZE, configure_memo, memo_stats
+from .ratelimit import RateLimiter
+from .retry import RetryEvent, RetryPolicy
+from .transport import TRANSPORTS, RecordingClient, ReplayClient, StubClient, StubOptions
+from .workdir import WorkDir, default_work_dir
+
+if TYPE_CHECKING:
+    from .batch import ImportJob, ImportStats, JobResult
+    from .gemini_client import GeminiSession
+    from .rebuild import BuildSettings
+
+REBUILD_COMMAND = "rebuild"
+RENORMALIZE_COMMAND = "renormalize"
+
+# The import pipeline (batch, gemini_client, schema) pulls in pydantic and
+# google.genai; it is imported inside the run functions so that --help and
+# argument errors return without loading either. See benchmarks/startup.py.
 
 
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
-        description="Extract bilingual wordlists from images into phrasepack JSON."
+        description="Extract bilingual wordlists from images into phrasepack JSON.",
+        epilog=f"Run with '{REBUILD_COMMAND} --help' to re-import only the packs whose "
+        f"inputs changed, or '{RENORMALIZE_COMMAND} --help' to rebuild packs from saved "
+        "step-2 output without calling Gemini.",
     )
-    parser.add_argument("--image", required=True, help="Path to the input image.")
-    parser.add_argument("--id", required=True, help="Phrasepack id.")
-    parser.add_argument("--title", required=True, help="Phrasepack title.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--image", help="Path to the input image or scanned PDF.")
+    source.add_argument(
+        "--batch",
+        help="Directory of images/PDFs or JSON manifest to import in one run.",
+    )
+    parser.add_argument("--id", help="Phrasepack id (single image mode).")
+    parser.add_argument("--title", help="Phrasepack title (single image mode).")
     parser.add_argument("--src", required=True, help="Source language code.")
     parser.add_argument("--dst", required=True, help="Target language code.")
     parser.add_argument(
         "--out",
         help="Output JSON path (defaults to public/phrasepacks/<id>.json).",
     )
+    parser.add_argument(
+        "--out-dir",
+        help="Output folder for batch mode (defaults to public/phrasepacks).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Images processed at once in batch mode (step-1 workers with --pipeline).",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Batch mode: overlap step-1 vision calls with step-2 cleanup calls.",
+    )
+    parser.add_argument(
+        "--clean-workers",
+        type=int,
+        help="Step-2 cleanup workers with --pipeline (defaults to --workers).",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        help="Pages waiting between the stages with --pipeline (defaults to --workers).",
+    )
     parser.add_argument(
         "--model",
         default="gemini-2.0-flash-001",
@@ -36,17 +100,439 @@ def build_parser() -> argparse.ArgumentParser:
         help="Vertex AI location.",
     )
     parser.add_argument("--project", help="GCP project id.")
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Per-request Gemini timeout in seconds.",
+    )
     parser.add_argument(
         "--no-repair",
         action="store_true",
-        help="Disable JSON repair pass.",
+        help="Disable the Gemini JSON repair request (local repair still runs).",
+    )
+    parser.add_argument(
+        "--chunk-pairs",
+        type=int,
+        help="Raw pairs per step-2 cleanup call; longer lists are split and the "
+        "chunks cleaned concurrently (0 sends all pairs in one call).",
+    )
+    retry_defaults = RetryPolicy()
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=retry_defaults.max_attempts - 1,
+        help="Resend a request up to this many times after 429/5xx/timeout errors.",
+    )
+    parser.add_argument(
+        "--retry-max-elapsed",
+        type=float,
+        default=retry_defaults.max_elapsed,
+        help="Stop retrying a request after this many seconds.",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        help="Client-side Gemini requests-per-minute budget (match your Vertex AI quota).",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        help="Client-side Gemini tokens-per-minute budget.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="Write per-stage timings and token usage to this file (.json, or .ndjson for one record per line).",
+    )
+    parser.add_argument(
+        "--memo-size",
+        type=int,
+        default=DEFAULT_MEMO_SIZE,
+        help="Entries kept in the normalize_text/slugify memo caches (0 disables).",
+    )
+    transport = parser.add_argument_group("offline transport")
+    transport.add_argument(
+        "--transport",
+        choices=TRANSPORTS,
+        default="live",
+        help="live: call Vertex AI; record: call it and save transcripts; "
+        "replay: answer from saved transcripts; stub: built-in fake Gemini.",
+    )
+    transport.add_argument(
+        "--transcripts",
+        help="Transcript folder for --transport record/replay.",
+    )
+    transport.add_argument(
+        "--stub-latency",
+        type=float,
+        default=0.0,
+        help="Seconds each stub (or replayed) response takes.",
+    )
+    transport.add_argument(
+        "--stub-error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of stub requests that fail with 503.",
+    )
+    transport.add_argument(
+        "--stub-malformed-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of stub responses that are not valid JSON.",
+    )
+    image = parser.add_argument_group("image preprocessing")
+    image.add_argument(
+        "--max-edge",
+        type=int,
+        help="Downscale so the longer image edge is at most this many pixels.",
+    )
+    image.add_argument(
+        "--grayscale",
+        action="store_true",
+        help="Convert the image to grayscale before upload.",
+    )
+    image.add_argument(
+        "--image-format",
+        choices=["jpeg", "webp"],
+        help="Re-encode the image in this format before upload.",
+    )
+    image.add_argument(
+        "--image-quality",
+        type=int,
+        default=85,
+        help="JPEG/WebP quality when re-encoding.",
+    )
+    image.add_argument(
+        "--auto-crop",
+        action="store_true",
+        help="Crop blank page margins before upload.",
+    )
+    image.add_argument(
+        "--tile-height",
+        type=int,
+        help="Cut pages taller than this many pixels into overlapping tiles, "
+        "extracted concurrently and merged.",
+    )
+    image.add_argument(
+        "--tile-overlap",
+        type=int,
+        default=DEFAULT_TILE_OVERLAP,
+        help="Pixels shared by adjacent tiles.",
+    )
+    image.add_argument(
+        "--pdf-dpi",
+        type=int,
+        default=DEFAULT_PDF_DPI,
+        help="Resolution PDF pages are rendered at.",
+    )
+    _add_output_args(parser)
+    parser.add_argument(
+        "--cache-dir",
+        help="Gemini response cache folder (defaults to ~/.cache/phrasepack_importer).",
+    )
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call Gemini and do not store responses.",
+    )
+    cache_mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ignore cached responses (and the cached gcloud project) but store the new ones.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        help="Per-image stage checkpoints (defaults to ~/.cache/phrasepack_importer/work).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip stages (vision call, cleanup call, pack) already completed in the work dir.",
+    )
+    parser.add_argument(
+        "--build-manifest",
+        help="Per-pack record of the inputs each pack was built from "
+        "(defaults to build-manifest.json in the work dir).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Evict least recently used cache entries above this size.",
+    )
+    parser.add_argument(
+        "--cache-max-age-days",
+        type=float,
+        default=DEFAULT_MAX_AGE_SECONDS / (24 * 60 * 60),
+        help="Ignore and remove cache entries older than this.",
     )
     return parser
 
 
-def run(argv: list[str]) -> int:
+def _add_output_args(parser: argparse.ArgumentParser) -> None:
+    output = parser.add_argument_group("pack output")
+    output.add_argument(
+        "--minify",
+        action="store_true",
+        help="Write packs without indentation (smaller downloads, noisier diffs).",
+    )
+    output.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Also write a precompressed <pack>.json.gz next to each pack.",
+    )
+    output.add_argument(
+        "--brotli",
+        action="store_true",
+        help="Also write a precompressed <pack>.json.br next to each pack (needs brotli).",
+    )
+
+
+def _build_output(args: argparse.Namespace) -> OutputOptions:
+    return OutputOptions(minify=args.minify, gzip=args.gzip, brotli=args.brotli)
+
+
+def build_rebuild_parser() -> argparse.ArgumentParser:
+    """Parser of `rebuild`: the import options plus --dry-run."""
     parser = build_parser()
-    args = parser.parse_args(argv)
+    parser.prog = f"{parser.prog} {REBUILD_COMMAND}"
+    parser.description = (
+        "Re-import only the packs of a batch whose source file, prompts, model/settings "
+        "or normalizer changed since the last build, re-running only the stale stages."
+    )
+    parser.epilog = None
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List which packs would rebuild, from which stage and why; run nothing.",
+    )
+    return parser
+
+
+def build_renormalize_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Rebuild packs from the step-2 output saved in the work dir, without "
+        "calling Gemini. Only packs whose bytes change are rewritten."
+    )
+    parser.prog = f"{parser.prog} {RENORMALIZE_COMMAND}"
+    parser.add_argument(
+        "records",
+        nargs="*",
+        help="Saved step-2 records, or folders of them "
+        "(defaults to all records in the work dir).",
+    )
+    parser.add_argument(
+        "--work-dir",
+        help="Work dir whose records to use (defaults to ~/.cache/phrasepack_importer/work).",
+    )
+    parser.add_argument(
+        "--build-manifest",
+        help="Build manifest to mark the rewritten packs current in "
+        "(defaults to build-manifest.json in the work dir).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes to build packs on (defaults to the CPU count; "
+        "small runs stay in-process).",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the packs that would change; write nothing.",
+    )
+    _add_output_args(parser)
+    return parser
+
+
+def _build_cache(args: argparse.Namespace) -> ResponseCache | None:
+    # Stub responses are fake; never let them into the shared response cache.
+    if args.no_cache or args.transport == "stub":
+        return None
+    return ResponseCache(
+        Path(args.cache_dir) if args.cache_dir else default_cache_dir(),
+        max_bytes=args.cache_max_mb * 1024 * 1024,
+        max_age=args.cache_max_age_days * 24 * 60 * 60,
+        refresh=args.refresh,
+    )
+
+
+def _build_tiling(args: argparse.Namespace, parser: argparse.ArgumentParser) -> TilingOptions:
+    if args.pdf_dpi < 1:
+        parser.error("--pdf-dpi must be at least 1")
+    try:
+        return TilingOptions(
+            tile_height=args.tile_height, overlap=args.tile_overlap, pdf_dpi=args.pdf_dpi
+        )
+    except ValueError as exc:
+        parser.error(f"--tile-height/--tile-overlap: {exc}")
+
+
+def _chunk_size(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    from .gemini_client import DEFAULT_CHUNK_PAIRS
+
+    if args.chunk_pairs is None:
+        return DEFAULT_CHUNK_PAIRS
+    if args.chunk_pairs < 0:
+        parser.error("--chunk-pairs must be >= 0")
+    return args.chunk_pairs
+
+
+def _build_workdir(args: argparse.Namespace, *, resume: bool = False) -> WorkDir | None:
+    # Like the response cache, keep fake stub output out of the default work dir.
+    if args.transport == "stub" and not args.work_dir:
+        return None
+    root = Path(args.work_dir) if args.work_dir else default_work_dir()
+    return WorkDir(root, resume=resume or args.resume)
+
+
+def _build_settings(args: argparse.Namespace, parser: argparse.ArgumentParser) -> BuildSettings:
+    from .rebuild import BuildSettings
+
+    return BuildSettings(
+        model=args.model,
+        image_options=_build_image_options(args),
+        tiling=_build_tiling(args, parser),
+        chunk_size=_chunk_size(args, parser),
+        output=_build_output(args),
+    )
+
+
+def _build_manifest_path(args: argparse.Namespace, workdir: WorkDir) -> Path:
+    from .rebuild import default_build_manifest
+
+    return Path(args.build_manifest) if args.build_manifest else default_build_manifest(workdir)
+
+
+def _record_build(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    workdir: WorkDir | None,
+    results: list[JobResult],
+) -> None:
+    """Note the written packs in the build manifest, so `rebuild` knows they are current."""
+    if workdir is None:
+        return
+    from .rebuild import BuildManifest, record_results
+
+    manifest = BuildManifest.load(_build_manifest_path(args, workdir))
+    record_results(manifest, results, _build_settings(args, parser))
+
+
+def _build_image_options(args: argparse.Namespace) -> ImageOptions:
+    return ImageOptions(
+        max_long_edge=args.max_edge,
+        grayscale=args.grayscale,
+        format=args.image_format,
+        quality=args.image_quality,
+        auto_crop=args.auto_crop,
+    )
+
+
+def _project_cache_file(args: argparse.Namespace) -> Path | None:
+    """On-disk gcloud project cache; --no-cache skips it and --refresh resets it."""
+    if args.project or args.no_cache:
+        return None
+    from .gemini_client import clear_project_cache, default_project_cache_file
+
+    path = default_project_cache_file()
+    if args.refresh:
+        clear_project_cache(path)
+    return path
+
+
+def _build_client(args: argparse.Namespace) -> object | None:
+    if args.transport == "stub":
+        return StubClient(
+            StubOptions(
+                latency=args.stub_latency,
+                error_rate=args.stub_error_rate,
+                malformed_rate=args.stub_malformed_rate,
+            )
+        )
+    if args.transport == "live":
+        return None
+    transcripts = Path(args.transcripts)
+    if args.transport == "replay":
+        return ReplayClient(transcripts, latency=args.stub_latency)
+    from .gemini_client import GeminiSession
+
+    live = GeminiSession(
+        project=args.project,
+        location=args.location,
+        timeout=args.timeout,
+        project_cache_file=_project_cache_file(args),
+    )
+    return RecordingClient(lambda: live.client, transcripts, close=live.close)
+
+
+def _build_session(
+    args: argparse.Namespace,
+    *,
+    max_concurrency: int | None = None,
+) -> GeminiSession:
+    from .gemini_client import DEFAULT_MAX_CONCURRENCY, GeminiSession
+
+    return GeminiSession(
+        project=args.project,
+        location=args.location,
+        client=_build_client(args),
+        timeout=args.timeout,
+        max_concurrency=max_concurrency or DEFAULT_MAX_CONCURRENCY,
+        retry_policy=RetryPolicy(
+            max_attempts=max(1, args.max_retries + 1),
+            max_elapsed=args.retry_max_elapsed,
+        ),
+        on_retry=_log_retry,
+        rate_limiter=RateLimiter(rpm=args.rpm, tpm=args.tpm) if args.rpm or args.tpm else None,
+        metrics=RunMetrics() if args.metrics_out else None,
+        project_cache_file=_project_cache_file(args),
+    )
+
+
+def _log_retry(event: RetryEvent) -> None:
+    print(f"Gemini {event.describe()}", file=sys.stderr)
+
+
+def _print_call_stats(session: GeminiSession, cache: ResponseCache | None) -> None:
+    print(f"Gemini: {session.stats.summary()}")
+    if session.rate_limiter is not None:
+        print(f"Rate limit: {session.rate_limiter.snapshot().summary()}")
+    if cache is None:
+        return
+    stats = cache.stats()
+    print(f"Cache: {stats['hits']} hits, {stats['misses']} misses ({cache.root})")
+
+
+def _print_workdir(workdir: WorkDir | None) -> None:
+    if workdir is not None:
+        print(f"Work dir: {workdir.summary()}")
+
+
+def _write_metrics(
+    args: argparse.Namespace, session: GeminiSession, stats: list[ImportStats]
+) -> None:
+    if session.metrics is None:
+        return
+    path = Path(args.metrics_out)
+    session.metrics.annotate("normalize_memo", memo_stats())
+    session.metrics.annotate(
+        "pairs_to_items",
+        {
+            "chunks": sum(entry.chunks for entry in stats),
+            "tokens_saved_by_compact_json": sum(entry.tokens_saved for entry in stats),
+        },
+    )
+    session.metrics.write(path)
+    print(f"Metrics: {path}")
+
+
+def _run_single(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    from .batch import ImportJob, JobResult, import_job
+    from .schema import ParseError
+
+    if not args.id or not args.title:
+        parser.error("--id and --title are required with --image")
 
     image_path = Path(args.image)
     if not image_path.exists():
@@ -54,42 +540,293 @@ def run(argv: list[str]) -> int:
         return 2
 
     output_path = Path(args.out) if args.out else default_phrasepack_output_path(args.id)
-
-    try:
-        print("Building prompts...")
-        image_prompt = build_image_pairs_prompt(args.src, args.dst)
-        transform_prompt = build_pairs_to_items_prompt(args.src, args.dst)
-        print("Reading image...")
-        image_bytes = read_image_bytes(image_path)
-        print("Extracting pairs with Gemini...")
-        extracted = extract_pairs(
-            image_bytes=image_bytes,
-            image_prompt=image_prompt,
-            transform_prompt=transform_prompt,
-            model=args.model,
-            project=args.project,
-            location=args.location,
-            allow_repair=not args.no_repair,
-        )
-        print("Validating extracted items...")
-        items = assert_non_empty(extracted.items)
-    except ParseError as exc:
-        print(f"Extraction failed: {exc}", file=sys.stderr)
-        return 1
-
-    print("Building phrasepack...")
-    phrasepack = build_phrasepack(
+    job = ImportJob(
+        image_path=image_path,
         pack_id=args.id,
         title=args.title,
         src_lang=args.src,
         dst_lang=args.dst,
-        extracted_items=items,
+        output_path=output_path,
     )
-    print("Writing output...")
-    write_json(output_path, serialize_phrasepack(phrasepack))
-    print(f"Wrote phrasepack: {output_path}")
+    cache = _build_cache(args)
+    workdir = _build_workdir(args)
+    stats: list[ImportStats] = []
+    with _build_session(args) as session:
+        try:
+            result = import_job(
+                job,
+                model=args.model,
+                session=session,
+                allow_repair=not args.no_repair,
+                cache=cache,
+                image_options=_build_image_options(args),
+                tiling=_build_tiling(args, parser),
+                workdir=workdir,
+                chunk_size=_chunk_size(args, parser),
+                output=_build_output(args),
+                log=print,
+            )
+            stats.append(result)
+        except ImagePreprocessError as exc:
+            print(f"Image preprocessing failed: {exc}", file=sys.stderr)
+            return 2
+        except OutputError as exc:
+            print(f"Writing the pack failed: {exc}", file=sys.stderr)
+            return 2
+        except ParseError as exc:
+            print(f"Extraction failed: {exc}", file=sys.stderr)
+            return 1
+        finally:
+            _print_call_stats(session, cache)
+            _print_workdir(workdir)
+            _write_metrics(args, session, stats)
+
+    if result.tokens_saved:
+        print(
+            f"Step 2: {result.chunks} chunks; "
+            f"compact JSON saved ~{result.tokens_saved} input tokens."
+        )
+    _record_build(args, parser, workdir, [JobResult(job=job, stats=result)])
+    if result.output and not result.output.changed:
+        print(f"Phrasepack unchanged: {output_path}")
+    else:
+        print(f"Wrote phrasepack: {output_path}")
+    if result.output:
+        print(f"Output: {result.output.summary()}")
     return 0
 
 
+def _check_batch_args(args: argparse.Namespace, parser: argparse.ArgumentParser) -> None:
+    if args.id or args.title or args.out:
+        parser.error("--id, --title and --out only apply to --image; use a manifest")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if min(_clean_workers(args), _queue_size(args)) < 1:
+        parser.error("--clean-workers and --queue-size must be at least 1")
+
+
+def _clean_workers(args: argparse.Namespace) -> int:
+    return args.workers if args.clean_workers is None else args.clean_workers
+
+
+def _queue_size(args: argparse.Namespace) -> int:
+    return args.workers if args.queue_size is None else args.queue_size
+
+
+def _load_batch_jobs(args: argparse.Namespace) -> list[ImportJob] | None:
+    """The jobs of --batch; None (after printing why) when they cannot run."""
+    from .batch import ManifestError, jobs_from_directory, load_manifest
+
+    batch_path = Path(args.batch)
+    out_dir = Path(args.out_dir) if args.out_dir else default_phrasepack_dir()
+    try:
+        if batch_path.is_dir():
+            jobs = jobs_from_directory(
+                batch_path, src_lang=args.src, dst_lang=args.dst, out_dir=out_dir
+            )
+        elif batch_path.is_file():
+            jobs = load_manifest(
+                batch_path, src_lang=args.src, dst_lang=args.dst, out_dir=out_dir
+            )
+        else:
+            print(f"Batch source not found: {batch_path}", file=sys.stderr)
+            return None
+    except ManifestError as exc:
+        print(str(exc), file=sys.stderr)
+        return None
+
+    missing = [job.image_path for job in jobs if not job.image_path.exists()]
+    if missing:
+        for path in missing:
+            print(f"Image not found: {path}", file=sys.stderr)
+        return None
+    if not jobs:
+        print(f"No images found in {batch_path}", file=sys.stderr)
+        return None
+    return jobs
+
+
+def _import_jobs(
+    args: argparse.Namespace,
+    parser: argparse.ArgumentParser,
+    jobs: list[ImportJob],
+    *,
+    workdir: WorkDir | None,
+) -> list[JobResult]:
+    """Import `jobs` with the batch or pipeline runner and print the summaries."""
+    from .batch import format_summary, import_job, run_batch
+    from .pipeline import run_pipeline
+
+    print(f"Importing {len(jobs)} images with {args.workers} workers...")
+    tiling = _build_tiling(args, parser)
+    chunk_size = _chunk_size(args, parser)
+    cache = _build_cache(args)
+    clean_workers = _clean_workers(args)
+
+    def report(result: JobResult) -> None:
+        status = "Wrote" if result.ok else "Failed"
+        target = result.job.output_path if result.ok else result.error
+        print(f"{status} {result.job.pack_id}: {target}")
+
+    if args.pipeline:
+        with _build_session(args, max_concurrency=args.workers + clean_workers) as session:
+            results, pipeline_report = run_pipeline(
+                jobs,
+                model=args.model,
+                session=session,
+                allow_repair=not args.no_repair,
+                cache=cache,
+                extract_workers=args.workers,
+                clean_workers=clean_workers,
+                queue_size=_queue_size(args),
+                image_options=_build_image_options(args),
+                tiling=tiling,
+                workdir=workdir,
+                chunk_size=chunk_size,
+                output=_build_output(args),
+                on_result=report,
+            )
+        print("Pipeline:")
+        print(pipeline_report.summary())
+    else:
+        from .gemini_client import DEFAULT_MAX_CONCURRENCY
+
+        # One session for the whole batch: the project is resolved and the client
+        # is set up once per process instead of twice per image. Its request cap
+        # is shared by the workers' tiles and step-2 chunks.
+        max_concurrency = max(args.workers, DEFAULT_MAX_CONCURRENCY)
+        with _build_session(args, max_concurrency=max_concurrency) as session:
+            run_job = partial(
+                import_job,
+                model=args.model,
+                session=session,
+                allow_repair=not args.no_repair,
+                cache=cache,
+                image_options=_build_image_options(args),
+                tiling=tiling,
+                workdir=workdir,
+                chunk_size=chunk_size,
+                output=_build_output(args),
+            )
+            results = run_batch(jobs, run_job, workers=args.workers, on_result=report)
+    print("Summary:")
+    print(format_summary(results))
+    _print_call_stats(session, cache)
+    _print_workdir(workdir)
+    _write_metrics(args, session, [result.stats for result in results if result.stats])
+    return results
+
+
+def _run_batch(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    _check_batch_args(args, parser)
+    jobs = _load_batch_jobs(args)
+    if jobs is None:
+        return 2
+    workdir = _build_workdir(args)
+    results = _import_jobs(args, parser, jobs, workdir=workdir)
+    _record_build(args, parser, workdir, results)
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _run_rebuild(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    from .rebuild import BuildManifest, format_plan, plan_rebuild, record_results
+
+    if not args.batch:
+        parser.error("rebuild works on a --batch directory or manifest")
+    _check_batch_args(args, parser)
+    # Unchanged stages are reused from the work dir, so rebuilds always resume.
+    workdir = _build_workdir(args, resume=True)
+    if workdir is None:
+        parser.error("rebuild with --transport stub needs --work-dir")
+    jobs = _load_batch_jobs(args)
+    if jobs is None:
+        return 2
+
+    settings = _build_settings(args, parser)
+    manifest = BuildManifest.load(_build_manifest_path(args, workdir))
+    plans = plan_rebuild(jobs, manifest, settings)
+    print("Rebuild plan:")
+    print(format_plan(plans))
+    stale = [plan.job for plan in plans if plan.stale]
+    if args.dry_run or not stale:
+        return 0
+    results = _import_jobs(args, parser, stale, workdir=workdir)
+    record_results(manifest, results, settings)
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _renormalize_workdir(args: argparse.Namespace) -> WorkDir:
+    return WorkDir(Path(args.work_dir) if args.work_dir else default_work_dir())
+
+
+def _renormalize_records(args: argparse.Namespace) -> list[Path] | None:
+    """The record files to renormalize; None (after printing why) when there are none."""
+    if not args.records:
+        workdir = _renormalize_workdir(args)
+        root = workdir.root
+        records = workdir.extracted_files()
+        if not records:
+            print(f"No saved step-2 records in {root}", file=sys.stderr)
+            return None
+        return records
+    records = []
+    for name in args.records:
+        path = Path(name)
+        if path.is_dir():
+            records.extend(sorted(path.glob("*.json")))
+        elif path.is_file():
+            records.append(path)
+        else:
+            print(f"Record not found: {path}", file=sys.stderr)
+            return None
+    return records
+
+
+def _run_renormalize(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    records = _renormalize_records(args)
+    if records is None:
+        return 2
+    from .renormalize import format_results, renormalize
+
+    started = time.perf_counter()
+    try:
+        results = renormalize(
+            records, workers=args.workers, dry_run=args.dry_run, output=_build_output(args)
+        )
+    except OutputError as exc:
+        print(f"Writing the packs failed: {exc}", file=sys.stderr)
+        return 2
+    if not args.dry_run:
+        from .rebuild import BuildManifest, record_renormalized
+
+        manifest_path = _build_manifest_path(args, _renormalize_workdir(args))
+        record_renormalized(BuildManifest.load(manifest_path), results)
+    print(format_results(results, dry_run=args.dry_run))
+    print(f"Renormalized {len(results)} packs in {time.perf_counter() - started:.2f}s.")
+    return 0 if all(result.ok for result in results) else 1
+
+
+def run(argv: list[str]) -> int:
+    if argv[:1] == [RENORMALIZE_COMMAND]:
+        parser = build_renormalize_parser()
+        return _run_renormalize(parser.parse_args(argv[1:]), parser)
+    rebuild = argv[:1] == [REBUILD_COMMAND]
+    parser = build_rebuild_parser() if rebuild else build_parser()
+    args = parser.parse_args(argv[1:] if rebuild else argv)
+    if args.memo_size < 0:
+        parser.error("--memo-size must be >= 0")
+    if args.memo_size != DEFAULT_MEMO_SIZE:
+        configure_memo(args.memo_size)
+    if args.transport in {"record", "replay"} and not args.transcripts:
+        parser.error(f"--transport {args.transport} requires --transcripts")
+    if rebuild:
+        return _run_rebuild(args, parser)
+    if args.batch:
+        return _run_batch(args, parser)
+    return _run_single(args, parser)
+
+
 def main() -> int:
     return run(sys.argv[1:])
@@ -1,12 +1,26 @@
 """Gemini (Vertex AI) client wrapper."""
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
 import os
 import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Generator, TypeVar
 
-from google import genai
-from google.genai import types
+from pydantic import ValidationError
 
+from .cache import ResponseCache, default_cache_dir, hash_key
+from .io import detect_mime_type
+from .metrics import RunMetrics, labels, measure
+from .ratelimit import RateLimiter, estimate_tokens
+from .retry import PARSE, RetryEvent, RetryPolicy, describe_error
 from .schema import (
     ExtractedPayload,
     ParseError,
@@ -14,27 +28,101 @@ from .schema import (
     assert_non_empty_pairs,
     parse_extracted_json,
     parse_raw_pairs_json,
+    repair_json,
  )
 
+if TYPE_CHECKING:
+    # google.genai takes most of a second to import: it is loaded only when a
+    # client or request config is built, so --help and offline commands skip it.
+    from google import genai
+    from google.genai import types
+
 
 class GeminiConfigError(RuntimeError):
     """Raised when project configuration is missing."""
 
 
-def detect_project() -> str:
-    """Resolve a GCP project id from env or gcloud config."""
-    env_project = os.environ.get("GOOGLE_CLOUD_PROJECT")
-    if env_project:
-        return env_project
+# gcloud takes about a second to start, so its answer is kept per process (and,
+# with a cache file, across runs) until the gcloud configuration changes.
+_gcloud_projects: dict[str, str] = {}
+_gcloud_projects_lock = threading.Lock()
+
+
+def default_project_cache_file() -> Path:
+    """Where the CLI keeps the resolved gcloud project between runs."""
+    return default_cache_dir().parent / "gcloud_project.json"
+
+
+def _gcloud_config_fingerprint() -> str:
+    """Changes whenever `gcloud config set project` or a config switch could."""
+    root = Path(os.environ.get("CLOUDSDK_CONFIG") or Path.home() / ".config" / "gcloud")
+    parts = [
+        os.environ.get("CLOUDSDK_CORE_PROJECT", ""),
+        os.environ.get("CLOUDSDK_ACTIVE_CONFIG_NAME", ""),
+    ]
+    for path in [root / "active_config", *sorted((root / "configurations").glob("config_*"))]:
+        try:
+            parts.append(f"{path.name}:{path.stat().st_mtime_ns}")
+        except OSError:
+            continue
+    return hash_key(*parts)
+
+
+def _read_project_cache(cache_file: Path, fingerprint: str) -> str | None:
+    try:
+        entry = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(entry, dict) or entry.get("fingerprint") != fingerprint:
+        return None
+    project = entry.get("project")
+    return project if isinstance(project, str) and project else None
+
+
+def _write_project_cache(cache_file: Path, fingerprint: str, project: str) -> None:
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"fingerprint": fingerprint, "project": project}, handle)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        pass  # The cache only saves a gcloud call; never fail the run over it.
+
 
+def _gcloud_project() -> str:
     try:
-        output = subprocess.check_output(
+        return subprocess.check_output(
             ["gcloud", "config", "get-value", "project"],
             stderr=subprocess.DEVNULL,
             text=True,
         ).strip()
     except (subprocess.SubprocessError, FileNotFoundError):
-        output = ""
+        return ""
+
+
+def detect_project(*, cache_file: Path | None = None) -> str:
+    """Resolve a GCP project id from env or gcloud config.
+
+    The gcloud lookup runs once per process and gcloud configuration; with
+    `cache_file` its result is also reused by later runs. `clear_project_cache`
+    forgets both.
+    """
+    env_project = os.environ.get("GOOGLE_CLOUD_PROJECT")
+    if env_project:
+        return env_project
+
+    fingerprint = _gcloud_config_fingerprint()
+    with _gcloud_projects_lock:
+        output = _gcloud_projects.get(fingerprint)
+        if output is None and cache_file is not None:
+            output = _read_project_cache(cache_file, fingerprint)
+        if output is None:
+            output = _gcloud_project()
+            if output and cache_file is not None:
+                _write_project_cache(cache_file, fingerprint, output)
+        if output:
+            _gcloud_projects[fingerprint] = output
 
     if not output:
         raise GeminiConfigError(
@@ -43,6 +131,274 @@ def detect_project() -> str:
     return output
 
 
+def clear_project_cache(cache_file: Path | None = None) -> None:
+    """Forget resolved gcloud projects, in this process and in `cache_file`."""
+    with _gcloud_projects_lock:
+        _gcloud_projects.clear()
+    if cache_file is not None:
+        cache_file.unlink(missing_ok=True)
+
+
+DEFAULT_LOCATION = "us-central1"
+DEFAULT_MAX_CONCURRENCY = 8
+# Raw pairs per step-2 call; longer lists risk truncated output and repair calls.
+DEFAULT_CHUNK_PAIRS = 60
+
+Contents = "list[types.Part | str] | str"
+PayloadT = TypeVar("PayloadT", RawPairsPayload, ExtractedPayload)
+
+
+@dataclass
+class CallStats:
+    """Counters for the remote calls made through one session."""
+
+    requests: int = 0
+    remote_repairs: int = 0
+    # Parse failures fixed by schema.repair_json; each one saved a remote
+    # repair (or retry) round-trip.
+    local_repairs: int = 0
+    # Resends after transient errors plus re-prompts after unparseable output.
+    retries: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def summary(self) -> str:
+        return (
+            f"{self.requests} requests, {self.remote_repairs} remote repairs, "
+            f"{self.local_repairs} local repairs (remote calls avoided), "
+            f"{self.retries} retries"
+        )
+
+
+class GeminiSession:
+    """Long-lived Vertex AI client shared by both extraction steps and all images.
+
+    The project id is resolved once (across runs too, with `project_cache_file`)
+    and the genai.Client (with its pooled HTTP connections) is created on the
+    first remote call, so cache hits never pay for client setup. Safe to share
+    between threads.
+
+    `timeout` (seconds) bounds each request. At most `max_concurrency` sync
+    requests are in flight across all threads, so batch workers, PDF tiles and
+    step-2 chunks share one cap; async calls get the same cap per event loop.
+
+    Transient failures (429, 5xx, timeouts) are resent per `retry_policy`; every
+    retry, transient or parse, is appended to `retry_events` and passed to
+    `on_retry`.
+
+    With a `rate_limiter`, every request (including retries) first waits for room
+    in its requests-per-minute and tokens-per-minute budgets, so concurrent
+    workers stay under quota instead of bursting into 429s.
+
+    With `metrics`, every attempt is recorded with its latency, outcome and
+    usage_metadata token counts.
+    """
+
+    def __init__(
+        self,
+        *,
+        project: str | None = None,
+        location: str = DEFAULT_LOCATION,
+        client: genai.Client | None = None,
+        timeout: float | None = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        retry_policy: RetryPolicy | None = None,
+        on_retry: Callable[[RetryEvent], None] | None = None,
+        rate_limiter: RateLimiter | None = None,
+        metrics: RunMetrics | None = None,
+        project_cache_file: Path | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self._project = project
+        self.location = location
+        self._client = client
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.on_retry = on_retry
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.project_cache_file = project_cache_file
+        self.retry_events: list[RetryEvent] = []
+        self.stats = CallStats()
+        self._lock = threading.Lock()
+        self._semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    @property
+    def project(self) -> str:
+        with self._lock:
+            if self._project is None:
+                self._project = detect_project(cache_file=self.project_cache_file)
+            return self._project
+
+    @property
+    def client(self) -> genai.Client:
+        if self._client is None:
+            from google import genai
+            from google.genai import types
+
+            project = self.project
+            http_options = None
+            if self.timeout is not None:
+                http_options = types.HttpOptions(timeout=int(self.timeout * 1000))
+            with self._lock:
+                if self._client is None:
+                    self._client = genai.Client(
+                        vertexai=True,
+                        project=project,
+                        location=self.location,
+                        http_options=http_options,
+                    )
+        return self._client
+
+    def record_retry(self, event: RetryEvent) -> None:
+        self.stats.add("retries")
+        with self._lock:
+            self.retry_events.append(event)
+        if self.on_retry:
+            self.on_retry(event)
+
+    def _retry_delay(self, exc: Exception, attempt: int, started: float) -> float | None:
+        delay = self.retry_policy.next_delay(
+            exc, attempt=attempt, elapsed=time.monotonic() - started
+        )
+        if delay is not None:
+            self.record_retry(
+                RetryEvent(kind="transient", attempt=attempt, reason=describe_error(exc), delay=delay)
+            )
+        return delay
+
+    def _settle(self, estimated: int, response: types.GenerateContentResponse) -> None:
+        if self.rate_limiter is None:
+            return
+        usage = getattr(response, "usage_metadata", None)
+        self.rate_limiter.settle(estimated, getattr(usage, "total_token_count", None))
+
+    def _record_attempt(
+        self,
+        attempt: int,
+        started: float,
+        *,
+        response: types.GenerateContentResponse | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        if self.metrics is None:
+            return
+        fields: dict[str, object] = {"attempt": attempt}
+        if error is not None:
+            fields["error"] = type(error).__name__
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            fields["prompt_tokens"] = getattr(usage, "prompt_token_count", None)
+            fields["output_tokens"] = getattr(usage, "candidates_token_count", None)
+            fields["total_tokens"] = getattr(usage, "total_token_count", None)
+        self.metrics.record("generate_content", time.perf_counter() - started, **fields)
+
+    def generate_content(
+        self,
+        *,
+        model: str,
+        contents: Contents,
+        config: types.GenerateContentConfig,
+    ) -> types.GenerateContentResponse:
+        started = time.monotonic()
+        estimated = estimate_tokens(contents)
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(estimated)
+            self.stats.add("requests")
+            attempt_started = time.perf_counter()
+            try:
+                with self._slots:
+                    # Time the request itself, not the wait for a free slot.
+                    attempt_started = time.perf_counter()
+                    response = self.client.models.generate_content(
+                        model=model, contents=contents, config=config
+                    )
+                self._settle(estimated, response)
+                self._record_attempt(attempt, attempt_started, response=response)
+                return response
+            except Exception as exc:
+                self._record_attempt(attempt, attempt_started, error=exc)
+                delay = self._retry_delay(exc, attempt, started)
+                if delay is None:
+                    raise
+            # Back off outside the slot so other requests can use it.
+            time.sleep(delay)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop, so keep one per running loop.
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                self._semaphores = {
+                    known: sem
+                    for known, sem in self._semaphores.items()
+                    if not known.is_closed()
+                }
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                self._semaphores[loop] = semaphore
+            return semaphore
+
+    async def generate_content_async(
+        self,
+        *,
+        model: str,
+        contents: Contents,
+        config: types.GenerateContentConfig,
+    ) -> types.GenerateContentResponse:
+        started = time.monotonic()
+        estimated = estimate_tokens(contents)
+        attempt = 0
+        while True:
+            attempt += 1
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(estimated)
+            self.stats.add("requests")
+            attempt_started = time.perf_counter()
+            try:
+                async with self._semaphore():
+                    # Time the request itself, not the wait for a free slot.
+                    attempt_started = time.perf_counter()
+                    response = await asyncio.wait_for(
+                        self.client.aio.models.generate_content(
+                            model=model, contents=contents, config=config
+                        ),
+                        timeout=self.timeout,
+                    )
+                self._settle(estimated, response)
+                self._record_attempt(attempt, attempt_started, response=response)
+                return response
+            except Exception as exc:
+                self._record_attempt(attempt, attempt_started, error=exc)
+                delay = self._retry_delay(exc, attempt, started)
+                if delay is None:
+                    raise
+            # Back off outside the semaphore so other requests can use the slot.
+            await asyncio.sleep(delay)
+
+    def close(self) -> None:
+        """Release pooled connections (only if a client was created)."""
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None and hasattr(client, "close"):
+            client.close()
+
+    def __enter__(self) -> "GeminiSession":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
 def _extract_text(response: types.GenerateContentResponse) -> str:
     text = response.text
     if not text:
@@ -51,6 +407,8 @@ def _extract_text(response: types.GenerateContentResponse) -> str:
 
 
 def _default_config(*, response_schema: dict) -> types.GenerateContentConfig:
+    from google.genai import types
+
     # temperature=0 + seed makes this as deterministic as Gemini/Vertex supports.
     return types.GenerateContentConfig(
         temperature=0,
@@ -63,39 +421,128 @@ def _default_config(*, response_schema: dict) -> types.GenerateContentConfig:
     )
 
 
-def _call_json_with_repair(
+_RAW_PAIRS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "pairs": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "src": {"type": "STRING"},
+                    "dst": {"type": "STRING"},
+                },
+                "required": ["src", "dst"],
+            },
+        }
+    },
+    "required": ["pairs"],
+}
+_RAW_PAIRS_HINT = '{"pairs": [{"src": "...", "dst": "..."}]}'
+
+_ITEMS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "items": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "surface": {"type": "STRING"},
+                    "lemma": {"type": "STRING"},
+                    "lemma_dst": {"type": "STRING"},
+                    "src": {"type": "STRING"},
+                    "dst": {"type": "STRING"},
+                },
+            },
+        }
+    },
+    "required": ["items"],
+}
+_ITEMS_HINT = '{"items": [{"surface": "...", "lemma": "...", "lemma_dst": "...", "dst": "..."}]}'
+
+
+def _cache_key(
+    step: str,
     *,
-    client: genai.Client,
     model: str,
-    contents: list[types.Part | str] | str,
     config: types.GenerateContentConfig,
-    parse_fn,
+    parts: list[str | bytes],
+) -> str:
+    # Key on everything that shapes the response: step, model, config, prompt, image.
+    return hash_key(step, model, config.model_dump_json(exclude_none=True), *parts)
+
+
+def _items_prompt(prompt: str, pairs_json: str) -> str:
+    return (
+        f"{prompt}\n\n"
+        "Input pairs JSON:\n"
+        f"{pairs_json}\n"
+    )
+
+
+def _parse_with_local_repair(
+    parse_fn: Callable[[str], PayloadT], text: str, stats: CallStats
+) -> PayloadT:
+    try:
+        return parse_fn(text)
+    except ParseError as exc:
+        original = exc
+    repaired = repair_json(text)
+    if repaired is not None:
+        try:
+            payload = parse_fn(repaired)
+        except ParseError:
+            pass
+        else:
+            stats.add("local_repairs")
+            return payload
+    raise original
+
+
+def _repair_attempts(
+    *,
+    contents: Contents,
+    parse_fn: Callable[[str], PayloadT],
     allow_repair: bool,
     repair_schema_hint: str,
-) -> object:
+    session: GeminiSession,
+) -> Generator[Contents, str, PayloadT]:
+    """The parse-retry/repair conversation, independent of how requests are sent.
+
+    Yields the contents of each request (a list, or a bare string for a remote
+    repair prompt) and receives the response text back; returns the parsed
+    payload. The sync and async callers only differ in how they drive this
+    generator; they throw `ParseError` in for empty responses.
+    Transient transport errors never reach here: the session resends those.
+
+    Unparseable output first goes through the local `repair_json` pass; only
+    if that fails is a remote repair request sent.
+    """
+    stats = session.stats
     last_error: ParseError | None = None
     retry_suffix = "\nReturn strictly valid JSON only."
+    parse_attempts = session.retry_policy.parse_attempts
 
-    for attempt in range(3):
-        response = client.models.generate_content(
-            model=model,
-            contents=(
+    for attempt in range(parse_attempts):
+        if attempt and last_error is not None:
+            session.record_retry(RetryEvent(kind=PARSE, attempt=attempt, reason=str(last_error)))
+        raw_text = ""
+        try:
+            raw_text = yield (
                 [contents + ("" if attempt == 0 else retry_suffix)]
                 if isinstance(contents, str)
                 else [
                     (contents[0] + ("" if attempt == 0 else retry_suffix)),
                     *contents[1:],
                 ]
-            ),
-            config=config,
-        )
-        raw_text = _extract_text(response)
-
-        try:
-            return parse_fn(raw_text)
+            )
+            with measure(session.metrics, "parse"):
+                return _parse_with_local_repair(parse_fn, raw_text, stats)
         except ParseError as exc:
             last_error = exc
-            if not allow_repair:
+            # Nothing to repair in an empty response; just re-prompt.
+            if not allow_repair or not raw_text:
                 continue
 
         repair_prompt = (
@@ -104,62 +551,150 @@ def _call_json_with_repair(
             f"Schema: {repair_schema_hint}\n\n"
             f"Text to fix:\n{raw_text}"
         )
-        repair_response = client.models.generate_content(
-            model=model,
-            contents=repair_prompt,
-            config=config,
-        )
-        repaired_text = _extract_text(repair_response)
+        stats.add("remote_repairs")
         try:
-            return parse_fn(repaired_text)
+            repaired_text = yield repair_prompt
+            with measure(session.metrics, "parse"):
+                return _parse_with_local_repair(parse_fn, repaired_text, stats)
         except ParseError as exc:
             last_error = exc
 
     raise last_error or ParseError("Failed to parse model output.")
 
 
+def _advance(
+    attempts: Generator[Contents, str, PayloadT],
+    response: types.GenerateContentResponse,
+) -> Contents:
+    try:
+        text = _extract_text(response)
+    except ParseError as exc:
+        # An empty response is a parse failure: re-prompt like any other.
+        return attempts.throw(exc)
+    return attempts.send(text)
+
+
+def _call_json_with_repair(
+    *,
+    session: GeminiSession,
+    step: str,
+    model: str,
+    contents: Contents,
+    config: types.GenerateContentConfig,
+    parse_fn: Callable[[str], PayloadT],
+    allow_repair: bool,
+    repair_schema_hint: str,
+) -> PayloadT:
+    attempts = _repair_attempts(
+        contents=contents,
+        parse_fn=parse_fn,
+        allow_repair=allow_repair,
+        repair_schema_hint=repair_schema_hint,
+        session=session,
+    )
+    request = next(attempts)
+    while True:
+        with labels(step=step, repair=isinstance(request, str)):
+            response = session.generate_content(model=model, contents=request, config=config)
+            try:
+                request = _advance(attempts, response)
+            except StopIteration as done:
+                return done.value
+
+
+async def _call_json_with_repair_async(
+    *,
+    session: GeminiSession,
+    step: str,
+    model: str,
+    contents: Contents,
+    config: types.GenerateContentConfig,
+    parse_fn: Callable[[str], PayloadT],
+    allow_repair: bool,
+    repair_schema_hint: str,
+) -> PayloadT:
+    attempts = _repair_attempts(
+        contents=contents,
+        parse_fn=parse_fn,
+        allow_repair=allow_repair,
+        repair_schema_hint=repair_schema_hint,
+        session=session,
+    )
+    request = next(attempts)
+    while True:
+        with labels(step=step, repair=isinstance(request, str)):
+            response = await session.generate_content_async(
+                model=model, contents=request, config=config
+            )
+            try:
+                request = _advance(attempts, response)
+            except StopIteration as done:
+                return done.value
+
+
+def _cached_payload(
+    cache: ResponseCache | None, cache_key: str, payload_type: type[PayloadT]
+) -> PayloadT | None:
+    if cache is None:
+        return None
+    cached = cache.get(cache_key)
+    if cached is None:
+        return None
+    try:
+        return payload_type.model_validate_json(cached)
+    except ValidationError:
+        # Corrupt, or written by an older schema: fetch it again.
+        cache.discard(cache_key)
+        return None
+
+
+def _store_payload(cache: ResponseCache | None, cache_key: str, payload: PayloadT) -> PayloadT:
+    if cache is not None:
+        cache.put(cache_key, payload.model_dump_json())
+    return payload
+
+
 def extract_raw_pairs(
     *,
     image_bytes: bytes,
     prompt: str,
     model: str,
-    project: str | None,
-    location: str,
+    mime_type: str | None = None,
+    project: str | None = None,
+    location: str = DEFAULT_LOCATION,
     allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    session: GeminiSession | None = None,
 ) -> RawPairsPayload:
-    """Step 1: call Gemini Vision to transcribe raw src/dst pairs."""
-    project_id = project or detect_project()
-    client = genai.Client(vertexai=True, project=project_id, location=location)
-
-    image_part = types.Part.from_bytes(data=image_bytes, mime_type="image/jpeg")
-    response_schema = {
-        "type": "OBJECT",
-        "properties": {
-            "pairs": {
-                "type": "ARRAY",
-                "items": {
-                    "type": "OBJECT",
-                    "properties": {
-                        "src": {"type": "STRING"},
-                        "dst": {"type": "STRING"},
-                    },
-                    "required": ["src", "dst"],
-                },
-            }
-        },
-        "required": ["pairs"],
-    }
-    config = _default_config(response_schema=response_schema)
-
-    return _call_json_with_repair(
-        client=client,
+    """Step 1: call Gemini Vision to transcribe raw src/dst pairs.
+
+    The image MIME type is detected from the bytes unless `mime_type` is given.
+    """
+    config = _default_config(response_schema=_RAW_PAIRS_SCHEMA)
+    cache_key = ""
+    if cache is not None:
+        cache_key = _cache_key("raw_pairs", model=model, config=config, parts=[prompt, image_bytes])
+    cached = _cached_payload(cache, cache_key, RawPairsPayload)
+    if cached is not None:
+        return cached
+
+    from google.genai import types
+
+    session = session or GeminiSession(project=project, location=location)
+    image_part = types.Part.from_bytes(
+        data=image_bytes, mime_type=mime_type or detect_mime_type(image_bytes)
+    )
+    payload = _call_json_with_repair(
+        session=session,
+        step="raw_pairs",
         model=model,
         contents=[prompt, image_part],
         config=config,
         parse_fn=parse_raw_pairs_json,
         allow_repair=allow_repair,
-        repair_schema_hint='{"pairs": [{"src": "...", "dst": "..."}]}',
+        repair_schema_hint=_RAW_PAIRS_HINT,
     )
+    return _store_payload(cache, cache_key, payload)
 
 
 def pairs_to_items(
@@ -167,48 +702,120 @@ def pairs_to_items(
     pairs_json: str,
     prompt: str,
     model: str,
-    project: str | None,
-    location: str,
+    project: str | None = None,
+    location: str = DEFAULT_LOCATION,
     allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    session: GeminiSession | None = None,
 ) -> ExtractedPayload:
     """Step 2: convert raw pairs JSON into cleaned extraction JSON."""
-    project_id = project or detect_project()
-    client = genai.Client(vertexai=True, project=project_id, location=location)
+    config = _default_config(response_schema=_ITEMS_SCHEMA)
+    full_prompt = _items_prompt(prompt, pairs_json)
+    cache_key = ""
+    if cache is not None:
+        cache_key = _cache_key("items", model=model, config=config, parts=[full_prompt])
+    cached = _cached_payload(cache, cache_key, ExtractedPayload)
+    if cached is not None:
+        return cached
 
-    response_schema = {
-        "type": "OBJECT",
-        "properties": {
-            "items": {
-                "type": "ARRAY",
-                "items": {
-                    "type": "OBJECT",
-                    "properties": {
-                        "surface": {"type": "STRING"},
-                        "lemma": {"type": "STRING"},
-                        "lemma_dst": {"type": "STRING"},
-                        "src": {"type": "STRING"},
-                        "dst": {"type": "STRING"},
-                    },
-                },
-            }
-        },
-        "required": ["items"],
-    }
-    config = _default_config(response_schema=response_schema)
-    full_prompt = (
-        f"{prompt}\n\n"
-        "Input pairs JSON:\n"
-        f"{pairs_json}\n"
-    )
-    return _call_json_with_repair(
-        client=client,
+    session = session or GeminiSession(project=project, location=location)
+    payload = _call_json_with_repair(
+        session=session,
+        step="items",
         model=model,
         contents=full_prompt,
         config=config,
         parse_fn=parse_extracted_json,
         allow_repair=allow_repair,
-        repair_schema_hint='{"items": [{"surface": "...", "lemma": "...", "lemma_dst": "...", "dst": "..."}]}',
+        repair_schema_hint=_ITEMS_HINT,
     )
+    return _store_payload(cache, cache_key, payload)
+
+
+@dataclass(frozen=True)
+class PairChunks:
+    """Step-2 input split into bounded chunks, each cleaned by its own call."""
+
+    chunks: tuple[str, ...]
+    # Estimated input tokens saved by sending compact instead of indented JSON.
+    tokens_saved: int = 0
+
+    @property
+    def key(self) -> str:
+        """All chunks as one string, for checkpoints of the whole step."""
+        return "\n".join(self.chunks)
+
+
+def split_raw_pairs(
+    raw_pairs: RawPairsPayload, *, chunk_size: int | None = DEFAULT_CHUNK_PAIRS
+) -> PairChunks:
+    """The usable step-1 pairs as compact JSON, at most `chunk_size` pairs per chunk.
+
+    A long list in one call can overrun the output-token limit, which truncates
+    the JSON and sets off repair calls. None (or 0) keeps a single chunk.
+    """
+    pairs = assert_non_empty_pairs(raw_pairs.pairs)
+    if chunk_size is not None and chunk_size < 0:
+        raise ValueError("chunk_size must be >= 0")
+    size = chunk_size or len(pairs)
+    chunks = tuple(
+        RawPairsPayload(pairs=pairs[start : start + size]).model_dump_json()
+        for start in range(0, len(pairs), size)
+    )
+    indented = RawPairsPayload(pairs=pairs).model_dump_json(indent=2)
+    saved = estimate_tokens(indented) - sum(estimate_tokens(chunk) for chunk in chunks)
+    return PairChunks(chunks, max(0, saved))
+
+
+def _chunk_label(index: int, count: int) -> str:
+    return f"{index + 1}/{count}"
+
+
+def _concat_items(payloads: list[ExtractedPayload]) -> ExtractedPayload:
+    return ExtractedPayload(items=[item for payload in payloads for item in payload.items])
+
+
+def pairs_to_items_chunked(
+    *,
+    chunks: PairChunks,
+    prompt: str,
+    model: str,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    session: GeminiSession,
+) -> ExtractedPayload:
+    """Step 2 for every chunk on up to `session.max_concurrency` threads.
+
+    The threads' requests count against the session's shared cap, so chunks of
+    concurrent batch jobs never add up to more requests in flight than that.
+    The items are concatenated in chunk order; each chunk is cached on its own.
+    """
+
+    def run(index: int) -> ExtractedPayload:
+        return pairs_to_items(
+            pairs_json=chunks.chunks[index],
+            prompt=prompt,
+            model=model,
+            allow_repair=allow_repair,
+            cache=cache,
+            session=session,
+        )
+
+    if len(chunks.chunks) == 1:
+        return run(0)
+
+    def run_labelled(index: int) -> ExtractedPayload:
+        with labels(chunk=_chunk_label(index, len(chunks.chunks))):
+            return run(index)
+
+    workers = max(1, min(session.max_concurrency, len(chunks.chunks)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Each thread gets a copy of the caller's context, so metrics labels carry over.
+        futures = [
+            pool.submit(contextvars.copy_context().run, run_labelled, index)
+            for index in range(len(chunks.chunks))
+        ]
+        return _concat_items([future.result() for future in futures])
 
 
 def extract_pairs(
@@ -217,27 +824,182 @@ def extract_pairs(
     image_prompt: str,
     transform_prompt: str,
     model: str,
-    project: str | None,
-    location: str,
+    image_mime_type: str | None = None,
+    project: str | None = None,
+    location: str = DEFAULT_LOCATION,
     allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    chunk_size: int | None = DEFAULT_CHUNK_PAIRS,
+    session: GeminiSession | None = None,
 ) -> ExtractedPayload:
-    """2-step extraction: image -> raw pairs -> cleaned extraction JSON."""
+    """2-step extraction: image -> raw pairs -> cleaned extraction JSON.
+
+    Pass a `session` to reuse one client across images; otherwise a session is
+    created here and shared by both steps.
+    """
+    session = session or GeminiSession(project=project, location=location)
     raw_pairs = extract_raw_pairs(
         image_bytes=image_bytes,
         prompt=image_prompt,
         model=model,
-        project=project,
-        location=location,
+        mime_type=image_mime_type,
+        allow_repair=allow_repair,
+        cache=cache,
+        session=session,
+    )
+    return pairs_to_items_chunked(
+        chunks=split_raw_pairs(raw_pairs, chunk_size=chunk_size),
+        prompt=transform_prompt,
+        model=model,
+        allow_repair=allow_repair,
+        cache=cache,
+        session=session,
+    )
+
+
+async def extract_raw_pairs_async(
+    *,
+    image_bytes: bytes,
+    prompt: str,
+    model: str,
+    mime_type: str | None = None,
+    project: str | None = None,
+    location: str = DEFAULT_LOCATION,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    session: GeminiSession | None = None,
+) -> RawPairsPayload:
+    """Async step 1; see `extract_raw_pairs`."""
+    config = _default_config(response_schema=_RAW_PAIRS_SCHEMA)
+    cache_key = ""
+    if cache is not None:
+        cache_key = _cache_key("raw_pairs", model=model, config=config, parts=[prompt, image_bytes])
+    cached = _cached_payload(cache, cache_key, RawPairsPayload)
+    if cached is not None:
+        return cached
+
+    from google.genai import types
+
+    session = session or GeminiSession(project=project, location=location)
+    image_part = types.Part.from_bytes(
+        data=image_bytes, mime_type=mime_type or detect_mime_type(image_bytes)
+    )
+    payload = await _call_json_with_repair_async(
+        session=session,
+        step="raw_pairs",
+        model=model,
+        contents=[prompt, image_part],
+        config=config,
+        parse_fn=parse_raw_pairs_json,
+        allow_repair=allow_repair,
+        repair_schema_hint=_RAW_PAIRS_HINT,
+    )
+    return _store_payload(cache, cache_key, payload)
+
+
+async def pairs_to_items_async(
+    *,
+    pairs_json: str,
+    prompt: str,
+    model: str,
+    project: str | None = None,
+    location: str = DEFAULT_LOCATION,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    session: GeminiSession | None = None,
+) -> ExtractedPayload:
+    """Async step 2; see `pairs_to_items`."""
+    config = _default_config(response_schema=_ITEMS_SCHEMA)
+    full_prompt = _items_prompt(prompt, pairs_json)
+    cache_key = ""
+    if cache is not None:
+        cache_key = _cache_key("items", model=model, config=config, parts=[full_prompt])
+    cached = _cached_payload(cache, cache_key, ExtractedPayload)
+    if cached is not None:
+        return cached
+
+    session = session or GeminiSession(project=project, location=location)
+    payload = await _call_json_with_repair_async(
+        session=session,
+        step="items",
+        model=model,
+        contents=full_prompt,
+        config=config,
+        parse_fn=parse_extracted_json,
+        allow_repair=allow_repair,
+        repair_schema_hint=_ITEMS_HINT,
+    )
+    return _store_payload(cache, cache_key, payload)
+
+
+async def pairs_to_items_chunked_async(
+    *,
+    chunks: PairChunks,
+    prompt: str,
+    model: str,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    session: GeminiSession,
+) -> ExtractedPayload:
+    """Async `pairs_to_items_chunked`; the session's semaphore bounds the calls in flight."""
+
+    async def run(index: int) -> ExtractedPayload:
+        return await pairs_to_items_async(
+            pairs_json=chunks.chunks[index],
+            prompt=prompt,
+            model=model,
+            allow_repair=allow_repair,
+            cache=cache,
+            session=session,
+        )
+
+    if len(chunks.chunks) == 1:
+        return await run(0)
+
+    async def run_labelled(index: int) -> ExtractedPayload:
+        with labels(chunk=_chunk_label(index, len(chunks.chunks))):
+            return await run(index)
+
+    payloads = await asyncio.gather(
+        *(run_labelled(index) for index in range(len(chunks.chunks)))
+    )
+    return _concat_items(list(payloads))
+
+
+async def extract_pairs_async(
+    *,
+    image_bytes: bytes,
+    image_prompt: str,
+    transform_prompt: str,
+    model: str,
+    image_mime_type: str | None = None,
+    project: str | None = None,
+    location: str = DEFAULT_LOCATION,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    chunk_size: int | None = DEFAULT_CHUNK_PAIRS,
+    session: GeminiSession | None = None,
+) -> ExtractedPayload:
+    """Async 2-step extraction; see `extract_pairs`.
+
+    Run many of these with asyncio.gather on one shared session: the session's
+    `max_concurrency` caps requests in flight and `timeout` bounds each one.
+    """
+    session = session or GeminiSession(project=project, location=location)
+    raw_pairs = await extract_raw_pairs_async(
+        image_bytes=image_bytes,
+        prompt=image_prompt,
+        model=model,
+        mime_type=image_mime_type,
         allow_repair=allow_repair,
+        cache=cache,
+        session=session,
     )
-    # Keep the intermediate JSON stable and explicit for the second call.
-    filtered = RawPairsPayload(pairs=assert_non_empty_pairs(raw_pairs.pairs))
-    pairs_json = filtered.model_dump_json(ensure_ascii=False, indent=2)
-    return pairs_to_items(
-        pairs_json=pairs_json,
+    return await pairs_to_items_chunked_async(
+        chunks=split_raw_pairs(raw_pairs, chunk_size=chunk_size),
         prompt=transform_prompt,
         model=model,
-        project=project,
-        location=location,
         allow_repair=allow_repair,
+        cache=cache,
+        session=session,
     )
@@ -0,0 +1,209 @@
+"""Split scanned PDFs into pages and tall images into overlapping tiles.
+
+The vision call times out or drops rows on very tall pages and cannot take a
+whole chapter at once. Each page or tile gets its own step-1 call (run
+concurrently) and the tiles' pairs are merged back into one list before step 2,
+dropping the rows that neighbouring tiles both saw in their shared band.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import math
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator
+
+from .io import ImagePreprocessError
+from .metrics import labels
+from .normalize import normalize_text
+
+if TYPE_CHECKING:
+    # The CLI imports this module for its defaults; keep pydantic out of --help.
+    from .schema import RawPair, RawPairsPayload
+
+PDF_SUFFIXES = {".pdf"}
+DEFAULT_PDF_DPI = 200
+DEFAULT_TILE_OVERLAP = 200
+# Rendered PDF pages and cut tiles are re-encoded at this JPEG quality.
+TILE_QUALITY = 90
+
+
+@dataclass(frozen=True)
+class TilingOptions:
+    """How a source file is cut before step 1. The defaults only split PDFs into pages."""
+
+    # Pages taller than this many pixels are cut into tiles; None never tiles.
+    tile_height: int | None = None
+    # Pixels shared by vertically adjacent tiles, so no row is cut in both.
+    overlap: int = DEFAULT_TILE_OVERLAP
+    pdf_dpi: int = DEFAULT_PDF_DPI
+
+    def __post_init__(self) -> None:
+        if self.tile_height is not None and not 0 <= self.overlap < self.tile_height:
+            raise ValueError("tile overlap must be >= 0 and smaller than the tile height")
+
+
+@dataclass(frozen=True)
+class Tile:
+    """One piece of a source file, sent to step 1 on its own."""
+
+    data: bytes
+    page: int = 1
+    index: int = 1
+    count: int = 1
+    # Share of this tile's height that the previous tile on the page also covered.
+    overlap_before: float = 0.0
+
+    @property
+    def label(self) -> str:
+        if self.count == 1:
+            return f"page {self.page}"
+        return f"page {self.page} tile {self.index}/{self.count}"
+
+
+def is_pdf(data: bytes) -> bool:
+    return data.startswith(b"%PDF-")
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise ImagePreprocessError(
+            "Tiling needs Pillow (pip install -r requirements-optional.txt)."
+        ) from exc
+    return Image
+
+
+def _encode(image) -> bytes:
+    out = BytesIO()
+    image = image.convert("L" if image.mode == "L" else "RGB")
+    image.save(out, format="JPEG", quality=TILE_QUALITY)
+    return out.getvalue()
+
+
+def _pdf_pages(data: bytes, dpi: int) -> Iterator:
+    try:
+        import pypdfium2 as pdfium
+    except ImportError as exc:
+        raise ImagePreprocessError(
+            "PDF input needs pypdfium2 (pip install -r requirements-optional.txt)."
+        ) from exc
+    try:
+        document = pdfium.PdfDocument(data)
+    except pdfium.PdfiumError as exc:
+        raise ImagePreprocessError(f"Could not open PDF: {exc}") from exc
+    try:
+        for page in document:
+            yield page.render(scale=dpi / 72).to_pil()
+    finally:
+        document.close()
+
+
+def _tile_page(image, page: int, options: TilingOptions) -> list[Tile]:
+    height = options.tile_height
+    if height is None or image.height <= height:
+        return [Tile(_encode(image), page=page)]
+    step = height - options.overlap
+    count = math.ceil((image.height - options.overlap) / step)
+    tiles = []
+    previous_bottom = 0
+    for index in range(count):
+        # The last tile is pulled up to end at the bottom edge (more overlap, same height).
+        top = min(index * step, image.height - height)
+        overlap = max(0, previous_bottom - top) / height if index else 0.0
+        crop = image.crop((0, top, image.width, top + height))
+        tiles.append(Tile(_encode(crop), page, index + 1, count, overlap))
+        previous_bottom = top + height
+    return tiles
+
+
+def split_source(data: bytes, options: TilingOptions | None = None) -> list[Tile]:
+    """Pages of a PDF, or tiles of a tall image; a normal image is returned untouched."""
+    options = options or TilingOptions()
+    if is_pdf(data):
+        tiles: list[Tile] = []
+        for page, image in enumerate(_pdf_pages(data, options.pdf_dpi), start=1):
+            tiles.extend(_tile_page(image, page, options))
+        if not tiles:
+            raise ImagePreprocessError("PDF has no pages.")
+        return tiles
+    if options.tile_height is None:
+        return [Tile(data)]
+    try:
+        image = _pillow().open(BytesIO(data))
+        image.load()
+    except OSError as exc:
+        raise ImagePreprocessError(f"Could not decode image: {exc}") from exc
+    if image.height <= options.tile_height:
+        return [Tile(data)]
+    return _tile_page(image, 1, options)
+
+
+def _pair_key(pair: RawPair) -> tuple[str, str]:
+    return normalize_text(pair.src).casefold(), normalize_text(pair.dst).casefold()
+
+
+def _band(count: int, share: float) -> int:
+    # Rows expected in the shared band, plus slack for a row cut at the seam.
+    return math.ceil(count * share) + 2
+
+
+def merge_tile_pairs(tiles: list[Tile], payloads: list[RawPairsPayload]) -> RawPairsPayload:
+    """Concatenate the tiles' pairs in page order, dropping overlap duplicates.
+
+    A pair at the top of a tile is dropped when the previous tile on the same page
+    has the same pair (after normalization) near its bottom. Repeats elsewhere
+    are kept; build_phrasepack de-duplicates identical pairs anyway.
+    """
+    from .schema import RawPairsPayload
+
+    merged: list[RawPair] = []
+    previous: list[RawPair] = []
+    for tile, payload in zip(tiles, payloads, strict=True):
+        pairs = list(payload.pairs)
+        if tile.index > 1 and tile.overlap_before and previous:
+            tail = previous[-_band(len(previous), tile.overlap_before) :]
+            seen = {_pair_key(pair) for pair in tail}
+            head = _band(len(pairs), tile.overlap_before)
+            pairs = [pair for pair in pairs[:head] if _pair_key(pair) not in seen] + pairs[head:]
+        merged.extend(pairs)
+        previous = list(payload.pairs)
+    return RawPairsPayload(pairs=merged)
+
+
+def extract_tiles(
+    tiles: list[Tile],
+    extract: Callable[[Tile], RawPairsPayload],
+    *,
+    workers: int,
+) -> RawPairsPayload:
+    """Run `extract` on every tile on up to `workers` threads and merge the results."""
+    if len(tiles) == 1:
+        return merge_tile_pairs(tiles, [extract(tiles[0])])
+
+    def run(tile: Tile) -> RawPairsPayload:
+        with labels(tile=tile.label):
+            return extract(tile)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(tiles)))) as pool:
+        # Each thread gets a copy of the caller's context, so metrics labels carry over.
+        futures = [pool.submit(contextvars.copy_context().run, run, tile) for tile in tiles]
+        return merge_tile_pairs(tiles, [future.result() for future in futures])
+
+
+async def extract_tiles_async(
+    tiles: list[Tile],
+    extract: Callable[[Tile], Awaitable[RawPairsPayload]],
+) -> RawPairsPayload:
+    """Async `extract_tiles`; the session's semaphore bounds the calls in flight."""
+    if len(tiles) == 1:
+        return merge_tile_pairs(tiles, [await extract(tiles[0])])
+
+    async def run(tile: Tile) -> RawPairsPayload:
+        with labels(tile=tile.label):
+            return await extract(tile)
+
+    return merge_tile_pairs(tiles, list(await asyncio.gather(*(run(tile) for tile in tiles))))
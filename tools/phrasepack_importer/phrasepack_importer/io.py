@@ -1,7 +1,13 @@
 """File IO helpers for the phrasepack importer."""
 from __future__ import annotations
 
+import gzip
 import json
+import os
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 from typing import Any
 
@@ -11,10 +17,253 @@ def read_image_bytes(path: Path) -> bytes:
     return path.read_bytes()
 
 
-def write_json(path: Path, payload: dict[str, Any]) -> None:
-    """Write JSON to disk with stable formatting."""
+class ImagePreprocessError(RuntimeError):
+    """Raised when an image cannot be preprocessed."""
+
+
+_MIME_SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+]
+
+
+def detect_mime_type(data: bytes) -> str:
+    """Detect the image MIME type from magic bytes (JPEG if unknown)."""
+    for signature, mime_type in _MIME_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[4:12] in (b"ftypheic", b"ftypheix", b"ftypmif1"):
+        return "image/heic"
+    return "image/jpeg"
+
+
+@dataclass(frozen=True)
+class ImageOptions:
+    """Preprocessing applied before upload. The defaults leave the image untouched."""
+
+    max_long_edge: int | None = None
+    grayscale: bool = False
+    # "jpeg" or "webp" re-encodes at `quality`; None keeps the original encoding
+    # unless another option forces a re-encode (then JPEG is used).
+    format: str | None = None
+    quality: int = 85
+    auto_crop: bool = False
+    # Pixels darker than this (0-255, after grayscale) count as page content.
+    crop_threshold: int = 200
+
+    @property
+    def is_noop(self) -> bool:
+        return not (self.max_long_edge or self.grayscale or self.format or self.auto_crop)
+
+
+@dataclass(frozen=True)
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+
+    @property
+    def size_summary(self) -> str:
+        return (
+            f"{_format_bytes(self.original_bytes)} -> {_format_bytes(len(self.data))} "
+            f"({self.mime_type})"
+        )
+
+
+def _format_bytes(count: int) -> str:
+    if count >= 1024 * 1024:
+        return f"{count / (1024 * 1024):.1f} MB"
+    return f"{count / 1024:.0f} KB"
+
+
+def _content_bbox(image, threshold: int) -> tuple[int, int, int, int] | None:
+    # Mark pixels darker than the threshold and take their bounding box.
+    mask = image.convert("L").point(lambda value: 255 if value < threshold else 0)
+    return mask.getbbox()
+
+
+def _reencode(data: bytes, options: ImageOptions, fmt: str) -> bytes:
+    from PIL import Image, ImageOps
+
+    image = Image.open(BytesIO(data))
+    # Phone photos store rotation in EXIF; apply it before cropping/resizing.
+    image = ImageOps.exif_transpose(image)
+
+    if options.grayscale:
+        image = image.convert("L")
+    elif image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    if options.auto_crop:
+        bbox = _content_bbox(image, options.crop_threshold)
+        if bbox:
+            margin = max(4, min(image.size) // 100)
+            left, top, right, bottom = bbox
+            image = image.crop(
+                (
+                    max(0, left - margin),
+                    max(0, top - margin),
+                    min(image.width, right + margin),
+                    min(image.height, bottom + margin),
+                )
+            )
+
+    if options.max_long_edge and max(image.size) > options.max_long_edge:
+        image.thumbnail((options.max_long_edge, options.max_long_edge), Image.LANCZOS)
+
+    out = BytesIO()
+    image.save(out, format=fmt.upper(), quality=options.quality)
+    return out.getvalue()
+
+
+def preprocess_image(data: bytes, options: ImageOptions) -> PreparedImage:
+    """Crop, grayscale, downscale and re-encode an image for upload."""
+    if options.is_noop:
+        return PreparedImage(data=data, mime_type=detect_mime_type(data), original_bytes=len(data))
+
+    try:
+        from PIL import Image
+    except ImportError as exc:
+        raise ImagePreprocessError(
+            "Image preprocessing needs Pillow (pip install -r requirements-optional.txt)."
+        ) from exc
+
+    fmt = (options.format or "jpeg").lower()
+    if fmt not in ("jpeg", "webp"):
+        raise ImagePreprocessError(f"Unsupported image format: {options.format}")
+    # Pillow decodes lazily, so a corrupt file can fail at any step, not just in
+    # Image.open; some plugins report bad data as SyntaxError.
+    try:
+        encoded = _reencode(data, options, fmt)
+    except (OSError, SyntaxError, Image.DecompressionBombError) as exc:
+        raise ImagePreprocessError(f"Could not decode image: {exc}") from exc
+    return PreparedImage(data=encoded, mime_type=f"image/{fmt}", original_bytes=len(data))
+
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+class OutputError(RuntimeError):
+    """Raised when a pack's output (e.g. a precompressed sibling) cannot be produced."""
+
+
+@dataclass(frozen=True)
+class OutputOptions:
+    """How `write_json` lays out a file. The defaults write indented JSON only."""
+
+    minify: bool = False
+    # Precompressed siblings (<name>.json.gz / .br) for static hosts that serve them.
+    gzip: bool = False
+    brotli: bool = False
+
+    @property
+    def suffixes(self) -> tuple[str, ...]:
+        return (".gz",) * self.gzip + (".br",) * self.brotli
+
+
+@dataclass(frozen=True)
+class WriteResult:
+    """What `write_json` produced: sizes in bytes, and whether the JSON changed."""
+
+    path: Path
+    size: int
+    changed: bool
+    # (suffix, size) of each precompressed sibling.
+    compressed: tuple[tuple[str, int], ...] = ()
+
+    def summary(self) -> str:
+        sizes = [f"{self.size} B"]
+        sizes.extend(f"{suffix[1:]} {size} B" for suffix, size in self.compressed)
+        return ", ".join(sizes) + ("" if self.changed else " unchanged")
+
+
+def encode_json(payload: dict[str, Any], *, minify: bool = False) -> bytes:
+    """Stable UTF-8 JSON: indented by default, without whitespace when `minify`."""
+    if minify:
+        text = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(payload, ensure_ascii=False, indent=2)
+    return (text + "\n").encode("utf-8")
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file and rename, so readers never see a partial file."""
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n")
+    while True:
+        tmp_name = path.parent / f".{path.name}.{uuid.uuid4().hex[:12]}.tmp"
+        try:
+            # Unlike mkstemp's 0600, mode 0666 lets the kernel apply the umask, so
+            # published packs get the usual permissions.
+            fd = os.open(tmp_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+        except FileExistsError:
+            continue
+        break
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        tmp_name.unlink(missing_ok=True)
+        raise
+
+
+def _write_if_changed(path: Path, data: bytes) -> bool:
+    try:
+        # The size check skips reading the old file for most real changes.
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    write_bytes_atomic(path, data)
+    return True
+
+
+def _compress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".gz":
+        # mtime=0 keeps the bytes stable, so an unchanged pack compresses identically.
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    try:
+        import brotli
+    except ImportError as exc:
+        raise OutputError(
+            ".br output needs brotli (pip install -r requirements-optional.txt)."
+        ) from exc
+    return brotli.compress(data, mode=brotli.MODE_TEXT)
+
+
+def write_json(
+    path: Path, payload: dict[str, Any] | bytes, options: OutputOptions | None = None
+) -> WriteResult:
+    """Write JSON atomically, and only if its bytes changed.
+
+    `payload` may already be encoded (see `schema.phrasepack_json`); a dict is
+    encoded with `encode_json`. `options.minify` only applies to a dict: bytes
+    are written as given, so encode them minified yourself. An unchanged file
+    keeps its mtime, so static hosts and service workers can keep serving their
+    cached copy. Precompressed siblings are written next to the file and
+    refreshed whenever it changes; when the file changes, siblings that `options`
+    no longer asks for are removed rather than left stale.
+    """
+    options = options or OutputOptions()
+    data = payload if isinstance(payload, bytes) else encode_json(payload, minify=options.minify)
+    changed = _write_if_changed(path, data)
+    compressed = []
+    if changed:
+        for suffix in set(COMPRESSED_SUFFIXES) - set(options.suffixes):
+            path.with_name(path.name + suffix).unlink(missing_ok=True)
+    for suffix in options.suffixes:
+        sibling = path.with_name(path.name + suffix)
+        if changed or not sibling.exists():
+            packed = _compress(data, suffix)
+            _write_if_changed(sibling, packed)
+            compressed.append((suffix, len(packed)))
+        else:
+            compressed.append((suffix, sibling.stat().st_size))
+    return WriteResult(path, len(data), changed, tuple(compressed))
 
 
 class RepoRootNotFoundError(RuntimeError):
@@ -25,9 +274,15 @@ def detect_repo_root() -> Path:
     """Find the repository root by locating the app public/phrasepacks.
 
     The tools directory also has a public/phrasepacks folder for fixtures,
-    so we first prefer a directory that looks like the app root.
+    so we first prefer a directory that looks like the app root. The result is
+    cached per working directory; `clear_repo_root_cache` forgets it.
     """
-    for start in [Path.cwd(), Path(__file__).resolve()]:
+    return _find_repo_root(Path.cwd())
+
+
+@lru_cache(maxsize=None)
+def _find_repo_root(cwd: Path) -> Path:
+    for start in [cwd, Path(__file__).resolve()]:
         for parent in [start, *start.parents]:
             if (parent / "package.json").is_file() and (parent / "public" / "phrasepacks").is_dir():
                 return parent
@@ -39,7 +294,16 @@ def detect_repo_root() -> Path:
     )
 
 
+def clear_repo_root_cache() -> None:
+    """Re-walk the filesystem on the next `detect_repo_root` call."""
+    _find_repo_root.cache_clear()
+
+
+def default_phrasepack_dir() -> Path:
+    """The app's public/phrasepacks folder."""
+    return detect_repo_root() / "public" / "phrasepacks"
+
+
 def default_phrasepack_output_path(pack_id: str) -> Path:
     """Default output path under the app's public/phrasepacks folder."""
-    repo_root = detect_repo_root()
-    return repo_root / "public" / "phrasepacks" / f"{pack_id}.json"
+    return default_phrasepack_dir() / f"{pack_id}.json"
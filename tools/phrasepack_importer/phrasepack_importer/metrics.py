@@ -0,0 +1,122 @@
+"""Per-stage timing and token usage for a run, written as a JSON/NDJSON report."""
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from pathlib import Path
+from typing import ContextManager, Iterator
+
+# Fields (image name, extraction step, ...) attached to every record made in the
+# current thread or asyncio task.
+_labels: ContextVar[dict[str, object]] = ContextVar("phrasepack_metrics_labels", default={})
+
+_TOKEN_FIELDS = ("prompt_tokens", "output_tokens", "total_tokens")
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0..100); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+@contextmanager
+def labels(**fields: object) -> Iterator[None]:
+    """Attach `fields` to every record made inside the block."""
+    token = _labels.set({**_labels.get(), **fields})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+class RunMetrics:
+    """Thread-safe collector of timed stage records."""
+
+    def __init__(self) -> None:
+        self.records: list[dict[str, object]] = []
+        # Run-level facts that are not timings (e.g. memo cache hit rates).
+        self.annotations: dict[str, object] = {}
+        self.started = time.time()
+        self._clock_started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def annotate(self, name: str, value: object) -> None:
+        """Add a run-level entry to the report summary."""
+        with self._lock:
+            self.annotations[name] = value
+
+    def record(self, stage: str, seconds: float, **fields: object) -> None:
+        entry = {"stage": stage, "seconds": round(seconds, 6), **_labels.get(), **fields}
+        with self._lock:
+            self.records.append(entry)
+
+    @contextmanager
+    def timed(self, stage: str, **fields: object) -> Iterator[None]:
+        """Record how long the block took; failures are recorded with their error type."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException as exc:
+            self.record(stage, time.perf_counter() - started, error=type(exc).__name__, **fields)
+            raise
+        self.record(stage, time.perf_counter() - started, **fields)
+
+    def summary(self) -> dict[str, object]:
+        with self._lock:
+            records = list(self.records)
+        by_stage: dict[str, list[dict[str, object]]] = {}
+        for entry in records:
+            by_stage.setdefault(str(entry["stage"]), []).append(entry)
+
+        stages = {}
+        for stage, entries in by_stage.items():
+            seconds = [float(entry["seconds"]) for entry in entries]
+            stages[stage] = {
+                "count": len(entries),
+                "errors": sum(1 for entry in entries if "error" in entry),
+                "total_seconds": round(sum(seconds), 6),
+                "p50_seconds": round(percentile(seconds, 50), 6),
+                "p95_seconds": round(percentile(seconds, 95), 6),
+            }
+
+        attempts = by_stage.get("generate_content", [])
+        tokens = {
+            name: sum(int(entry.get(name) or 0) for entry in attempts) for name in _TOKEN_FIELDS
+        }
+        return {
+            "wall_seconds": round(time.perf_counter() - self._clock_started, 6),
+            "images": len({entry["image"] for entry in records if "image" in entry}),
+            "requests": len(attempts),
+            "repair_requests": sum(1 for entry in attempts if entry.get("repair")),
+            "tokens": tokens,
+            "stages": stages,
+            **self.annotations,
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the report: one record per line for .ndjson/.jsonl, else one JSON document."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            records = list(self.records)
+        summary = self.summary()
+        if path.suffix in {".ndjson", ".jsonl"}:
+            lines = [json.dumps(entry, ensure_ascii=False) for entry in records]
+            lines.append(json.dumps({"stage": "summary", **summary}, ensure_ascii=False))
+            path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            return
+        report = {"started": self.started, "summary": summary, "records": records}
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def measure(metrics: RunMetrics | None, stage: str, **fields: object) -> ContextManager[None]:
+    """`metrics.timed(...)`, or a no-op when metrics are off."""
+    if metrics is None:
+        return nullcontext()
+    return metrics.timed(stage, **fields)
@@ -1,8 +1,17 @@
-"""Normalization helpers for text and ids."""
+"""Normalization helpers for text and ids.
+
+These run for every item and lemma of every pack, so each helper makes as few
+passes over the string as it can: patterns are precompiled and a pass is skipped
+when the character it looks for is absent. `benchmarks/reference_normalize.py`
+keeps the original multi-pass versions, and the differential tests check that
+the output stays identical.
+"""
 from __future__ import annotations
 
 import re
 import unicodedata
+from functools import lru_cache
+from typing import Callable, Iterable
 
 
 _PUNCT_TRANSLATION = str.maketrans(
@@ -27,6 +36,10 @@ _SRC_LEMMA_RE = re.compile(r"^(?P<surface>[^()]+?)\s*\((?P<lemma>[^)]+)\)\s*$")
 _LEADING_SRC_JUNK_RE = re.compile(r'^[\".]+\s*(?=[^\W\d_])')
 _ALT_SPLIT_RE = re.compile(r"[,/;]\s*")
 _ALT_TOKEN_RE = re.compile(r"^[^\W\d_]+(?:['-][^\W\d_]+)*$", re.UNICODE)
+# "?; " / "!; " / ".; " -> "? " etc., and "; <lowercase>" -> ", <lowercase>" in one pass.
+_DST_SEMICOLON_RE = re.compile(r"([?!.]); |;\s+(?=[a-zåäö])")
+_SLUG_SEPARATOR_RE = re.compile(r"[^a-z0-9]+")
+_LEADING_SRC_JUNK = ('"', ".")
 
 _GENDER_TOKENS = {
     "fi": ("mies", "nainen"),
@@ -34,20 +47,27 @@ _GENDER_TOKENS = {
 }
 
 
+def _normalize_text(value: str) -> str:
+    # str.split() splits on exactly the characters `\s` matches, and drops the
+    # leading/trailing runs, so this is `re.sub(r"\s+", " ", ...).strip()`.
+    return " ".join(value.translate(_PUNCT_TRANSLATION).split())
+
+
 def normalize_text(value: str) -> str:
     """Normalize whitespace and punctuation without changing meaning."""
-    normalized = value.translate(_PUNCT_TRANSLATION)
-    normalized = re.sub(r"\s+", " ", normalized).strip()
-    return normalized
+    return _normalize_text_memo(value)
 
 
 def normalize_src_text(value: str) -> str:
     """Normalize source text and fix obvious OCR errors."""
     normalized = normalize_text(value)
-    normalized = normalized.replace("*", "")
-    normalized = _OCR_APOSTROPHE_RE.sub("l'", normalized)
-    normalized = _LEADING_SRC_JUNK_RE.sub("", normalized)
-    if normalized.lower() == "si":
+    if "*" in normalized:
+        normalized = normalized.replace("*", "")
+    if "'" in normalized:
+        normalized = _OCR_APOSTROPHE_RE.sub("l'", normalized)
+    if normalized.startswith(_LEADING_SRC_JUNK):
+        normalized = _LEADING_SRC_JUNK_RE.sub("", normalized)
+    if len(normalized) == 2 and normalized.lower() == "si":
         normalized = "s\u00ec"
     return normalized
 
@@ -106,13 +126,21 @@ def split_gendered_dst(dst: str, dst_lang: str, count: int) -> list[str] | None:
     return [f"{prefix} ({gender}){joiner}{suffix}".strip() for gender in order]
 
 
+def _semicolon_replacement(match: re.Match[str]) -> str:
+    return f"{match.group(1)} " if match.group(1) else ", "
+
+
+def _capitalize_sentence_start(match: re.Match[str]) -> str:
+    return f"{match.group(1)}{match.group(2).upper()}"
+
+
 def normalize_dst_text(value: str) -> str:
     """Normalize target text and enforce sentence casing when punctuated."""
     normalized = normalize_text(value)
     # The model sometimes uses semicolons as list separators; prefer commas for
     # synonym lists while keeping semicolons for clearly separate clauses.
-    normalized = normalized.replace("?; ", "? ").replace("!; ", "! ").replace(".; ", ". ")
-    normalized = re.sub(r";\s+(?=[a-zåäö])", ", ", normalized)
+    if ";" in normalized:
+        normalized = _DST_SEMICOLON_RE.sub(_semicolon_replacement, normalized)
     should_case = False
     if "?" in normalized or "!" in normalized:
         should_case = True
@@ -120,21 +148,111 @@ def normalize_dst_text(value: str) -> str:
         should_case = True
 
     if should_case:
-        normalized = _SENTENCE_START_RE.sub(
-            lambda match: f"{match.group(1)}{match.group(2).upper()}", normalized
-        )
+        normalized = _SENTENCE_START_RE.sub(_capitalize_sentence_start, normalized)
     return normalized
 
 
+def _slugify(value: str) -> str:
+    normalized = normalize_text(value).lower().replace("'", "")
+    if not normalized.isascii():
+        normalized = unicodedata.normalize("NFKD", normalized)
+        normalized = normalized.encode("ascii", "ignore").decode("ascii")
+    normalized = _SLUG_SEPARATOR_RE.sub("-", normalized).strip("-")
+    return normalized or "item"
+
+
 def slugify(value: str) -> str:
     """Create a stable ASCII id from a term."""
-    normalized = normalize_text(value).lower()
-    normalized = normalized.replace("'", "")
-    normalized = unicodedata.normalize("NFKD", normalized)
-    normalized = normalized.encode("ascii", "ignore").decode("ascii")
-    normalized = re.sub(r"[^a-z0-9]+", "-", normalized)
-    normalized = normalized.strip("-")
-    return normalized or "item"
+    return _slugify_memo(value)
+
+
+# Surfaces, lemmas and translations repeat across chapters and across the
+# IT-FI/IT-SV twin packs, so normalize_text and slugify results are kept in
+# bounded LRU caches (shared by all threads; lru_cache is thread-safe).
+DEFAULT_MEMO_SIZE = 65536
+
+_normalize_text_memo = lru_cache(maxsize=DEFAULT_MEMO_SIZE)(_normalize_text)
+_slugify_memo = lru_cache(maxsize=DEFAULT_MEMO_SIZE)(_slugify)
+
+
+def configure_memo(maxsize: int | None = DEFAULT_MEMO_SIZE) -> None:
+    """Resize (and clear) the memo caches; 0 disables them, None makes them unbounded."""
+    global _normalize_text_memo, _slugify_memo
+    _normalize_text_memo = lru_cache(maxsize=maxsize)(_normalize_text)
+    _slugify_memo = lru_cache(maxsize=maxsize)(_slugify)
+
+
+def clear_memo() -> None:
+    """Empty the memo caches and reset their statistics."""
+    _normalize_text_memo.cache_clear()
+    _slugify_memo.cache_clear()
+
+
+def memo_stats() -> dict[str, dict[str, int | float | None]]:
+    """Hits, misses, size and hit rate of each memo cache."""
+    stats = {}
+    for name, memo in (("normalize_text", _normalize_text_memo), ("slugify", _slugify_memo)):
+        info = memo.cache_info()
+        calls = info.hits + info.misses
+        stats[name] = {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_rate": round(info.hits / calls, 4) if calls else 0.0,
+        }
+    return stats
+
+
+def _map_unique(fn: Callable[[str], str], values: Iterable[str]) -> list[str]:
+    values = list(values)
+    # Word lists repeat a lot ("olla", "essere"): normalize each distinct value once.
+    mapped = {value: fn(value) for value in dict.fromkeys(values)}
+    return [mapped[value] for value in values]
+
+
+def normalize_src_batch(values: Iterable[str]) -> list[str]:
+    """`normalize_src_text` over many values, computing repeated values once."""
+    return _map_unique(normalize_src_text, values)
+
+
+def normalize_dst_batch(values: Iterable[str]) -> list[str]:
+    """`normalize_dst_text` over many values, computing repeated values once."""
+    return _map_unique(normalize_dst_text, values)
+
+
+def slugify_batch(values: Iterable[str]) -> list[str]:
+    """`slugify` over many values, computing repeated values once."""
+    return _map_unique(slugify, values)
+
+
+class IdAllocator:
+    """Hands out the same ids as `ensure_unique_id`, in amortized O(1).
+
+    Ids are only ever added, so every suffix below the last one handed out for a
+    base is still taken; remembering it per base skips re-probing `-2`, `-3`, ...
+    """
+
+    def __init__(self, existing: Iterable[str] = ()) -> None:
+        self.ids: set[str] = set(existing)
+        self._next_suffix: dict[str, int] = {}
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self.ids
+
+    def allocate(self, base_id: str) -> str:
+        if base_id not in self.ids:
+            self.ids.add(base_id)
+            return base_id
+
+        counter = self._next_suffix.get(base_id, 2)
+        candidate = f"{base_id}-{counter}"
+        while candidate in self.ids:
+            counter += 1
+            candidate = f"{base_id}-{counter}"
+        self.ids.add(candidate)
+        self._next_suffix[base_id] = counter + 1
+        return candidate
 
 
 def ensure_unique_id(base_id: str, existing: set[str]) -> str:
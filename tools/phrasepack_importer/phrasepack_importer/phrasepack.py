@@ -1,16 +1,56 @@
 """Phrasepack assembly helpers."""
 from __future__ import annotations
 
+from functools import lru_cache
+from pathlib import Path
+
+from .cache import hash_key
+from .io import OutputOptions
 from .normalize import (
-    ensure_unique_id,
+    IdAllocator,
+    normalize_dst_batch,
+    normalize_src_batch,
+    slugify_batch,
     split_gendered_dst,
-    normalize_dst_text,
-    normalize_src_text,
-    slugify,
     split_surface_and_lemmas,
 )
 from .schema import ExtractedItem, Phrasepack, PhrasepackItem
 
+# The modules that decide a pack's bytes once the cleaned items are known.
+_NORMALIZER_MODULES = ("normalize.py", "phrasepack.py", "schema.py")
+
+
+@lru_cache(maxsize=1)
+def normalizer_fingerprint() -> str:
+    """Hash of the normalization and pack-assembly code.
+
+    Any edit to these modules may change the packs built from the same items,
+    so pack checkpoints and the build manifest are keyed by it.
+    """
+    here = Path(__file__).parent
+    return hash_key(*((here / name).read_bytes() for name in _NORMALIZER_MODULES))[:16]
+
+
+def pack_inputs(
+    *,
+    pack_id: str,
+    title: str,
+    src_lang: str,
+    dst_lang: str,
+    output_path: Path,
+    output: OutputOptions | None,
+) -> tuple[str, ...]:
+    """What decides a pack file's bytes and place, besides its cleaned items."""
+    return (
+        normalizer_fingerprint(),
+        repr(output or OutputOptions()),
+        str(output_path.resolve()),
+        pack_id,
+        title,
+        src_lang,
+        dst_lang,
+    )
+
 
 def build_phrasepack(
     *,
@@ -21,21 +61,27 @@ def build_phrasepack(
     extracted_items: list[ExtractedItem],
 ) -> Phrasepack:
     """Build a phrasepack from extracted items with normalized ids."""
-    seen_ids: set[str] = set()
+    # Normalize every field in batches up front: repeated strings are handled
+    # once, and the loop below only does the per-item decisions.
+    surfaces = normalize_src_batch(item.resolved_surface() for item in extracted_items)
+    dsts = normalize_dst_batch(item.dst or "" for item in extracted_items)
+    lemmas = normalize_src_batch(item.lemma or "" for item in extracted_items)
+    lemma_dsts = normalize_dst_batch(item.lemma_dst or "" for item in extracted_items)
+
     # Avoid duplicate cards when the same term appears multiple times in extraction
     # (e.g. lemma duplication across several conjugations).
     seen_pairs: set[tuple[str, str]] = set()
-    items: list[PhrasepackItem] = []
+    entries: list[tuple[str, str]] = []
 
-    for item in extracted_items:
-        surface = normalize_src_text(item.resolved_surface())
+    for item, surface, dst, lemma_text, lemma_dst in zip(
+        extracted_items, surfaces, dsts, lemmas, lemma_dsts
+    ):
         if not item.dst:
             continue
-        dst = normalize_dst_text(item.dst)
         if not surface or not dst:
             continue
 
-        lemma = normalize_src_text(item.lemma) if item.lemma else None
+        lemma = lemma_text if item.lemma else None
         variants = split_surface_and_lemmas(surface, lemma)
 
         dst_variants: list[str] | None = None
@@ -51,20 +97,23 @@ def build_phrasepack(
             if pair_key in seen_pairs:
                 continue
             seen_pairs.add(pair_key)
-            base_id = slugify(src)
-            item_id = ensure_unique_id(base_id, seen_ids)
-            items.append(PhrasepackItem(id=item_id, src=src, dst=resolved_dst))
+            entries.append((src, resolved_dst))
 
         if item.lemma and item.lemma_dst and lemma:
             if lemma.lower() not in {v.lower() for v in variants}:
-                lemma_dst = normalize_dst_text(item.lemma_dst)
                 if lemma_dst and lemma_dst != dst:
                     lemma_key = (lemma.casefold(), lemma_dst.casefold())
                     if lemma_key in seen_pairs:
                         continue
                     seen_pairs.add(lemma_key)
-                    lemma_id = ensure_unique_id(slugify(lemma), seen_ids)
-                    items.append(PhrasepackItem(id=lemma_id, src=lemma, dst=lemma_dst))
+                    entries.append((lemma, lemma_dst))
+
+    # Ids are allocated in output order, exactly as when they were made inline.
+    ids = IdAllocator()
+    items = [
+        PhrasepackItem(id=ids.allocate(slug), src=src, dst=dst)
+        for (src, dst), slug in zip(entries, slugify_batch(src for src, _ in entries))
+    ]
 
     return Phrasepack(
         type="vocab",
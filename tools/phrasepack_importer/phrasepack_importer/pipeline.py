@@ -0,0 +1,286 @@
+"""Two-stage pipelined extraction for multi-page imports.
+
+Step 1 (vision transcription) and step 2 (text cleanup) run as separate worker
+pools joined by a bounded queue, so page N's cleanup overlaps page N+1's vision
+call and wall-clock time approaches the slower stage instead of the sum of both.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from .batch import Checkpoints, ImportJob, ImportStats, JobResult, finish_pack
+from .cache import ResponseCache
+from .gemini_client import (
+    DEFAULT_CHUNK_PAIRS,
+    GeminiSession,
+    extract_raw_pairs_async,
+    pairs_to_items_chunked_async,
+    split_raw_pairs,
+)
+from .ingest import Tile, TilingOptions, extract_tiles_async, split_source
+from .io import ImageOptions, OutputOptions, preprocess_image, read_image_bytes
+from .metrics import labels, measure, percentile
+from .prompt import build_image_pairs_prompt, build_pairs_to_items_prompt
+from .schema import RawPairsPayload
+from .workdir import ITEMS, PACK, RAW_PAIRS, WorkDir
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    latencies: list[float] = field(default_factory=list)
+    failures: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.name}: {len(self.latencies)} done, {self.failures} failed, "
+            f"{self.workers} workers, p50 {percentile(self.latencies, 50):.2f}s, "
+            f"p95 {percentile(self.latencies, 95):.2f}s"
+        )
+
+
+@dataclass
+class PipelineReport:
+    extract: StageStats
+    clean: StageStats
+    queue_size: int
+    queue_depths: list[int] = field(default_factory=list)
+    wall_time: float = 0.0
+
+    @property
+    def max_queue_depth(self) -> int:
+        return max(self.queue_depths, default=0)
+
+    def summary(self) -> str:
+        mean_depth = (
+            sum(self.queue_depths) / len(self.queue_depths) if self.queue_depths else 0.0
+        )
+        return "\n".join(
+            [
+                f"  {self.extract.summary()}",
+                f"  {self.clean.summary()}",
+                f"  queue: max depth {self.max_queue_depth}/{self.queue_size}, "
+                f"mean {mean_depth:.1f}",
+                f"  wall time {self.wall_time:.2f}s",
+            ]
+        )
+
+
+@dataclass
+class _Handoff:
+    checkpoints: Checkpoints
+    raw_pairs: RawPairsPayload
+    started: float
+    image_bytes_before: int
+    image_bytes_after: int
+    resumed: list[str]
+    tiles: int
+
+    @property
+    def job(self) -> ImportJob:
+        return self.checkpoints.job
+
+
+_DONE = object()
+
+
+async def run_pipeline_async(
+    jobs: list[ImportJob],
+    *,
+    model: str,
+    session: GeminiSession,
+    allow_repair: bool = True,
+    cache: ResponseCache | None = None,
+    extract_workers: int = 4,
+    clean_workers: int = 4,
+    queue_size: int = 4,
+    image_options: ImageOptions | None = None,
+    tiling: TilingOptions | None = None,
+    workdir: WorkDir | None = None,
+    chunk_size: int | None = DEFAULT_CHUNK_PAIRS,
+    output: OutputOptions | None = None,
+    on_result: Callable[[JobResult], None] | None = None,
+) -> tuple[list[JobResult], PipelineReport]:
+    """Run jobs through the two stages; results come back in job order.
+
+    `workdir` checkpoints each stage like `batch.import_job` does; resumed pages
+    skip the stages they already completed. PDFs and (with `tiling`) tall images
+    are split as in `batch.import_job`; a job's tiles share its step-1 slot, and
+    the step-2 chunks of its pairs (see `split_raw_pairs`) share its cleanup slot.
+    """
+    if min(extract_workers, clean_workers, queue_size) < 1:
+        raise ValueError("workers and queue_size must be >= 1")
+
+    report = PipelineReport(
+        extract=StageStats("extract", extract_workers),
+        clean=StageStats("clean", clean_workers),
+        queue_size=queue_size,
+    )
+    pending: asyncio.Queue = asyncio.Queue()
+    for index, job in enumerate(jobs):
+        pending.put_nowait((index, job))
+    handoff: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    results: dict[int, JobResult] = {}
+    metrics = session.metrics
+
+    def finish(index: int, result: JobResult) -> None:
+        results[index] = result
+        if metrics is not None:
+            fields = {"error": result.error.split(":", 1)[0]} if result.error else {}
+            metrics.record("import", result.elapsed, image=result.job.image_path.name, **fields)
+        if on_result:
+            on_result(result)
+
+    def fail(index: int, job: ImportJob, started: float, exc: Exception) -> None:
+        finish(
+            index,
+            JobResult(
+                job=job,
+                error=f"{type(exc).__name__}: {exc}",
+                elapsed=time.perf_counter() - started,
+            ),
+        )
+
+    async def extract_worker() -> None:
+        while not pending.empty():
+            index, job = pending.get_nowait()
+            started = time.perf_counter()
+            try:
+                with labels(image=job.image_path.name):
+                    with measure(metrics, "build_prompts"):
+                        prompt = build_image_pairs_prompt(job.src_lang, job.dst_lang)
+                    with measure(metrics, "read_image"):
+                        data = await asyncio.to_thread(read_image_bytes, job.image_path)
+                        # Hashing the image and reading checkpoints is blocking file
+                        # work; like the Gemini calls it stays off the event loop.
+                        checkpoints = await asyncio.to_thread(
+                            Checkpoints.open,
+                            workdir,
+                            job,
+                            data,
+                            model=model,
+                            image_options=image_options,
+                            tiling=tiling,
+                            output=output,
+                        )
+                        raw_pairs = await asyncio.to_thread(checkpoints.raw_pairs, prompt)
+                        # A checkpointed step 1 needs no splitting, preprocessing or upload.
+                        tiles = []
+                        if raw_pairs is None:
+                            tiles = await asyncio.to_thread(split_source, data, tiling)
+                    resumed = [RAW_PAIRS] if raw_pairs is not None else []
+                    uploaded: list[int] = []
+
+                    async def extract_tile(tile: Tile) -> RawPairsPayload:
+                        with measure(metrics, "preprocess_image"):
+                            image = await asyncio.to_thread(
+                                preprocess_image, tile.data, image_options or ImageOptions()
+                            )
+                        uploaded.append(len(image.data))
+                        return await extract_raw_pairs_async(
+                            image_bytes=image.data,
+                            mime_type=image.mime_type,
+                            prompt=prompt,
+                            model=model,
+                            allow_repair=allow_repair,
+                            cache=cache,
+                            session=session,
+                        )
+
+                    if tiles:
+                        raw_pairs = await extract_tiles_async(tiles, extract_tile)
+                        await asyncio.to_thread(checkpoints.save_raw_pairs, prompt, raw_pairs)
+            except Exception as exc:  # noqa: BLE001 - one bad page must not stop the batch
+                report.extract.failures += 1
+                fail(index, job, started, exc)
+                continue
+            report.extract.latencies.append(time.perf_counter() - started)
+            size_after = sum(uploaded) if uploaded else len(data)
+            item = _Handoff(
+                checkpoints, raw_pairs, started, len(data), size_after, resumed, max(1, len(tiles))
+            )
+            # Blocks when cleanup falls behind, so step 1 cannot run arbitrarily ahead.
+            await handoff.put((index, item))
+            report.queue_depths.append(handoff.qsize())
+
+    async def clean_worker() -> None:
+        while True:
+            entry = await handoff.get()
+            if entry is _DONE:
+                return
+            index, item = entry
+            stage_started = time.perf_counter()
+            try:
+                with labels(image=item.job.image_path.name):
+                    with measure(metrics, "build_prompts"):
+                        prompt = build_pairs_to_items_prompt(item.job.src_lang, item.job.dst_lang)
+                        chunks = split_raw_pairs(item.raw_pairs, chunk_size=chunk_size)
+                    tokens_saved = 0
+                    extracted = await asyncio.to_thread(
+                        item.checkpoints.items, prompt, chunks.key
+                    )
+                    if extracted is not None:
+                        item.resumed.append(ITEMS)
+                    else:
+                        extracted = await pairs_to_items_chunked_async(
+                            chunks=chunks,
+                            prompt=prompt,
+                            model=model,
+                            allow_repair=allow_repair,
+                            cache=cache,
+                            session=session,
+                        )
+                        tokens_saved = chunks.tokens_saved
+                        await asyncio.to_thread(
+                            item.checkpoints.save_items, prompt, chunks.key, extracted
+                        )
+                    # Building, writing and compressing the pack would stall every
+                    # in-flight extraction if it ran on the event loop.
+                    count, written = await asyncio.to_thread(
+                        finish_pack, item.checkpoints, extracted, metrics=metrics
+                    )
+                    if written is None:
+                        item.resumed.append(PACK)
+            except Exception as exc:  # noqa: BLE001
+                report.clean.failures += 1
+                fail(index, item.job, item.started, exc)
+                continue
+            report.clean.latencies.append(time.perf_counter() - stage_started)
+            finish(
+                index,
+                JobResult(
+                    job=item.job,
+                    stats=ImportStats(
+                        item_count=count,
+                        image_bytes_before=item.image_bytes_before,
+                        image_bytes_after=item.image_bytes_after,
+                        resumed=tuple(item.resumed),
+                        tiles=item.tiles,
+                        chunks=len(chunks.chunks),
+                        tokens_saved=tokens_saved,
+                        output=written,
+                    ),
+                    elapsed=time.perf_counter() - item.started,
+                ),
+            )
+
+    started = time.perf_counter()
+    cleaners = [asyncio.create_task(clean_worker()) for _ in range(clean_workers)]
+    await asyncio.gather(*(extract_worker() for _ in range(extract_workers)))
+    for _ in cleaners:
+        await handoff.put(_DONE)
+    await asyncio.gather(*cleaners)
+    report.wall_time = time.perf_counter() - started
+    return [results[index] for index in range(len(jobs))], report
+
+
+def run_pipeline(
+    jobs: list[ImportJob],
+    **kwargs,
+) -> tuple[list[JobResult], PipelineReport]:
+    """Blocking wrapper around `run_pipeline_async`."""
+    return asyncio.run(run_pipeline_async(jobs, **kwargs))
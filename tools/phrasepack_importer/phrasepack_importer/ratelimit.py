@@ -0,0 +1,162 @@
+"""Client-side request/token budgets for Gemini calls."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+# Rough input-token costs used before a response reports the real usage.
+CHARS_PER_TOKEN = 4
+IMAGE_TOKEN_ESTIMATE = 1290
+WINDOW_SECONDS = 60.0
+
+
+def estimate_tokens(contents: object) -> int:
+    """Approximate input tokens of a generate_content `contents` value."""
+    if isinstance(contents, str):
+        return max(1, len(contents) // CHARS_PER_TOKEN)
+    if isinstance(contents, (list, tuple)):
+        return max(1, sum(estimate_tokens(part) for part in contents))
+    text = getattr(contents, "text", None)
+    if isinstance(text, str):
+        return estimate_tokens(text)
+    if getattr(contents, "inline_data", None) is not None:
+        return IMAGE_TOKEN_ESTIMATE
+    return 1
+
+
+class _Bucket:
+    """Token bucket refilled continuously at `per_minute / 60` per second.
+
+    Callers take what they need up front and may drive the balance negative;
+    the debt is the time they (and everyone after them) must wait. That keeps
+    reservations first come, first served and lets waits happen outside the lock.
+    """
+
+    def __init__(self, per_minute: float, now: float) -> None:
+        if per_minute <= 0:
+            raise ValueError("rate limits must be > 0")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / WINDOW_SECONDS
+        self.balance = self.capacity
+        self.updated = now
+
+    def take(self, amount: float, now: float) -> float:
+        self.balance = min(self.capacity, self.balance + (now - self.updated) * self.rate)
+        self.updated = now
+        self.balance -= min(amount, self.capacity)
+        return max(0.0, -self.balance / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        self.balance = min(self.capacity, self.balance - amount)
+
+
+@dataclass(frozen=True)
+class RateLimitSnapshot:
+    """Usage over the last minute relative to the budgets."""
+
+    requests: int
+    tokens: int
+    rpm: int | None
+    tpm: int | None
+    waits: int
+    waited_seconds: float
+
+    @property
+    def request_utilization(self) -> float | None:
+        return self.requests / self.rpm if self.rpm else None
+
+    @property
+    def token_utilization(self) -> float | None:
+        return self.tokens / self.tpm if self.tpm else None
+
+    def summary(self) -> str:
+        parts = []
+        if self.rpm:
+            parts.append(f"{self.requests}/{self.rpm} rpm ({self.request_utilization:.0%})")
+        if self.tpm:
+            parts.append(f"{self.tokens}/{self.tpm} tpm ({self.token_utilization:.0%})")
+        parts.append(f"waited {self.waited_seconds:.1f}s over {self.waits} requests")
+        return ", ".join(parts)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets shared by all workers.
+
+    `acquire` (threads) and `acquire_async` (asyncio) block until the request
+    fits both budgets. Token costs are estimates until `settle` corrects them
+    with the usage reported by the response. Safe to share between threads and
+    event loops.
+    """
+
+    def __init__(
+        self,
+        *,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.rpm = rpm
+        self.tpm = tpm
+        self._clock = clock
+        now = clock()
+        self._requests = _Bucket(rpm, now) if rpm else None
+        self._tokens = _Bucket(tpm, now) if tpm else None
+        self._lock = threading.Lock()
+        self._window: deque[tuple[float, int, int]] = deque()
+        self._waits = 0
+        self._waited = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Take budget for one request; returns how long to wait before sending."""
+        with self._lock:
+            now = self._clock()
+            wait = 0.0
+            if self._requests is not None:
+                wait = max(wait, self._requests.take(1, now))
+            if self._tokens is not None:
+                wait = max(wait, self._tokens.take(tokens, now))
+            self._window.append((now + wait, 1, tokens))
+            if wait > 0:
+                self._waits += 1
+                self._waited += wait
+            return wait
+
+    def acquire(self, tokens: int = 1) -> None:
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 1) -> None:
+        import asyncio
+
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated: int, actual: int | None) -> None:
+        """Charge (or refund) the difference once the real token usage is known."""
+        if actual is None or actual == estimated:
+            return
+        with self._lock:
+            if self._tokens is not None:
+                self._tokens.adjust(actual - estimated)
+            self._window.append((self._clock(), 0, actual - estimated))
+
+    def snapshot(self) -> RateLimitSnapshot:
+        with self._lock:
+            now = self._clock()
+            while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+                self._window.popleft()
+            requests = sum(entry[1] for entry in self._window)
+            tokens = sum(entry[2] for entry in self._window)
+            return RateLimitSnapshot(
+                requests=requests,
+                tokens=max(0, tokens),
+                rpm=self.rpm,
+                tpm=self.tpm,
+                waits=self._waits,
+                waited_seconds=self._waited,
+            )
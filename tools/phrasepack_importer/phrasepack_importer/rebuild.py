@@ -0,0 +1,216 @@
+"""Build manifest and make-style incremental rebuilds of phrasepacks.
+
+The manifest records, per pack, a fingerprint of the inputs of every stage:
+the source file, the step-1 prompt/model/image settings, the step-2
+prompt/model/chunking, and the normalizer code plus pack metadata. `plan_rebuild`
+compares them with the current inputs to tell which packs are stale and from
+which stage. The rebuild itself runs through a resumed WorkDir, whose
+checkpoints are keyed by the same inputs, so unchanged stages are reused.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+from .batch import ImportJob, JobResult
+from .cache import hash_key
+from .ingest import TilingOptions
+from .io import ImageOptions, OutputOptions, read_image_bytes, write_bytes_atomic
+from .phrasepack import pack_inputs
+from .prompt import build_image_pairs_prompt, build_pairs_to_items_prompt
+from .renormalize import RenormalizeResult
+from .workdir import ITEMS, PACK, RAW_PAIRS, STAGES, WorkDir
+
+BUILD_MANIFEST_NAME = "build-manifest.json"
+MANIFEST_VERSION = 1
+SOURCE = "source"
+OUTPUT = "output"
+
+
+def default_build_manifest(workdir: WorkDir) -> Path:
+    return workdir.root / BUILD_MANIFEST_NAME
+
+
+@dataclass(frozen=True)
+class BuildSettings:
+    """Run-wide settings that shape the packs, besides each job's own fields."""
+
+    model: str
+    image_options: ImageOptions | None = None
+    tiling: TilingOptions | None = None
+    chunk_size: int | None = None
+    output: OutputOptions | None = None
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _output_sha256(path: Path) -> str | None:
+    try:
+        return _sha256(path.read_bytes())
+    except OSError:
+        return None
+
+
+def stage_fingerprints(
+    job: ImportJob, image_bytes: bytes, settings: BuildSettings
+) -> dict[str, str]:
+    """Fingerprint of the inputs of each stage of one pack."""
+    return {
+        SOURCE: _sha256(image_bytes),
+        RAW_PAIRS: hash_key(
+            settings.model,
+            build_image_pairs_prompt(job.src_lang, job.dst_lang),
+            repr(settings.image_options or ImageOptions()),
+            repr(settings.tiling or TilingOptions()),
+        ),
+        ITEMS: hash_key(
+            settings.model,
+            build_pairs_to_items_prompt(job.src_lang, job.dst_lang),
+            repr(settings.chunk_size),
+        ),
+        PACK: hash_key(
+            *pack_inputs(
+                pack_id=job.pack_id,
+                title=job.title,
+                src_lang=job.src_lang,
+                dst_lang=job.dst_lang,
+                output_path=job.output_path,
+                output=settings.output,
+            )
+        ),
+    }
+
+
+class BuildManifest:
+    """Per-pack stage fingerprints and output sha256, stored as one JSON file."""
+
+    def __init__(self, path: Path, packs: dict[str, dict[str, str]] | None = None) -> None:
+        self.path = path
+        self.packs = packs or {}
+
+    @classmethod
+    def load(cls, path: Path) -> BuildManifest:
+        """The manifest at `path`; empty when missing, unreadable or of another version."""
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        packs = data.get("packs")
+        return cls(path, packs if isinstance(packs, dict) else {})
+
+    def record(self, job: ImportJob, fingerprints: dict[str, str]) -> None:
+        """Note that `job`'s pack was just built from these inputs."""
+        self.packs[job.pack_id] = {
+            **fingerprints,
+            OUTPUT: _output_sha256(job.output_path) or "",
+            "path": str(job.output_path),
+        }
+
+    def record_pack(self, pack_id: str, fingerprint: str, output_path: Path) -> bool:
+        """Note that only the pack stage of `pack_id` was redone, e.g. by `renormalize`.
+
+        Returns False (and changes nothing) if the manifest has no such pack at
+        `output_path`.
+        """
+        entry = self.packs.get(pack_id)
+        if entry is None or Path(entry.get("path", "")).resolve() != output_path.resolve():
+            return False
+        entry[PACK] = fingerprint
+        entry[OUTPUT] = _output_sha256(output_path) or ""
+        return True
+
+    def save(self) -> None:
+        text = json.dumps(
+            {"version": MANIFEST_VERSION, "packs": dict(sorted(self.packs.items()))},
+            ensure_ascii=False,
+            indent=2,
+        )
+        write_bytes_atomic(self.path, (text + "\n").encode("utf-8"))
+
+
+@dataclass(frozen=True)
+class PlannedPack:
+    """One pack and the stages a rebuild has to run for it (none when up to date)."""
+
+    job: ImportJob
+    stages: tuple[str, ...]
+    reason: str
+    fingerprints: dict[str, str]
+
+    @property
+    def stale(self) -> bool:
+        return bool(self.stages)
+
+
+def _plan_one(
+    job: ImportJob, record: dict[str, str] | None, current: dict[str, str]
+) -> tuple[tuple[str, ...], str]:
+    if record is None:
+        return STAGES, "not in the build manifest"
+    if record.get(SOURCE) != current[SOURCE]:
+        return STAGES, "source file changed"
+    if record.get(RAW_PAIRS) != current[RAW_PAIRS]:
+        return STAGES, "step-1 prompt, model or image settings changed"
+    if record.get(ITEMS) != current[ITEMS]:
+        return (ITEMS, PACK), "step-2 prompt, model or chunking changed"
+    if record.get(PACK) != current[PACK]:
+        return (PACK,), "normalizer, pack metadata or output format changed"
+    if record.get(OUTPUT) != _output_sha256(job.output_path):
+        return (PACK,), "output missing or edited"
+    return (), "up to date"
+
+
+def plan_rebuild(
+    jobs: list[ImportJob], manifest: BuildManifest, settings: BuildSettings
+) -> list[PlannedPack]:
+    """Compare every job's current stage inputs with the manifest, in job order."""
+    plans = []
+    for job in jobs:
+        current = stage_fingerprints(job, read_image_bytes(job.image_path), settings)
+        stages, reason = _plan_one(job, manifest.packs.get(job.pack_id), current)
+        plans.append(PlannedPack(job, stages, reason, current))
+    return plans
+
+
+def record_results(
+    manifest: BuildManifest, results: list[JobResult], settings: BuildSettings
+) -> None:
+    """Record the packs that were written successfully and save the manifest."""
+    for result in results:
+        if result.ok:
+            job = result.job
+            manifest.record(
+                job, stage_fingerprints(job, read_image_bytes(job.image_path), settings)
+            )
+    manifest.save()
+
+
+def record_renormalized(manifest: BuildManifest, results: list[RenormalizeResult]) -> None:
+    """Record the packs `renormalize` wrote and save the manifest, if it knew any."""
+    recorded = [
+        manifest.record_pack(result.pack_id, result.fingerprint, result.output_path)
+        for result in results
+        if result.ok and result.fingerprint and result.pack_id and result.output_path
+    ]
+    if any(recorded):
+        manifest.save()
+
+
+def format_plan(plans: list[PlannedPack]) -> str:
+    """One line per pack: what would run, and why."""
+    lines = []
+    for plan in plans:
+        name = plan.job.image_path.name
+        if plan.stale:
+            lines.append(f"  REBUILD  {name} ({', '.join(plan.stages)}): {plan.reason}")
+        else:
+            lines.append(f"  OK       {name}: up to date")
+    stale = sum(1 for plan in plans if plan.stale)
+    lines.append(f"{stale} to rebuild, {len(plans) - stale} up to date.")
+    return "\n".join(lines)
@@ -0,0 +1,218 @@
+"""Rebuild packs from saved step-2 output, without any Gemini calls.
+
+Every import with a work dir saves each pack's cleaned items together with the
+pack's metadata (`extracted_record`). When only the normalization rules change,
+`renormalize` runs those records through `build_phrasepack` again, on a process
+pool, and rewrites just the packs whose bytes changed. The pack checkpoint is
+updated too, so a later resumed import or `rebuild` sees the pack as current.
+"""
+from __future__ import annotations
+
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import ValidationError
+
+from .cache import hash_key
+from .io import OutputOptions, WriteResult, write_json
+from .phrasepack import build_phrasepack, pack_inputs
+from .schema import ExtractedPayload, ParseError, assert_non_empty, phrasepack_json
+from .workdir import EXTRACTED_DIR, PACK, WorkDir
+
+RECORD_VERSION = 1
+# Below this many packs per worker, starting processes costs more than it saves.
+MIN_PACKS_PER_WORKER = 32
+
+
+class RenormalizeError(ValueError):
+    """Raised when a saved step-2 record cannot be read."""
+
+
+def extracted_record(
+    *,
+    image_key: str,
+    pack_id: str,
+    title: str,
+    src_lang: str,
+    dst_lang: str,
+    output_path: Path,
+    extracted: ExtractedPayload,
+) -> str:
+    """The saved form of one pack's step-2 output, with what else builds the pack."""
+    return json.dumps(
+        {
+            "version": RECORD_VERSION,
+            "image_key": image_key,
+            "pack_id": pack_id,
+            "title": title,
+            "src_lang": src_lang,
+            "dst_lang": dst_lang,
+            "output_path": str(output_path.resolve()),
+            "extracted": extracted.model_dump(mode="json"),
+        },
+        ensure_ascii=False,
+    )
+
+
+@dataclass(frozen=True)
+class RenormalizeResult:
+    record: Path
+    output_path: Path | None = None
+    item_count: int = 0
+    changed: bool = False
+    # The written file (None on a dry run or a failure).
+    written: WriteResult | None = None
+    error: str | None = None
+    pack_id: str | None = None
+    # The pack stage's build-manifest fingerprint (None unless written).
+    fingerprint: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _load_record(path: Path) -> tuple[dict, ExtractedPayload]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise RenormalizeError(f"Could not read {path}: {exc}") from exc
+    if not isinstance(data, dict) or data.get("version") != RECORD_VERSION:
+        raise RenormalizeError(f"{path} is not a version {RECORD_VERSION} step-2 record")
+    try:
+        extracted = ExtractedPayload.model_validate(data.get("extracted"))
+    except ValidationError as exc:
+        raise RenormalizeError(f"{path}: invalid extracted items: {exc}") from exc
+    missing = [
+        field
+        for field in ("pack_id", "title", "src_lang", "dst_lang", "output_path")
+        if not isinstance(data.get(field), str)
+    ]
+    if missing:
+        raise RenormalizeError(f"{path} is missing {', '.join(missing)}")
+    return data, extracted
+
+
+def _save_pack_checkpoint(
+    path: Path, data: dict, extracted: ExtractedPayload, inputs: tuple[str, ...], count: int
+) -> None:
+    # Only records inside a work dir (root/extracted/) know where its checkpoints are.
+    key = data.get("image_key")
+    if not isinstance(key, str) or path.parent.name != EXTRACTED_DIR:
+        return
+    WorkDir(path.parent.parent).put_file(
+        key,
+        PACK,
+        *inputs,
+        extracted.model_dump_json(),
+        path=Path(data["output_path"]),
+        items=count,
+    )
+
+
+def renormalize_record(
+    path: Path, *, dry_run: bool = False, output: OutputOptions | None = None
+) -> RenormalizeResult:
+    """Rebuild one pack from its record; write it only if its bytes changed."""
+    output = output or OutputOptions()
+    try:
+        data, extracted = _load_record(path)
+        # As in `write_pack`: never replace a pack with an empty one.
+        items = assert_non_empty(extracted.items)
+    except (RenormalizeError, ParseError) as exc:
+        return RenormalizeResult(path, error=str(exc))
+    output_path = Path(data["output_path"])
+    pack_id = data["pack_id"]
+    phrasepack = build_phrasepack(
+        pack_id=pack_id,
+        title=data["title"],
+        src_lang=data["src_lang"],
+        dst_lang=data["dst_lang"],
+        extracted_items=items,
+    )
+    payload = phrasepack_json(phrasepack, minify=output.minify)
+    count = len(phrasepack.items)
+    if dry_run:
+        try:
+            changed = output_path.read_bytes() != payload
+        except OSError:
+            changed = True
+        return RenormalizeResult(path, output_path, count, changed, pack_id=pack_id)
+    inputs = pack_inputs(
+        pack_id=pack_id,
+        title=data["title"],
+        src_lang=data["src_lang"],
+        dst_lang=data["dst_lang"],
+        output_path=output_path,
+        output=output,
+    )
+    try:
+        written = write_json(output_path, payload, output)
+        _save_pack_checkpoint(path, data, extracted, inputs, count)
+    except OSError as exc:
+        # One unwritable pack must not stop the rest of the run.
+        return RenormalizeResult(
+            path, output_path, error=f"Could not write {output_path}: {exc}", pack_id=pack_id
+        )
+    return RenormalizeResult(
+        path,
+        output_path,
+        count,
+        written.changed,
+        written,
+        pack_id=pack_id,
+        fingerprint=hash_key(*inputs),
+    )
+
+
+def _renormalize_chunk(
+    paths: list[Path], dry_run: bool, output: OutputOptions | None
+) -> list[RenormalizeResult]:
+    return [renormalize_record(path, dry_run=dry_run, output=output) for path in paths]
+
+
+def renormalize(
+    records: list[Path],
+    *,
+    workers: int | None = None,
+    dry_run: bool = False,
+    output: OutputOptions | None = None,
+) -> list[RenormalizeResult]:
+    """Rebuild every record's pack, on up to `workers` processes; results in record order."""
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be >= 1")
+    workers = min(
+        workers or os.cpu_count() or 1, math.ceil(len(records) / MIN_PACKS_PER_WORKER)
+    )
+    if workers <= 1:
+        return _renormalize_chunk(records, dry_run, output)
+    # One contiguous slice per worker: a task per pack would cost more in
+    # pickling than the pack takes to build.
+    size = math.ceil(len(records) / workers)
+    slices = [records[start : start + size] for start in range(0, len(records), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_renormalize_chunk, part, dry_run, output) for part in slices]
+        return [result for future in futures for result in future.result()]
+
+
+def format_results(results: list[RenormalizeResult], *, dry_run: bool = False) -> str:
+    lines = []
+    for result in results:
+        if not result.ok:
+            lines.append(f"  FAIL  {result.record.name}: {result.error}")
+        elif result.changed:
+            details = [f"{result.item_count} items"]
+            if result.written:
+                details.append(result.written.summary())
+            verb = "would change" if dry_run else "rewrote"
+            lines.append(f"  {verb} {result.output_path} ({', '.join(details)})")
+    changed = sum(1 for result in results if result.changed)
+    failed = sum(1 for result in results if not result.ok)
+    unchanged = len(results) - changed - failed
+    verb = "would change" if dry_run else "changed"
+    lines.append(f"{changed} {verb}, {unchanged} unchanged, {failed} failed.")
+    return "\n".join(lines)
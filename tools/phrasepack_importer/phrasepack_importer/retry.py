@@ -0,0 +1,146 @@
+"""Retry policy for Gemini calls: backoff, jitter and error classification."""
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable
+
+# Error kinds. Transient errors resend the same request after a backoff; parse
+# errors re-prompt right away ("Return strictly valid JSON only.").
+TRANSIENT = "transient"
+PARSE = "parse"
+FATAL = "fatal"
+
+_TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+_RETRY_DELAY_RE = re.compile(r"^\s*([\d.]+)s\s*$")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to retry.
+
+    `max_attempts` bounds sends of one request on transient errors (429, 5xx,
+    timeouts, dropped connections); `parse_attempts` bounds re-prompts after
+    unparseable output. Backoff grows by `multiplier` from `base_delay` up to
+    `max_delay`, with up to `jitter` (a fraction) of it randomized. A server
+    Retry-After wins over the computed backoff. No retry starts once
+    `max_elapsed` seconds have passed since the first attempt.
+    """
+
+    max_attempts: int = 5
+    parse_attempts: int = 3
+    base_delay: float = 1.0
+    multiplier: float = 2.0
+    max_delay: float = 30.0
+    jitter: float = 0.5
+    max_elapsed: float = 180.0
+
+    def backoff(self, attempt: int, rand: Callable[[], float] = random.random) -> float:
+        """Delay before retry number `attempt` (1 = first retry)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter) + delay * self.jitter * rand()
+
+    def next_delay(
+        self,
+        exc: BaseException,
+        *,
+        attempt: int,
+        elapsed: float,
+        rand: Callable[[], float] = random.random,
+    ) -> float | None:
+        """Seconds to wait before resending after `exc`, or None to give up."""
+        if classify_error(exc) != TRANSIENT or attempt >= self.max_attempts:
+            return None
+        retry_after = retry_after_seconds(exc)
+        delay = retry_after if retry_after is not None else self.backoff(attempt, rand)
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_attempts=1, parse_attempts=1)
+
+
+@dataclass(frozen=True)
+class RetryEvent:
+    """Why one retry happened."""
+
+    kind: str
+    attempt: int
+    reason: str
+    delay: float = 0.0
+
+    def describe(self) -> str:
+        wait = f" in {self.delay:.1f}s" if self.delay else ""
+        return f"retry {self.attempt} ({self.kind}){wait}: {self.reason}"
+
+
+def _status_code(exc: BaseException) -> int | None:
+    code = getattr(exc, "code", None)
+    if isinstance(code, int):
+        return code
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(exc: BaseException) -> str:
+    """TRANSIENT for errors worth resending, PARSE for bad output, else FATAL."""
+    import asyncio
+
+    from .schema import ParseError
+
+    if isinstance(exc, ParseError):
+        return PARSE
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return TRANSIENT
+    code = _status_code(exc)
+    if code is not None:
+        return TRANSIENT if code in _TRANSIENT_STATUS_CODES else FATAL
+    # httpx timeouts and transport errors (connect/read failures) without importing httpx.
+    for cls in type(exc).__mro__:
+        if cls.__module__.startswith("httpx") and cls.__name__ in (
+            "TimeoutException",
+            "TransportError",
+        ):
+            return TRANSIENT
+    return FATAL
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Server-requested delay from a Retry-After header or a google.rpc.RetryInfo."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            when = None
+        if when is not None:
+            if when.tzinfo is None:
+                # "-0000" parses to a naive datetime; HTTP dates are always UTC.
+                when = when.replace(tzinfo=timezone.utc)
+            return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    details = getattr(exc, "details", None)
+    error = details.get("error", details) if isinstance(details, dict) else None
+    for detail in (error or {}).get("details", []) if isinstance(error, dict) else []:
+        if isinstance(detail, dict) and "retryDelay" in detail:
+            match = _RETRY_DELAY_RE.match(str(detail["retryDelay"]))
+            if match:
+                return float(match.group(1))
+    return None
+
+
+def describe_error(exc: BaseException) -> str:
+    code = _status_code(exc)
+    message = str(exc) or type(exc).__name__
+    if len(message) > 200:
+        message = message[:197] + "..."
+    return f"{code} {message}" if code is not None and not message.startswith(str(code)) else message
@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Iterable
+from typing import Any, Iterable, TypeVar
 
 from pydantic import BaseModel, ValidationError, model_validator
 
@@ -82,38 +82,186 @@ def _extract_json_object(raw: str) -> str:
     return text[start : end + 1]
 
 
-def parse_extracted_json(raw: str) -> ExtractedPayload:
-    """Parse and validate raw JSON from the LLM."""
-    try:
-        cleaned = _strip_code_fences(raw)
-        data = json.loads(cleaned)
-    except json.JSONDecodeError as exc:
+_SMART_DOUBLE_QUOTES = frozenset("“”„″")
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+def _closes_string(text: str, index: int) -> bool:
+    """Whether the next non-space character after `index` can follow a JSON string."""
+    index += 1
+    while index < len(text) and text[index].isspace():
+        index += 1
+    return index == len(text) or text[index] in ":,}]"
+
+
+def _translate_smart_quotes(text: str) -> str:
+    """Turn smart double quotes used as string delimiters into ASCII quotes.
+
+    Quotes inside a string stay as they are, so quoted dialogue in a value
+    ("dire “ciao”") survives. A string opened by a smart quote is closed by the
+    next one that is followed by `:`, `,`, `}`, `]` or the end.
+    """
+    out: list[str] = []
+    # The delimiter of the string being read: "", '"', "'" or "smart".
+    quote = ""
+    index = 0
+    while index < len(text):
+        char = text[index]
+        if char == "\\" and quote:
+            out.append(text[index : index + 2])
+            index += 2
+            continue
+        if not quote:
+            if char in _SMART_DOUBLE_QUOTES:
+                quote, char = "smart", '"'
+            elif char in "\"'":
+                quote = char
+        elif char == quote or (quote == "smart" and char == '"'):
+            quote = ""
+        elif quote == "smart" and char in _SMART_DOUBLE_QUOTES and _closes_string(text, index):
+            quote, char = "", '"'
+        out.append(char)
+        index += 1
+    return "".join(out)
+
+
+def _single_quoted_to_json(text: str, start: int) -> tuple[str, int]:
+    """Read a 'single-quoted' string at `start`; return it as JSON and the end index."""
+    chars = []
+    index = start + 1
+    while index < len(text):
+        char = text[index]
+        if char == "\\" and index + 1 < len(text):
+            chars.append(text[index + 1])
+            index += 2
+            continue
+        if char == "'":
+            return json.dumps("".join(chars), ensure_ascii=False), index + 1
+        chars.append(char)
+        index += 1
+    raise ValueError("unterminated string")
+
+
+def repair_json(raw: str) -> str | None:
+    """Deterministically fix common LLM JSON mistakes; None if nothing to fix.
+
+    Handles code fences and surrounding prose, smart double quotes used as string
+    delimiters, single-quoted keys/strings, trailing commas and missing or
+    mismatched closing brackets. Truncated output is cut back to the last
+    complete array element, so a cut-off list keeps its complete items.
+    """
+    text = _translate_smart_quotes(_extract_json_object(_strip_code_fences(raw)))
+    start = text.find("{")
+    if start == -1:
+        return None
+    text = text[start:]
+
+    out: list[str] = []
+    stack: list[str] = []
+    # (len(out), stack) after the last complete element of an array.
+    checkpoint: tuple[int, list[str]] | None = None
+    index = 0
+    truncated = False
+
+    def mark() -> None:
+        nonlocal checkpoint
+        if not stack or stack[-1] == "[":
+            checkpoint = (len(out), list(stack))
+
+    while index < len(text):
+        char = text[index]
+        if char == '"':
+            end = index + 1
+            while end < len(text) and text[end] != '"':
+                end += 2 if text[end] == "\\" else 1
+            if end >= len(text):
+                truncated = True
+                break
+            out.append(text[index : end + 1])
+            index = end + 1
+            continue
+        if char == "'":
+            try:
+                quoted, index = _single_quoted_to_json(text, index)
+            except ValueError:
+                truncated = True
+                break
+            out.append(quoted)
+            continue
+        if char in "{[":
+            stack.append(char)
+            out.append(char)
+        elif char in "}]":
+            if not stack:
+                index += 1
+                continue  # stray closer
+            # Drop a trailing comma before the closer.
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+            out.append(_CLOSERS[stack.pop()])
+            mark()
+            if not stack:
+                break
+        elif char == ",":
+            if stack and stack[-1] == "[":
+                mark()
+            out.append(char)
+        else:
+            out.append(char)
+        index += 1
+    else:
+        truncated = bool(stack)
+
+    if truncated or stack:
+        if checkpoint is None:
+            return None
+        length, stack = checkpoint
+        out = out[:length]
+        while out and (out[-1].isspace() or out[-1] == ","):
+            out.pop()
+        out.extend(_CLOSERS[opener] for opener in reversed(stack))
+
+    repaired = "".join(out)
+    return None if repaired == raw else repaired
+
+
+_ModelT = TypeVar("_ModelT", bound=BaseModel)
+
+
+def _is_json_error(exc: ValidationError) -> bool:
+    return any(error["type"] == "json_invalid" for error in exc.errors())
+
+
+def _parse_json_payload(model: type[_ModelT], raw: str) -> _ModelT:
+    """Validate `raw` straight from JSON, retrying without fences and surrounding prose.
+
+    pydantic parses and validates in one pass, so clean responses (the common case)
+    never build an intermediate dict.
+    """
+    unfenced = _strip_code_fences(raw)
+    candidates = dict.fromkeys([raw, unfenced, _extract_json_object(unfenced)])
+    first_error: ValidationError | None = None
+    for candidate in candidates:
         try:
-            data = json.loads(_extract_json_object(_strip_code_fences(raw)))
-        except json.JSONDecodeError as inner_exc:
-            raise ParseError(f"Invalid JSON: {exc}") from inner_exc
+            return model.model_validate_json(candidate)
+        except ValidationError as exc:
+            if not _is_json_error(exc):
+                raise ParseError(f"JSON schema mismatch: {exc}") from exc
+            first_error = first_error or exc
+    assert first_error is not None
+    raise ParseError(f"Invalid JSON: {first_error.errors()[0]['msg']}") from first_error
 
-    try:
-        return ExtractedPayload.model_validate(data)
-    except ValidationError as exc:
-        raise ParseError(f"JSON schema mismatch: {exc}") from exc
+
+def parse_extracted_json(raw: str) -> ExtractedPayload:
+    """Parse and validate raw JSON from the LLM."""
+    return _parse_json_payload(ExtractedPayload, raw)
 
 
 def parse_raw_pairs_json(raw: str) -> RawPairsPayload:
     """Parse and validate raw JSON containing simple src/dst pairs."""
-    try:
-        cleaned = _strip_code_fences(raw)
-        data = json.loads(cleaned)
-    except json.JSONDecodeError as exc:
-        try:
-            data = json.loads(_extract_json_object(_strip_code_fences(raw)))
-        except json.JSONDecodeError as inner_exc:
-            raise ParseError(f"Invalid JSON: {exc}") from inner_exc
-
-    try:
-        return RawPairsPayload.model_validate(data)
-    except ValidationError as exc:
-        raise ParseError(f"JSON schema mismatch: {exc}") from exc
+    return _parse_json_payload(RawPairsPayload, raw)
 
 
 def assert_non_empty(items: Iterable[ExtractedItem]) -> list[ExtractedItem]:
@@ -141,3 +289,11 @@ def assert_non_empty_pairs(pairs: Iterable[RawPair]) -> list[RawPair]:
 def serialize_phrasepack(phrasepack: Phrasepack) -> dict[str, Any]:
     """Return a JSON-serializable dict with stable key ordering."""
     return phrasepack.model_dump()
+
+
+def phrasepack_json(phrasepack: Phrasepack, *, minify: bool = False) -> bytes:
+    """Encode a phrasepack as UTF-8 JSON, byte-identical to `io.encode_json` of its dict.
+
+    Serializes in pydantic's core without building the intermediate dict.
+    """
+    return phrasepack.model_dump_json(indent=None if minify else 2).encode("utf-8") + b"\n"
@@ -0,0 +1,307 @@
+"""Offline stand-ins for the Gemini client: record, replay and stub transports.
+
+Each transport exposes the slice of `genai.Client` that `GeminiSession` uses
+(`models.generate_content`, `aio.models.generate_content`, `close`), so it is
+passed as `GeminiSession(client=...)` and the retry, repair, rate-limit and
+metrics code runs unchanged without a network.
+"""
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Callable
+
+from .cache import hash_key
+from .ratelimit import estimate_tokens
+
+if TYPE_CHECKING:
+    from google.genai import types
+
+TRANSPORTS = ("live", "record", "replay", "stub")
+
+_PAIRS_JSON_RE = re.compile(r"Input pairs JSON:\n(.*)", re.DOTALL)
+_TEXT_TO_FIX_RE = re.compile(r"Text to fix:\n[^{]*(\{.*)", re.DOTALL)
+_QUOTED_KEY_RE = re.compile(r'"(\w+)":')
+_UNQUOTED_KEY_RE = re.compile(r"([{,]\s*)(\w+):")
+
+
+class TranscriptMissError(LookupError):
+    """Raised in replay mode when no recorded response matches a request."""
+
+
+@dataclass(frozen=True)
+class TranscriptResponse:
+    """The parts of a GenerateContentResponse the importer reads."""
+
+    text: str | None
+    usage_metadata: types.GenerateContentResponseUsageMetadata | None = None
+
+
+def _request_parts(contents: Any) -> list[str | bytes]:
+    if isinstance(contents, (str, bytes)):
+        return [contents]
+    parts: list[str | bytes] = []
+    for part in contents:
+        if isinstance(part, str):
+            parts.append(part)
+        elif getattr(part, "inline_data", None) is not None:
+            parts.extend([part.inline_data.mime_type or "", part.inline_data.data or b""])
+        else:
+            parts.append(getattr(part, "text", None) or "")
+    return parts
+
+
+def request_key(*, model: str, contents: Any, config: types.GenerateContentConfig) -> str:
+    """Stable key of one generate_content request."""
+    return hash_key(model, config.model_dump_json(exclude_none=True), *_request_parts(contents))
+
+
+def _is_pairs_request(config: types.GenerateContentConfig) -> bool:
+    schema = config.response_schema
+    return isinstance(schema, dict) and "pairs" in schema.get("properties", {})
+
+
+class _SyncAsyncClient:
+    """Exposes `_generate_content(_async)` as `models` and `aio.models`."""
+
+    def __init__(self) -> None:
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(generate_content=self._generate_content_async)
+        )
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingClient(_SyncAsyncClient):
+    """Forwards to a live client and saves each request/response pair under `directory`.
+
+    `connect` builds the live client on first use, so cache hits stay offline.
+    `close` releases whatever `connect` used (e.g. the live session); it runs when
+    this client is closed.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        directory: Path,
+        *,
+        close: Callable[[], None] | None = None,
+    ) -> None:
+        super().__init__()
+        self._connect = connect
+        self._close = close
+        self._client: Any = None
+        self._lock = threading.Lock()
+        self.directory = directory
+        self.recorded = 0
+
+    def _live(self) -> Any:
+        with self._lock:
+            if self._client is None:
+                self._client = self._connect()
+            return self._client
+
+    def _save(self, *, model: str, contents: Any, config: Any, response: Any) -> None:
+        key = request_key(model=model, contents=contents, config=config)
+        usage = getattr(response, "usage_metadata", None)
+        prompt = next((part for part in _request_parts(contents) if isinstance(part, str)), "")
+        entry = {
+            "model": model,
+            "prompt_preview": prompt[:200],
+            "text": response.text,
+            "usage": usage.model_dump(exclude_none=True) if usage is not None else None,
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / f"{key}.json").write_text(
+            json.dumps(entry, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+        with self._lock:
+            self.recorded += 1
+
+    def _generate_content(self, *, model: str, contents: Any, config: Any) -> Any:
+        response = self._live().models.generate_content(
+            model=model, contents=contents, config=config
+        )
+        self._save(model=model, contents=contents, config=config, response=response)
+        return response
+
+    async def _generate_content_async(self, *, model: str, contents: Any, config: Any) -> Any:
+        response = await self._live().aio.models.generate_content(
+            model=model, contents=contents, config=config
+        )
+        self._save(model=model, contents=contents, config=config, response=response)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if self._close is not None:
+            self._close()  # the owner of the live client closes it
+        elif client is not None and hasattr(client, "close"):
+            client.close()
+
+
+class ReplayClient(_SyncAsyncClient):
+    """Answers requests from transcripts saved by RecordingClient."""
+
+    def __init__(self, directory: Path, *, latency: float = 0.0) -> None:
+        super().__init__()
+        self.directory = directory
+        self.latency = latency
+
+    def _load(self, *, model: str, contents: Any, config: Any) -> TranscriptResponse:
+        key = request_key(model=model, contents=contents, config=config)
+        path = self.directory / f"{key}.json"
+        if not path.exists():
+            raise TranscriptMissError(
+                f"No recorded response for request {key[:12]} in {self.directory}"
+            )
+        from google.genai import types
+
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        usage = entry.get("usage")
+        return TranscriptResponse(
+            text=entry.get("text"),
+            usage_metadata=(
+                types.GenerateContentResponseUsageMetadata(**usage) if usage else None
+            ),
+        )
+
+    def _generate_content(self, *, model: str, contents: Any, config: Any) -> TranscriptResponse:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._load(model=model, contents=contents, config=config)
+
+    async def _generate_content_async(
+        self, *, model: str, contents: Any, config: Any
+    ) -> TranscriptResponse:
+        import asyncio
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._load(model=model, contents=contents, config=config)
+
+
+@dataclass(frozen=True)
+class StubOptions:
+    """Behavior of the StubClient; rates are probabilities per request."""
+
+    latency: float = 0.0
+    error_rate: float = 0.0
+    malformed_rate: float = 0.0
+    pairs_per_image: int = 20
+    seed: int = 0
+
+
+class StubClient(_SyncAsyncClient):
+    """In-process fake Gemini with configurable latency, errors and malformed JSON.
+
+    Step 1 returns `pairs_per_image` synthetic pairs derived from the image bytes;
+    step 2 echoes the input pairs back as items. Errors are 503 ServerErrors, so
+    they go through the session's retry policy like real outages.
+
+    Malformed output is one of: truncated (last fifth cut), a trailing comma or
+    wrapped in prose, all fixed by the local repair; or unquoted keys, which only
+    a re-prompt or a remote repair fixes (the stub answers repair requests with
+    the embedded JSON, keys quoted).
+    """
+
+    def __init__(self, options: StubOptions | None = None) -> None:
+        super().__init__()
+        self.options = options or StubOptions()
+        self._random = random.Random(self.options.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.malformed = 0
+
+    def _roll(self) -> tuple[bool, bool, float]:
+        with self._lock:
+            self.calls += 1
+            error = self._random.random() < self.options.error_rate
+            malformed = not error and self._random.random() < self.options.malformed_rate
+            self.errors += error
+            self.malformed += malformed
+            return error, malformed, self._random.random()
+
+    def _body(self, contents: Any, config: Any) -> str:
+        parts = _request_parts(contents)
+        prompt = next((part for part in parts if isinstance(part, str)), "")
+        fix = _TEXT_TO_FIX_RE.search(prompt)
+        if fix:
+            # Repair request: return the JSON embedded in the text to fix.
+            try:
+                text = _UNQUOTED_KEY_RE.sub(r'\1"\2":', fix.group(1))
+                fixed = json.JSONDecoder().raw_decode(text)[0]
+                return json.dumps(fixed, ensure_ascii=False)
+            except ValueError:
+                pass
+        if _is_pairs_request(config):
+            seed = hash_key(*parts)[:6]
+            pairs = [
+                {"src": f"parola {seed} {index}", "dst": f"sana {seed} {index}"}
+                for index in range(self.options.pairs_per_image)
+            ]
+            return json.dumps({"pairs": pairs}, ensure_ascii=False)
+        match = _PAIRS_JSON_RE.search(prompt)
+        # raw_decode: a retry suffix may follow the JSON.
+        pairs = json.JSONDecoder().raw_decode(match.group(1))[0]["pairs"] if match else []
+        items = [{"surface": pair["src"], "dst": pair["dst"]} for pair in pairs]
+        return json.dumps({"items": items}, ensure_ascii=False)
+
+    def _respond(
+        self, contents: Any, config: Any, error: bool, malformed: bool, pick: float
+    ) -> TranscriptResponse:
+        from google.genai import errors, types
+
+        if error:
+            raise errors.ServerError(
+                503, {"error": {"code": 503, "message": "stub outage", "status": "UNAVAILABLE"}}
+            )
+        text = self._body(contents, config)
+        if malformed:
+            if pick < 1 / 4:
+                text = text[: len(text) - max(1, len(text) // 5)]
+            elif pick < 2 / 4:
+                text = text[:-2] + ",]}"
+            elif pick < 3 / 4:
+                text = "Sure! Here is the JSON:\n" + text
+            else:
+                text = _QUOTED_KEY_RE.sub(r"\1:", text)
+        prompt_tokens = estimate_tokens(contents)
+        output_tokens = max(1, len(text) // 4)
+        return TranscriptResponse(
+            text=text,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def _generate_content(self, *, model: str, contents: Any, config: Any) -> TranscriptResponse:
+        error, malformed, pick = self._roll()
+        if self.options.latency:
+            time.sleep(self.options.latency)
+        return self._respond(contents, config, error, malformed, pick)
+
+    async def _generate_content_async(
+        self, *, model: str, contents: Any, config: Any
+    ) -> TranscriptResponse:
+        import asyncio
+
+        error, malformed, pick = self._roll()
+        if self.options.latency:
+            await asyncio.sleep(self.options.latency)
+        return self._respond(contents, config, error, malformed, pick)
+
+    def summary(self) -> str:
+        return f"{self.calls} stub calls, {self.errors} injected errors, {self.malformed} malformed"
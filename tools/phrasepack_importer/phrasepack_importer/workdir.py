@@ -0,0 +1,112 @@
+"""Per-image checkpoints, so an interrupted multi-image import can resume."""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from .cache import default_cache_dir, hash_key
+from .io import write_bytes_atomic
+
+RAW_PAIRS = "raw_pairs"
+ITEMS = "items"
+PACK = "pack"
+STAGES = (RAW_PAIRS, ITEMS, PACK)
+# Latest cleaned items of each pack, with the pack's metadata, for `renormalize`.
+EXTRACTED_DIR = "extracted"
+
+
+def default_work_dir() -> Path:
+    """Per-user checkpoint folder, next to the response cache."""
+    return default_cache_dir().parent / "work"
+
+
+def image_key(image_bytes: bytes) -> str:
+    """Checkpoint folder name of an image: the sha256 of its file bytes."""
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    # Write-then-rename: a run killed mid-write never leaves a torn checkpoint.
+    write_bytes_atomic(path, text.encode("utf-8"))
+
+
+class WorkDir:
+    """Stage outputs of each image under `root/<image sha256>/<stage>-<inputs>.json`.
+
+    Every stage output is saved as soon as it exists. Each file is named after a
+    hash of everything that shaped it (model, prompt, the previous stage's output,
+    ...), so changed settings never pick up a stale checkpoint. Only with
+    `resume=True` are checkpoints read back, letting a re-run skip the vision call,
+    the cleanup call or the whole image. Safe to share between threads.
+    """
+
+    def __init__(self, root: Path, *, resume: bool = False) -> None:
+        self.root = root
+        self.resume = resume
+        self.reused = dict.fromkeys(STAGES, 0)
+        self.saved = dict.fromkeys(STAGES, 0)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str, stage: str, inputs: tuple[str | bytes, ...]) -> Path:
+        return self.root / key / f"{stage}-{hash_key(stage, *inputs)[:16]}.json"
+
+    def _read(self, key: str, stage: str, inputs: tuple[str | bytes, ...]) -> str | None:
+        if not self.resume:
+            return None
+        try:
+            return self._path(key, stage, inputs).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def _count(self, counter: dict[str, int], stage: str) -> None:
+        with self._lock:
+            counter[stage] += 1
+
+    def get(self, key: str, stage: str, *inputs: str | bytes) -> str | None:
+        """The saved output of `stage` for these inputs, or None (always None without resume)."""
+        text = self._read(key, stage, inputs)
+        if text is not None:
+            self._count(self.reused, stage)
+        return text
+
+    def get_file(self, key: str, stage: str, *inputs: str | bytes, path: Path) -> dict | None:
+        """The record saved by `put_file`, if `path` still holds the bytes it recorded."""
+        text = self._read(key, stage, inputs)
+        if text is None:
+            return None
+        try:
+            record = json.loads(text)
+            current = hashlib.sha256(path.read_bytes()).hexdigest()
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or record.get("sha256") != current:
+            return None
+        self._count(self.reused, stage)
+        return record
+
+    def put_file(
+        self, key: str, stage: str, *inputs: str | bytes, path: Path, **info: object
+    ) -> None:
+        """Record that `stage` wrote `path` (with its sha256 and `info`)."""
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        record = {"path": str(path), "sha256": sha256, **info}
+        self.put(key, stage, *inputs, text=json.dumps(record, ensure_ascii=False))
+
+    def put(self, key: str, stage: str, *inputs: str | bytes, text: str) -> None:
+        _write_atomic(self._path(key, stage, inputs), text)
+        self._count(self.saved, stage)
+
+    def put_extracted(self, output_path: Path, text: str) -> None:
+        """Save the latest step-2 output of the pack written to `output_path`."""
+        # Keyed by the resolved path: relative and absolute runs share one record.
+        name = f"{output_path.stem}-{hash_key(str(output_path.resolve()))[:8]}.json"
+        _write_atomic(self.root / EXTRACTED_DIR / name, text)
+
+    def extracted_files(self) -> list[Path]:
+        return sorted((self.root / EXTRACTED_DIR).glob("*.json"))
+
+    def summary(self) -> str:
+        reused = ", ".join(f"{self.reused[stage]} {stage}" for stage in STAGES)
+        return f"reused {reused}; saved {sum(self.saved.values())} checkpoints ({self.root})"
@@ -0,0 +1,121 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from phrasepack_importer.batch import (
+    ImportJob,
+    ImportStats,
+    ManifestError,
+    format_summary,
+    jobs_from_directory,
+    load_manifest,
+    run_batch,
+)
+
+
+def _job(name: str) -> ImportJob:
+    return ImportJob(
+        image_path=Path(f"{name}.jpg"),
+        pack_id=name,
+        title=name,
+        src_lang="it",
+        dst_lang="fi",
+        output_path=Path(f"{name}.json"),
+    )
+
+
+def test_jobs_from_directory_derives_ids_and_titles(tmp_path):
+    (tmp_path / "bella_vista_1_ch_2.jpg").write_bytes(b"x")
+    (tmp_path / "bella_vista_1_ch_1.JPG").write_bytes(b"x")
+    (tmp_path / "notes.txt").write_text("skip")
+
+    jobs = jobs_from_directory(tmp_path, src_lang="it", dst_lang="fi", out_dir=Path("out"))
+
+    assert [job.pack_id for job in jobs] == ["bella-vista-1-ch-1", "bella-vista-1-ch-2"]
+    assert jobs[0].title == "Bella vista 1 ch 1"
+    assert jobs[0].output_path == Path("out/bella-vista-1-ch-1.json")
+
+
+def test_load_manifest_resolves_paths_and_defaults(tmp_path):
+    manifest = tmp_path / "book.json"
+    manifest.write_text(
+        json.dumps(
+            {
+                "packs": [
+                    {"image": "ch1.jpg", "id": "ch-1", "title": "Ch 1"},
+                    {"image": "ch2.jpg", "id": "ch-2", "title": "Ch 2", "dst": "sv", "out": "x.json"},
+                ]
+            }
+        )
+    )
+
+    jobs = load_manifest(manifest, src_lang="it", dst_lang="fi", out_dir=Path("out"))
+
+    assert jobs[0].image_path == tmp_path / "ch1.jpg"
+    assert jobs[0].output_path == Path("out/ch-1.json")
+    assert (jobs[1].dst_lang, jobs[1].output_path) == ("sv", tmp_path / "x.json")
+
+
+def test_load_manifest_reports_missing_fields(tmp_path):
+    manifest = tmp_path / "book.json"
+    manifest.write_text(json.dumps([{"image": "ch1.jpg"}]))
+    with pytest.raises(ManifestError, match="id, title"):
+        load_manifest(manifest, src_lang="it", dst_lang="fi", out_dir=tmp_path)
+
+
+def test_duplicate_pack_ids_and_outputs_are_rejected(tmp_path):
+    (tmp_path / "ch_1.jpg").write_bytes(b"x")
+    (tmp_path / "ch-1.png").write_bytes(b"x")
+    with pytest.raises(ManifestError, match="both have pack id 'ch-1'"):
+        jobs_from_directory(tmp_path, src_lang="it", dst_lang="fi", out_dir=tmp_path)
+
+    manifest = tmp_path / "book.json"
+    manifest.write_text(
+        json.dumps(
+            [
+                {"image": "a.jpg", "id": "a", "title": "A", "out": "same.json"},
+                {"image": "b.jpg", "id": "b", "title": "B", "out": "./same.json"},
+            ]
+        )
+    )
+    with pytest.raises(ManifestError, match="both write"):
+        load_manifest(manifest, src_lang="it", dst_lang="fi", out_dir=tmp_path)
+
+
+def test_run_batch_keeps_going_after_failures_and_bounds_workers():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    gate = threading.Barrier(2, timeout=5)
+
+    def run_job(job: ImportJob) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            if job.pack_id in {"a", "b"}:
+                gate.wait()
+            if job.pack_id == "bad":
+                raise ValueError("unreadable page")
+            return ImportStats(item_count=len(job.pack_id))
+        finally:
+            with lock:
+                active -= 1
+
+    finished = []
+    jobs = [_job("a"), _job("b"), _job("bad"), _job("long")]
+    results = run_batch(jobs, run_job, workers=2, on_result=finished.append)
+
+    assert [result.job.pack_id for result in results] == ["a", "b", "bad", "long"]
+    assert [result.ok for result in results] == [True, True, False, True]
+    assert results[3].item_count == 4
+    assert "unreadable page" in results[2].error
+    assert len(finished) == 4
+    assert peak == 2
+
+    summary = format_summary(results)
+    assert "FAIL  bad.jpg: ValueError: unreadable page" in summary
+    assert summary.endswith("3 succeeded, 1 failed.")
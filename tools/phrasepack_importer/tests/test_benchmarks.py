@@ -0,0 +1,22 @@
+from benchmarks.run import cases, format_report, run
+from benchmarks.synthetic import make_items
+
+
+def test_synthetic_items_are_deterministic_and_noisy():
+    items = make_items(500, seed=3)
+
+    assert items == make_items(500, seed=3)
+    surfaces = [item.resolved_surface() for item in items]
+    assert any(surface.startswith("i'") for surface in surfaces)
+    assert any("(" in surface for surface in surfaces)
+    assert any("(mies, nainen)" in (item.dst or "") for item in items)
+    assert len({id(item) for item in items}) < len(items)  # duplicates
+
+
+def test_runner_reports_every_case_and_compares_to_baseline():
+    report = run([200], repeat=1)
+
+    assert set(report["results"]["200"]) == set(cases(make_items(10)))
+    text = format_report(report, baseline=report)
+    assert "build_phrasepack" in text
+    assert "1.00x" in text
@@ -0,0 +1,120 @@
+import os
+import time
+from types import SimpleNamespace
+
+from phrasepack_importer import gemini_client
+from phrasepack_importer.cache import ResponseCache, hash_key
+
+
+def test_hash_key_is_stable_and_unambiguous():
+    assert hash_key("a", b"bc") == hash_key("a", b"bc")
+    assert hash_key("ab", "c") != hash_key("a", "bc")
+
+
+def test_cache_round_trip_and_counters(tmp_path):
+    cache = ResponseCache(tmp_path)
+    key = hash_key("step", "prompt")
+
+    assert cache.get(key) is None
+    cache.put(key, '{"pairs": []}')
+    assert cache.get(key) == '{"pairs": []}'
+    assert cache.stats() == {"hits": 1, "misses": 1, "writes": 1, "evictions": 0}
+
+
+def test_refresh_skips_reads_but_still_writes(tmp_path):
+    ResponseCache(tmp_path).put("ab" * 32, "old")
+    cache = ResponseCache(tmp_path, refresh=True)
+
+    assert cache.get("ab" * 32) is None
+    cache.put("ab" * 32, "new")
+    assert ResponseCache(tmp_path).get("ab" * 32) == "new"
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = ResponseCache(tmp_path, max_age=60)
+    cache.put("cd" * 32, "value")
+    path = tmp_path / "cd" / f"{'cd' * 32}.json"
+    stale = time.time() - 120
+    os.utime(path, (stale, stale))
+
+    assert cache.get("cd" * 32) is None
+    assert not path.exists()
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10)
+    cache.put("aa" * 32, "12345")
+    old = time.time() - 100
+    os.utime(tmp_path / "aa" / f"{'aa' * 32}.json", (old, old))
+    cache.put("bb" * 32, "12345")
+    cache.put("cc" * 32, "12345")
+
+    assert cache.get("aa" * 32) is None
+    assert cache.get("cc" * 32) == "12345"
+    assert cache.evictions == 1
+
+
+def test_extract_pairs_cache_hit_makes_no_remote_calls(tmp_path, monkeypatch):
+    calls = []
+    responses = {
+        "pairs": '{"pairs": [{"src": "ciao", "dst": "moi"}]}',
+        "items": '{"items": [{"surface": "ciao", "dst": "moi"}]}',
+    }
+
+    def generate_content(*, model, contents, config):
+        calls.append(model)
+        key = "pairs" if len(calls) % 2 else "items"
+        return SimpleNamespace(text=responses[key])
+
+    def fake_client(**kwargs):
+        return SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+
+    monkeypatch.setattr("google.genai.Client", fake_client)
+    cache = ResponseCache(tmp_path)
+    kwargs = dict(
+        image_bytes=b"image",
+        image_prompt="prompt 1",
+        transform_prompt="prompt 2",
+        model="gemini-test",
+        project="test-project",
+        location="us-central1",
+        cache=cache,
+    )
+
+    first = gemini_client.extract_pairs(**kwargs)
+    second = gemini_client.extract_pairs(**kwargs)
+
+    assert len(calls) == 2
+    assert first == second
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_invalid_cache_entries_are_refetched(tmp_path, monkeypatch):
+    calls = []
+
+    def generate_content(*, model, contents, config):
+        calls.append(model)
+        return SimpleNamespace(text='{"items": [{"surface": "ciao", "dst": "moi"}]}')
+
+    def fake_client(**kwargs):
+        return SimpleNamespace(models=SimpleNamespace(generate_content=generate_content))
+
+    monkeypatch.setattr("google.genai.Client", fake_client)
+    cache = ResponseCache(tmp_path)
+    kwargs = dict(
+        pairs_json='{"pairs": [{"src": "ciao", "dst": "moi"}]}',
+        prompt="prompt 2",
+        model="gemini-test",
+        project="test-project",
+        cache=cache,
+    )
+    gemini_client.pairs_to_items(**kwargs)
+    [entry] = tmp_path.glob("*/*.json")
+    entry.write_text('{"items": "not a list"}', encoding="utf-8")
+
+    payload = gemini_client.pairs_to_items(**kwargs)
+
+    assert payload.items[0].surface == "ciao"
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert "not a list" not in entry.read_text(encoding="utf-8")
@@ -0,0 +1,304 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from phrasepack_importer import gemini_client
+from phrasepack_importer.gemini_client import (
+    GeminiSession,
+    clear_project_cache,
+    detect_project,
+    extract_pairs,
+    extract_pairs_async,
+    extract_raw_pairs_async,
+    pairs_to_items_chunked,
+    pairs_to_items_chunked_async,
+    split_raw_pairs,
+)
+from phrasepack_importer.metrics import RunMetrics
+from phrasepack_importer.retry import NO_RETRY
+from phrasepack_importer.schema import RawPair, RawPairsPayload
+from phrasepack_importer.transport import StubClient
+
+
+class FakeClient:
+    """Answers step 1 with raw pairs and step 2 with cleaned items."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.calls = 0
+        self.closed = False
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+
+    def _generate_content(self, *, model, contents, config):
+        self.calls += 1
+        if "pairs" in config.response_schema["properties"]:
+            return SimpleNamespace(text='{"pairs": [{"src": "ciao", "dst": "moi"}]}')
+        return SimpleNamespace(text='{"items": [{"surface": "ciao", "dst": "moi"}]}')
+
+    def close(self):
+        self.closed = True
+
+
+def _extract(session):
+    return extract_pairs(
+        image_bytes=b"image",
+        image_prompt="prompt 1",
+        transform_prompt="prompt 2",
+        model="gemini-test",
+        session=session,
+    )
+
+
+def test_session_resolves_project_and_builds_client_once(monkeypatch):
+    lookups = []
+    clients = []
+
+    def fake_detect_project(**kwargs):
+        lookups.append(1)
+        return "detected-project"
+
+    def fake_client(**kwargs):
+        clients.append(FakeClient(**kwargs))
+        return clients[-1]
+
+    monkeypatch.setattr(gemini_client, "detect_project", fake_detect_project)
+    monkeypatch.setattr("google.genai.Client", fake_client)
+
+    with GeminiSession(location="europe-west1") as session:
+        for _ in range(3):
+            assert _extract(session).items[0].surface == "ciao"
+
+    assert len(lookups) == 1
+    assert len(clients) == 1
+    assert clients[0].kwargs["project"] == "detected-project"
+    assert clients[0].kwargs["location"] == "europe-west1"
+    assert clients[0].calls == 6
+    assert clients[0].closed
+
+
+def test_session_uses_injected_client_without_project_lookup(monkeypatch):
+    def fail(**kwargs):
+        raise AssertionError("project lookup should not run")
+
+    monkeypatch.setattr(gemini_client, "detect_project", fail)
+    client = FakeClient()
+
+    payload = _extract(GeminiSession(client=client))
+
+    assert payload.items[0].dst == "moi"
+    assert client.calls == 2
+
+
+class FakeAsyncClient(FakeClient):
+    """FakeClient with an `aio` surface that sleeps to simulate latency."""
+
+    def __init__(self, delay: float = 0.01, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = delay
+        self.in_flight = 0
+        self.peak = 0
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(generate_content=self._generate_content_async)
+        )
+
+    async def _generate_content_async(self, *, model, contents, config):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return self._generate_content(model=model, contents=contents, config=config)
+        finally:
+            self.in_flight -= 1
+
+
+def test_extract_pairs_async_caps_requests_in_flight():
+    client = FakeAsyncClient()
+    session = GeminiSession(client=client, max_concurrency=3)
+
+    async def run_all():
+        return await asyncio.gather(
+            *[
+                extract_pairs_async(
+                    image_bytes=f"page {index}".encode(),
+                    image_prompt="prompt 1",
+                    transform_prompt="prompt 2",
+                    model="gemini-test",
+                    session=session,
+                )
+                for index in range(10)
+            ]
+        )
+
+    payloads = asyncio.run(run_all())
+
+    assert all(payload.items[0].surface == "ciao" for payload in payloads)
+    assert client.calls == 20
+    assert client.peak == 3
+
+
+def test_async_requests_time_out():
+    session = GeminiSession(
+        client=FakeAsyncClient(delay=1), timeout=0.01, retry_policy=NO_RETRY
+    )
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(
+            extract_raw_pairs_async(
+                image_bytes=b"image", prompt="prompt", model="gemini-test", session=session
+            )
+        )
+
+
+class ScriptedClient:
+    """Returns canned response texts in order."""
+
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.prompts = []
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+
+    def _generate_content(self, *, model, contents, config):
+        self.prompts.append(contents if isinstance(contents, str) else contents[0])
+        return SimpleNamespace(text=self.texts.pop(0))
+
+
+def test_local_repair_avoids_remote_repair_call():
+    client = ScriptedClient(['{"pairs": [{"src": "ciao", "dst": "moi"},]'])
+    session = GeminiSession(client=client)
+
+    payload = gemini_client.extract_raw_pairs(
+        image_bytes=b"image", prompt="prompt", model="gemini-test", session=session
+    )
+
+    assert payload.pairs[0].src == "ciao"
+    assert len(client.prompts) == 1
+    assert (session.stats.local_repairs, session.stats.remote_repairs) == (1, 0)
+
+
+def test_remote_repair_still_runs_when_local_repair_fails():
+    client = ScriptedClient(["no json here", '{"pairs": [{"src": "ciao", "dst": "moi"}]}'])
+    session = GeminiSession(client=client)
+
+    payload = gemini_client.extract_raw_pairs(
+        image_bytes=b"image", prompt="prompt", model="gemini-test", session=session
+    )
+
+    assert payload.pairs[0].dst == "moi"
+    assert client.prompts[1].startswith("Fix the following text into valid JSON")
+    assert session.stats.remote_repairs == 1
+
+
+def test_detect_project_runs_gcloud_once_per_config(monkeypatch, tmp_path):
+    config = tmp_path / "gcloud" / "configurations" / "config_default"
+    config.parent.mkdir(parents=True)
+    config.write_text("[core]\nproject = first\n")
+    monkeypatch.setenv("CLOUDSDK_CONFIG", str(tmp_path / "gcloud"))
+    monkeypatch.delenv("GOOGLE_CLOUD_PROJECT", raising=False)
+    calls = []
+
+    def fake_gcloud(*args, **kwargs):
+        calls.append(args)
+        return "detected-project\n"
+
+    monkeypatch.setattr(gemini_client.subprocess, "check_output", fake_gcloud)
+    cache_file = tmp_path / "gcloud_project.json"
+    clear_project_cache()
+    try:
+        assert detect_project(cache_file=cache_file) == "detected-project"
+        assert detect_project(cache_file=cache_file) == "detected-project"
+        assert len(calls) == 1
+
+        clear_project_cache()  # a new process: answered from the cache file
+        assert detect_project(cache_file=cache_file) == "detected-project"
+        assert len(calls) == 1
+
+        stat = config.stat()
+        os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert detect_project(cache_file=cache_file) == "detected-project"
+        assert len(calls) == 2
+
+        monkeypatch.setenv("GOOGLE_CLOUD_PROJECT", "from-env")
+        assert detect_project(cache_file=cache_file) == "from-env"
+    finally:
+        clear_project_cache(cache_file)
+    assert not cache_file.exists()
+
+
+def _raw_pairs(count):
+    return RawPairsPayload(
+        pairs=[RawPair(src=f"parola {index}", dst=f"sana {index}") for index in range(count)]
+    )
+
+
+def test_split_raw_pairs_sends_compact_json_in_bounded_chunks():
+    chunks = split_raw_pairs(_raw_pairs(5), chunk_size=2)
+
+    assert len(chunks.chunks) == 3
+    assert chunks.chunks[0] == (
+        '{"pairs":[{"src":"parola 0","dst":"sana 0"},{"src":"parola 1","dst":"sana 1"}]}'
+    )
+    assert chunks.tokens_saved > 0
+    assert len(split_raw_pairs(_raw_pairs(5), chunk_size=0).chunks) == 1
+
+
+def test_chunked_cleanup_keeps_item_order():
+    chunks = split_raw_pairs(_raw_pairs(7), chunk_size=3)
+    metrics = RunMetrics()
+    session = GeminiSession(client=StubClient(), metrics=metrics)
+
+    def run(fn):
+        return fn(chunks=chunks, prompt="Clean.", model="gemini-test", session=session)
+
+    payloads = [
+        run(pairs_to_items_chunked),
+        asyncio.run(run(pairs_to_items_chunked_async)),
+    ]
+
+    for payload in payloads:
+        assert [item.surface for item in payload.items] == [f"parola {i}" for i in range(7)]
+    calls = [record for record in metrics.records if record["stage"] == "generate_content"]
+    assert sorted(record["chunk"] for record in calls) == ["1/3", "1/3", "2/3", "2/3", "3/3", "3/3"]
+
+
+class SlowSyncClient(FakeClient):
+    """FakeClient whose step-2 calls take a while and record the peak in flight."""
+
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.models = SimpleNamespace(generate_content=self._slow)
+
+    def _slow(self, **kwargs):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        try:
+            time.sleep(0.01)
+            return self._generate_content(**kwargs)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+def test_chunk_threads_of_concurrent_jobs_share_the_session_cap():
+    client = SlowSyncClient()
+    session = GeminiSession(client=client, max_concurrency=3)
+    chunks = split_raw_pairs(_raw_pairs(8), chunk_size=2)
+
+    def clean(_job):
+        return pairs_to_items_chunked(
+            chunks=chunks, prompt="Clean.", model="gemini-test", session=session
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        payloads = list(pool.map(clean, range(4)))
+
+    assert all(len(payload.items) == 4 for payload in payloads)
+    assert client.peak == 3
@@ -0,0 +1,115 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from phrasepack_importer.batch import ImportJob, import_job
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.ingest import Tile, TilingOptions, merge_tile_pairs, split_source
+from phrasepack_importer.metrics import RunMetrics
+from phrasepack_importer.schema import RawPair, RawPairsPayload
+from phrasepack_importer.transport import StubClient, StubOptions
+
+
+def _png(width: int, height: int) -> bytes:
+    out = BytesIO()
+    Image.new("L", (width, height), 255).save(out, format="PNG")
+    return out.getvalue()
+
+
+def _pdf(pages: int) -> bytes:
+    out = BytesIO()
+    images = [Image.new("RGB", (200, 300), (255, 255, 255 - 60 * page)) for page in range(pages)]
+    images[0].save(out, format="PDF", save_all=True, append_images=images[1:])
+    return out.getvalue()
+
+
+def test_short_images_are_not_touched():
+    data = _png(100, 300)
+
+    assert split_source(data) == [Tile(data)]
+    assert split_source(data, TilingOptions(tile_height=400)) == [Tile(data)]
+
+
+def test_tall_image_is_cut_into_overlapping_tiles():
+    tiles = split_source(_png(100, 1000), TilingOptions(tile_height=400, overlap=100))
+
+    assert [tile.label for tile in tiles] == [
+        "page 1 tile 1/3",
+        "page 1 tile 2/3",
+        "page 1 tile 3/3",
+    ]
+    assert [Image.open(BytesIO(tile.data)).size for tile in tiles] == [(100, 400)] * 3
+    assert [tile.overlap_before for tile in tiles] == [0.0, 0.25, 0.25]
+
+
+def test_tile_overlap_must_be_smaller_than_tile():
+    with pytest.raises(ValueError):
+        TilingOptions(tile_height=100, overlap=100)
+
+
+def test_pdf_is_split_into_pages():
+    pytest.importorskip("pypdfium2")
+
+    tiles = split_source(_pdf(3), TilingOptions(pdf_dpi=72))
+
+    assert [tile.label for tile in tiles] == ["page 1", "page 2", "page 3"]
+    assert Image.open(BytesIO(tiles[0].data)).size == (200, 300)
+
+
+def _pairs(*words: str) -> RawPairsPayload:
+    return RawPairsPayload(pairs=[RawPair(src=word, dst=word.upper()) for word in words])
+
+
+def test_merge_drops_rows_seen_in_the_shared_band_only():
+    tiles = [
+        Tile(b"", page=1, index=1, count=2),
+        Tile(b"", page=1, index=2, count=2, overlap_before=0.25),
+        Tile(b"", page=2),
+    ]
+    payloads = [
+        _pairs("a", "b", "c", "d", "e", "f", "g", "h"),
+        # "g" and "h" were in the overlap band of both tiles ("h " differs only in spacing).
+        _pairs("g", "h ", "i", "j", "k", "l", "m", "a"),
+        _pairs("m", "n"),
+    ]
+
+    merged = merge_tile_pairs(tiles, payloads)
+
+    assert [pair.src for pair in merged.pairs] == [
+        "a", "b", "c", "d", "e", "f", "g", "h",
+        "i", "j", "k", "l", "m", "a",
+        "m", "n",
+    ]  # fmt: skip
+
+
+def test_import_job_extracts_pdf_pages_and_merges_them(tmp_path):
+    pytest.importorskip("pypdfium2")
+    source = tmp_path / "chapter.pdf"
+    source.write_bytes(_pdf(3))
+    job = ImportJob(
+        image_path=source,
+        pack_id="chapter",
+        title="Chapter",
+        src_lang="it",
+        dst_lang="fi",
+        output_path=tmp_path / "chapter.json",
+    )
+    client = StubClient(StubOptions(pairs_per_image=2))
+    metrics = RunMetrics()
+
+    stats = import_job(
+        job,
+        model="gemini-test",
+        session=GeminiSession(client=client, metrics=metrics),
+        tiling=TilingOptions(pdf_dpi=72),
+    )
+
+    assert (stats.tiles, stats.item_count, client.calls) == (3, 6, 4)
+    step1 = [
+        record
+        for record in metrics.records
+        if record["stage"] == "generate_content" and record["step"] == "raw_pairs"
+    ]
+    assert sorted(record["tile"] for record in step1) == ["page 1", "page 2", "page 3"]
+    assert {record["image"] for record in step1} == {"chapter.pdf"}
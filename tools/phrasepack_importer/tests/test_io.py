@@ -1,4 +1,20 @@
-from phrasepack_importer.io import default_phrasepack_output_path
+import gzip
+import os
+from io import BytesIO
+
+import pytest
+
+from phrasepack_importer.io import (
+    ImageOptions,
+    ImagePreprocessError,
+    OutputOptions,
+    clear_repo_root_cache,
+    default_phrasepack_output_path,
+    detect_mime_type,
+    detect_repo_root,
+    preprocess_image,
+    write_json,
+)
 
 
 def test_default_phrasepack_output_path_points_to_repo_public_phrasepacks():
@@ -6,3 +22,132 @@ def test_default_phrasepack_output_path_points_to_repo_public_phrasepacks():
     # Workspace-relative assertion: .../public/phrasepacks/example-pack.json
     assert path.as_posix().endswith("/public/phrasepacks/example-pack.json")
 
+
+def test_detect_repo_root_is_cached_per_working_directory(monkeypatch, tmp_path):
+    app = tmp_path / "app"
+    (app / "public" / "phrasepacks").mkdir(parents=True)
+    (app / "package.json").write_text("{}")
+    monkeypatch.chdir(app)
+    clear_repo_root_cache()
+    try:
+        assert detect_repo_root() == app
+        (app / "package.json").unlink()
+        (app / "public" / "phrasepacks").rmdir()
+        assert detect_repo_root() == app
+
+        clear_repo_root_cache()
+        assert detect_repo_root() != app
+    finally:
+        clear_repo_root_cache()
+
+
+def test_detect_mime_type_from_magic_bytes():
+    assert detect_mime_type(b"\xff\xd8\xff\xe0rest") == "image/jpeg"
+    assert detect_mime_type(b"\x89PNG\r\n\x1a\nrest") == "image/png"
+    assert detect_mime_type(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == "image/webp"
+    assert detect_mime_type(b"unknown") == "image/jpeg"
+
+
+def test_preprocess_without_options_keeps_original_bytes():
+    data = b"\x89PNG\r\n\x1a\nnot really a png"
+    prepared = preprocess_image(data, ImageOptions())
+    assert prepared.data is data
+    assert prepared.mime_type == "image/png"
+    assert prepared.original_bytes == len(data)
+
+
+def test_preprocess_crops_downscales_and_reencodes():
+    Image = pytest.importorskip("PIL.Image")
+    page = Image.new("RGB", (2000, 1000), "white")
+    page.paste((0, 0, 0), (500, 200, 1500, 800))  # content block inside wide margins
+    buffer = BytesIO()
+    page.save(buffer, format="PNG")
+    data = buffer.getvalue()
+
+    prepared = preprocess_image(
+        data,
+        ImageOptions(max_long_edge=500, grayscale=True, format="jpeg", quality=60, auto_crop=True),
+    )
+
+    result = Image.open(BytesIO(prepared.data))
+    assert prepared.mime_type == detect_mime_type(prepared.data) == "image/jpeg"
+    assert result.mode == "L"
+    assert max(result.size) == 500
+    # Cropping removed the margins, so the aspect ratio follows the content block.
+    assert result.size[1] > 250
+    assert prepared.original_bytes == len(data)
+
+
+def test_preprocess_reports_truncated_and_oversized_images(monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    buffer = BytesIO()
+    Image.new("RGB", (400, 300), "white").save(buffer, format="PNG")
+    data = buffer.getvalue()
+    options = ImageOptions(max_long_edge=100)
+
+    # The header still parses; the missing pixel data only fails on decode.
+    with pytest.raises(ImagePreprocessError, match="Could not decode"):
+        preprocess_image(data[: len(data) // 2], options)
+
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    with pytest.raises(ImagePreprocessError, match="Could not decode"):
+        preprocess_image(data, options)
+
+
+def test_preprocess_can_encode_webp():
+    Image = pytest.importorskip("PIL.Image")
+    buffer = BytesIO()
+    Image.new("RGB", (40, 40), "white").save(buffer, format="PNG")
+
+    prepared = preprocess_image(buffer.getvalue(), ImageOptions(format="webp"))
+
+    assert prepared.mime_type == detect_mime_type(prepared.data) == "image/webp"
+
+
+def test_write_json_leaves_unchanged_files_alone(tmp_path):
+    path = tmp_path / "packs" / "pack.json"
+
+    first = write_json(path, {"id": "ciao", "dst": "moi"})
+    os.utime(path, (0, 0))
+    second = write_json(path, {"id": "ciao", "dst": "moi"})
+    third = write_json(path, {"id": "ciao", "dst": "hei"})
+
+    assert (first.changed, second.changed, third.changed) == (True, False, True)
+    assert path.read_text(encoding="utf-8") == '{\n  "id": "ciao",\n  "dst": "hei"\n}\n'
+    assert [entry.name for entry in path.parent.iterdir()] == ["pack.json"]  # no temp files
+
+
+def test_write_json_creates_files_with_the_umask_mode(tmp_path):
+    # A plain 0o666 create gets the umask mode without changing the process umask.
+    os.close(os.open(tmp_path / "reference", os.O_CREAT | os.O_WRONLY, 0o666))
+    write_json(tmp_path / "pack.json", {"id": "ciao"})
+
+    mode = (tmp_path / "reference").stat().st_mode & 0o777
+    assert (tmp_path / "pack.json").stat().st_mode & 0o777 == mode
+
+
+def test_write_json_minifies_and_precompresses(tmp_path):
+    path = tmp_path / "pack.json"
+    options = OutputOptions(minify=True, gzip=True)
+
+    result = write_json(path, {"id": "però", "dst": "mutta"}, options)
+
+    assert path.read_bytes() == '{"id":"però","dst":"mutta"}\n'.encode()
+    packed = (tmp_path / "pack.json.gz").read_bytes()
+    assert gzip.decompress(packed) == path.read_bytes()
+    assert result.compressed == ((".gz", len(packed)),)
+    assert result.summary() == f"{result.size} B, gz {len(packed)} B"
+
+    write_json(path, {"id": "però", "dst": "mutta"}, OutputOptions(minify=True))
+    assert (tmp_path / "pack.json.gz").exists()  # still matches the unchanged file
+    write_json(path, {"id": "però"}, OutputOptions(minify=True))
+    assert not (tmp_path / "pack.json.gz").exists()  # would be stale
+
+
+def test_write_json_brotli_sibling(tmp_path):
+    brotli = pytest.importorskip("brotli")
+    path = tmp_path / "pack.json"
+
+    write_json(path, b'{"id": "ciao"}\n', OutputOptions(brotli=True))
+
+    assert brotli.decompress((tmp_path / "pack.json.br").read_bytes()) == b'{"id": "ciao"}\n'
@@ -0,0 +1,99 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from phrasepack_importer.batch import ImportJob, import_job
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.metrics import RunMetrics, labels
+
+
+def test_timed_records_labels_errors_and_summary():
+    metrics = RunMetrics()
+    with labels(image="p1.jpg"):
+        with metrics.timed("parse"):
+            pass
+        with pytest.raises(ValueError), metrics.timed("parse"):
+            raise ValueError("bad")
+    metrics.record("generate_content", 0.5, repair=True, total_tokens=10, prompt_tokens=7)
+
+    assert metrics.records[0]["image"] == "p1.jpg"
+    assert metrics.records[1]["error"] == "ValueError"
+    assert "image" not in metrics.records[2]
+
+    summary = metrics.summary()
+    assert summary["stages"]["parse"]["count"] == 2
+    assert summary["stages"]["parse"]["errors"] == 1
+    assert summary["stages"]["generate_content"]["p95_seconds"] == 0.5
+    assert (summary["requests"], summary["repair_requests"], summary["images"]) == (1, 1, 1)
+    assert summary["tokens"]["total_tokens"] == 10
+
+
+def test_write_json_and_ndjson(tmp_path):
+    metrics = RunMetrics()
+    metrics.record("read_image", 0.1)
+
+    metrics.write(tmp_path / "run.json")
+    report = json.loads((tmp_path / "run.json").read_text())
+    assert report["records"][0]["stage"] == "read_image"
+
+    metrics.write(tmp_path / "run.ndjson")
+    lines = [json.loads(line) for line in (tmp_path / "run.ndjson").read_text().splitlines()]
+    assert [line["stage"] for line in lines] == ["read_image", "summary"]
+
+
+class UsageClient:
+    def __init__(self):
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+
+    def _generate_content(self, *, model, contents, config):
+        usage = SimpleNamespace(
+            prompt_token_count=100, candidates_token_count=20, total_token_count=120
+        )
+        if "pairs" in config.response_schema["properties"]:
+            text = '{"pairs": [{"src": "ciao", "dst": "moi"}]}'
+        else:
+            text = '{"items": [{"surface": "ciao", "dst": "moi"}]}'
+        return SimpleNamespace(text=text, usage_metadata=usage)
+
+
+def test_import_job_records_every_stage(tmp_path):
+    image = tmp_path / "page.jpg"
+    image.write_bytes(b"\xff\xd8\xff page")
+    job = ImportJob(
+        image_path=image,
+        pack_id="page",
+        title="Page",
+        src_lang="it",
+        dst_lang="fi",
+        output_path=tmp_path / "page.json",
+    )
+    metrics = RunMetrics()
+
+    import_job(job, model="gemini-test", session=GeminiSession(client=UsageClient(), metrics=metrics))
+
+    stages = [record["stage"] for record in metrics.records]
+    assert stages == [
+        "build_prompts",
+        "read_image",
+        "preprocess_image",
+        "generate_content",
+        "parse",
+        "generate_content",
+        "parse",
+        "validate",
+        "build_phrasepack",
+        "write_json",
+        "import",
+    ]
+    assert {record["image"] for record in metrics.records} == {"page.jpg"}
+    attempts = [record for record in metrics.records if record["stage"] == "generate_content"]
+    assert [(record["step"], record["repair"]) for record in attempts] == [
+        ("raw_pairs", False),
+        ("items", False),
+    ]
+    assert metrics.summary()["tokens"] == {
+        "prompt_tokens": 200,
+        "output_tokens": 40,
+        "total_tokens": 240,
+    }
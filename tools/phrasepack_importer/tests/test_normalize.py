@@ -1,10 +1,20 @@
+import random
+
 from phrasepack_importer.normalize import (
+    DEFAULT_MEMO_SIZE,
+    IdAllocator,
+    clear_memo,
+    configure_memo,
     ensure_unique_id,
+    memo_stats,
+    normalize_dst_batch,
     normalize_dst_text,
+    normalize_src_batch,
     normalize_src_text,
     normalize_text,
     split_gendered_dst,
     slugify,
+    slugify_batch,
     split_surface_and_lemmas,
 )
 
@@ -76,3 +86,40 @@ def test_ensure_unique_id_appends_suffixes():
     existing = {"ciao"}
     assert ensure_unique_id("ciao", existing) == "ciao-2"
     assert ensure_unique_id("ciao", existing) == "ciao-3"
+
+
+def test_id_allocator_matches_ensure_unique_id():
+    rng = random.Random(0)
+    bases = ["e", "perche", "citta", "ciao", "ciao-2", "ciao-3", "e-4", "item"]
+    existing = {"citta-2", "e-3"}
+    allocator = IdAllocator(existing)
+    reference = set(existing)
+
+    for _ in range(2000):
+        base = rng.choice(bases)
+        assert allocator.allocate(base) == ensure_unique_id(base, reference)
+    assert allocator.ids == reference
+
+
+def test_batch_helpers_match_single_value_functions():
+    values = ["i'amico", "olla", "olla", "  missä?  minne? ", "città", "si", "olla"]
+
+    assert normalize_src_batch(values) == [normalize_src_text(value) for value in values]
+    assert normalize_dst_batch(iter(values)) == [normalize_dst_text(value) for value in values]
+    assert slugify_batch(values) == [slugify(value) for value in values]
+    assert slugify_batch([]) == []
+
+
+def test_memo_counts_hits_and_can_be_resized():
+    clear_memo()
+    assert slugify("Buongiorno") == slugify("Buongiorno") == "buongiorno"
+    stats = memo_stats()["slugify"]
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+    try:
+        configure_memo(0)
+        assert normalize_text("  ciao  ") == normalize_text("  ciao  ") == "ciao"
+        stats = memo_stats()["normalize_text"]
+        assert (stats["hits"], stats["size"], stats["maxsize"]) == (0, 0, 0)
+    finally:
+        configure_memo(DEFAULT_MEMO_SIZE)
@@ -0,0 +1,57 @@
+"""The compiled normalizers must match the original multi-pass versions exactly."""
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from benchmarks import reference_normalize as reference
+from phrasepack_importer import normalize
+
+PHRASEPACK_DIR = Path(__file__).resolve().parents[3] / "public" / "phrasepacks"
+
+FUNCTIONS = ["normalize_text", "normalize_src_text", "normalize_dst_text", "slugify"]
+
+# Characters every pass reacts to: quotes, dashes, NBSP and other whitespace,
+# semicolons after punctuation, OCR apostrophes, leading junk and accents.
+_ALPHABET = list("aeiIlsSxyzåäöÅèéìàù ;;;..!!??**\"\"''-,/()\t\n") + [
+    "\u00a0", "\u2009", "\u3000", "’", "‘", "`", "“", "”", "„", "–", "—", "…",
+]
+
+
+def _strings(value: object) -> list[str]:
+    if isinstance(value, str):
+        return [value]
+    children = value.values() if isinstance(value, dict) else value if isinstance(value, list) else []
+    return [text for child in children for text in _strings(child)]
+
+
+def _pack_strings() -> list[str]:
+    # Every string in every pack: vocab items, phrase sections, titles.
+    strings = []
+    for path in sorted(PHRASEPACK_DIR.glob("*.json")):
+        strings.extend(_strings(json.loads(path.read_text(encoding="utf-8"))))
+    return strings
+
+
+def _fuzz_strings(count: int = 20000) -> list[str]:
+    rng = random.Random(1234)
+    strings = ["", " ", "si", "SI", "Si ", "*si*", "?; a", "!; ;  b", ".; .; c", "i'amico"]
+    for _ in range(count):
+        strings.append("".join(rng.choice(_ALPHABET) for _ in range(rng.randrange(1, 16))))
+    return strings
+
+
+@pytest.mark.parametrize("name", FUNCTIONS)
+def test_matches_reference_on_existing_packs(name):
+    strings = _pack_strings()
+    assert strings, f"no phrasepacks found in {PHRASEPACK_DIR}"
+    new, old = getattr(normalize, name), getattr(reference, name)
+    assert [new(value) for value in strings] == [old(value) for value in strings]
+
+
+@pytest.mark.parametrize("name", FUNCTIONS)
+def test_matches_reference_on_fuzz_corpus(name):
+    new, old = getattr(normalize, name), getattr(reference, name)
+    for value in _fuzz_strings():
+        assert new(value) == old(value), repr(value)
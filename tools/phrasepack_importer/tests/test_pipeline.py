@@ -0,0 +1,131 @@
+import asyncio
+import json
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from phrasepack_importer import pipeline
+from phrasepack_importer.batch import ImportJob, finish_pack, import_job
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.pipeline import percentile, run_pipeline
+from phrasepack_importer.transport import StubClient, StubOptions
+
+
+class StagedClient:
+    """Fake async client that records when each stage's calls are in flight."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.in_flight = {"extract": 0, "clean": 0}
+        self.overlapped = False
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate))
+
+    async def _generate(self, *, model, contents, config):
+        stage = "extract" if "pairs" in config.response_schema["properties"] else "clean"
+        self.in_flight[stage] += 1
+        if all(self.in_flight.values()):
+            self.overlapped = True
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[stage] -= 1
+        if stage == "extract":
+            if "broken" in contents[0]:
+                return SimpleNamespace(text="")
+            return SimpleNamespace(text='{"pairs": [{"src": "ciao", "dst": "moi"}]}')
+        return SimpleNamespace(text='{"items": [{"surface": "ciao", "dst": "moi"}]}')
+
+
+def _jobs(tmp_path: Path, count: int, *, broken: int | None = None) -> list[ImportJob]:
+    jobs = []
+    for index in range(count):
+        image = tmp_path / f"page-{index}.jpg"
+        image.write_bytes(f"page {index}".encode())
+        jobs.append(
+            ImportJob(
+                image_path=image,
+                pack_id=f"page-{index}",
+                title=f"Page {index}",
+                src_lang="it",
+                dst_lang="broken" if index == broken else "fi",
+                output_path=tmp_path / "out" / f"page-{index}.json",
+            )
+        )
+    return jobs
+
+
+def test_percentile_nearest_rank():
+    values = [0.1, 0.2, 0.3, 0.4, 1.0]
+    assert percentile(values, 50) == 0.3
+    assert percentile(values, 95) == 1.0
+    assert percentile([], 50) == 0.0
+
+
+def test_pipeline_overlaps_stages_and_writes_every_pack(tmp_path):
+    client = StagedClient()
+    results, report = run_pipeline(
+        _jobs(tmp_path, 6),
+        model="gemini-test",
+        session=GeminiSession(client=client),
+        extract_workers=1,
+        clean_workers=1,
+        queue_size=2,
+    )
+
+    assert [result.ok for result in results] == [True] * 6
+    assert client.overlapped
+    assert len(report.extract.latencies) == len(report.clean.latencies) == 6
+    assert 1 <= report.max_queue_depth <= 2
+    pack = json.loads((tmp_path / "out" / "page-3.json").read_text())
+    assert pack["items"] == [{"id": "ciao", "src": "ciao", "dst": "moi"}]
+    assert "queue: max depth" in report.summary()
+
+
+def test_pipeline_records_failures_without_stopping(tmp_path):
+    results, report = run_pipeline(
+        _jobs(tmp_path, 3, broken=1),
+        model="gemini-test",
+        session=GeminiSession(client=StagedClient(delay=0)),
+        extract_workers=2,
+        clean_workers=1,
+        queue_size=1,
+    )
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert "empty" in results[1].error
+    assert report.extract.failures == 1
+
+
+def test_pack_writes_run_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+
+    def recording_finish_pack(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return finish_pack(*args, **kwargs)
+
+    monkeypatch.setattr(pipeline, "finish_pack", recording_finish_pack)
+    results, _ = run_pipeline(
+        _jobs(tmp_path, 2),
+        model="gemini-test",
+        session=GeminiSession(client=StagedClient(delay=0)),
+    )
+
+    assert [result.ok for result in results] == [True, True]
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_long_pair_lists_are_cleaned_in_chunks(tmp_path):
+    jobs = _jobs(tmp_path, 2)
+    client = StubClient(StubOptions(pairs_per_image=20))
+    session = GeminiSession(client=client)
+
+    stats = import_job(jobs[0], model="gemini-test", session=session, chunk_size=7)
+    results, _ = run_pipeline(jobs[1:], model="gemini-test", session=session, chunk_size=7)
+
+    for entry in (stats, results[0].stats):
+        assert (entry.item_count, entry.chunks) == (20, 3)
+        assert entry.tokens_saved > 0
+    assert client.calls == 2 * (1 + 3)
+    items = json.loads(jobs[0].output_path.read_text(encoding="utf-8"))["items"]
+    assert [int(item["src"].rsplit(" ", 1)[1]) for item in items] == list(range(20))
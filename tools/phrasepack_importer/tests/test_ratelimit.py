@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+from google.genai import types
+
+from phrasepack_importer import gemini_client
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.ratelimit import IMAGE_TOKEN_ESTIMATE, RateLimiter, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_request_budget_spaces_out_bursts():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=60, clock=clock)
+
+    # A full bucket lets the first minute's worth through, then one per second.
+    waits = [limiter.reserve(1) for _ in range(62)]
+
+    assert waits[:60] == [0.0] * 60
+    assert waits[60:] == [1.0, 2.0]
+    clock.now += 30
+    assert limiter.reserve(1) == 0.0
+
+
+def test_token_budget_and_settle():
+    clock = FakeClock()
+    limiter = RateLimiter(tpm=6000, clock=clock)
+
+    assert limiter.reserve(5000) == 0.0
+    limiter.settle(5000, 7000)
+    # 1000 tokens of debt refill at 100 tokens/s; this request adds 100 more.
+    assert limiter.reserve(100) == 11.0
+
+    snapshot = limiter.snapshot()
+    assert (snapshot.tokens, snapshot.tpm, snapshot.waits) == (7100, 6000, 1)
+    assert snapshot.token_utilization > 1
+    assert "7100/6000 tpm" in snapshot.summary()
+
+
+def test_snapshot_forgets_requests_older_than_a_minute():
+    clock = FakeClock()
+    limiter = RateLimiter(rpm=100, clock=clock)
+    for _ in range(10):
+        limiter.reserve(1)
+    assert limiter.snapshot().request_utilization == 0.1
+    clock.now += 61
+    assert limiter.snapshot().requests == 0
+
+
+def test_estimate_tokens_counts_text_and_images():
+    image = types.Part.from_bytes(data=b"\xff\xd8\xff", mime_type="image/jpeg")
+    assert estimate_tokens("x" * 400) == 100
+    assert estimate_tokens(["x" * 400, image]) == 100 + IMAGE_TOKEN_ESTIMATE
+
+
+class UsageClient:
+    def __init__(self):
+        response = SimpleNamespace(
+            text='{"pairs": [{"src": "ciao", "dst": "moi"}]}',
+            usage_metadata=SimpleNamespace(total_token_count=2000),
+        )
+        self.models = SimpleNamespace(generate_content=lambda **kwargs: response)
+
+        async def generate_async(**kwargs):
+            return response
+
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=generate_async))
+
+
+def test_session_routes_sync_and_async_calls_through_the_limiter():
+    limiter = RateLimiter(rpm=600, tpm=100_000)
+    session = GeminiSession(client=UsageClient(), rate_limiter=limiter)
+    kwargs = dict(image_bytes=b"image", prompt="prompt", model="gemini-test", session=session)
+
+    gemini_client.extract_raw_pairs(**kwargs)
+    asyncio.run(gemini_client.extract_raw_pairs_async(**kwargs))
+
+    snapshot = limiter.snapshot()
+    assert snapshot.requests == 2
+    assert snapshot.tokens == 4000
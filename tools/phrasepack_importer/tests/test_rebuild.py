@@ -0,0 +1,107 @@
+from phrasepack_importer import cli, phrasepack
+from phrasepack_importer.batch import ImportJob, JobResult, import_job
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.rebuild import (
+    BuildManifest,
+    BuildSettings,
+    plan_rebuild,
+    record_results,
+)
+from phrasepack_importer.transport import StubClient, StubOptions
+from phrasepack_importer.workdir import ITEMS, PACK, RAW_PAIRS, WorkDir
+
+
+def _jobs(tmp_path, count=2):
+    jobs = []
+    for index in range(count):
+        image = tmp_path / "img" / f"ch_{index}.jpg"
+        image.parent.mkdir(exist_ok=True)
+        image.write_bytes(f"page {index}".encode())
+        jobs.append(
+            ImportJob(
+                image_path=image,
+                pack_id=f"ch-{index}",
+                title=f"Ch {index}",
+                src_lang="it",
+                dst_lang="fi",
+                output_path=tmp_path / "out" / f"ch-{index}.json",
+            )
+        )
+    return jobs
+
+
+def _build(jobs, workdir, settings, client):
+    session = GeminiSession(client=client)
+    stats = [
+        import_job(
+            job,
+            model=settings.model,
+            session=session,
+            workdir=workdir,
+            chunk_size=settings.chunk_size,
+        )
+        for job in jobs
+    ]
+    return [JobResult(job=job, stats=entry) for job, entry in zip(jobs, stats)]
+
+
+def test_plan_lists_only_packs_whose_inputs_changed(tmp_path):
+    jobs = _jobs(tmp_path)
+    settings = BuildSettings(model="gemini-test", chunk_size=60)
+    manifest = BuildManifest.load(tmp_path / "build.json")
+    assert [plan.reason for plan in plan_rebuild(jobs, manifest, settings)] == [
+        "not in the build manifest"
+    ] * 2
+
+    results = _build(jobs, WorkDir(tmp_path / "work"), settings, StubClient())
+    record_results(manifest, results, settings)
+    manifest = BuildManifest.load(tmp_path / "build.json")
+    assert not any(plan.stale for plan in plan_rebuild(jobs, manifest, settings))
+
+    jobs[0].image_path.write_bytes(b"rescanned")
+    plans = plan_rebuild(jobs, manifest, BuildSettings(model="gemini-test", chunk_size=10))
+    assert [plan.stages for plan in plans] == [(RAW_PAIRS, ITEMS, PACK), (ITEMS, PACK)]
+
+
+def test_normalizer_change_rebuilds_packs_without_model_calls(tmp_path, monkeypatch):
+    jobs = _jobs(tmp_path)
+    settings = BuildSettings(model="gemini-test", chunk_size=60)
+    client = StubClient(StubOptions(pairs_per_image=3))
+    manifest = BuildManifest(tmp_path / "build.json")
+    record_results(manifest, _build(jobs, WorkDir(tmp_path / "work"), settings, client), settings)
+
+    monkeypatch.setattr(phrasepack, "normalizer_fingerprint", lambda: "edited")
+    plans = plan_rebuild(jobs, manifest, settings)
+    assert [(plan.stages, plan.reason) for plan in plans] == [
+        ((PACK,), "normalizer, pack metadata or output format changed")
+    ] * 2
+
+    calls = client.calls
+    results = _build(jobs, WorkDir(tmp_path / "work", resume=True), settings, client)
+    assert client.calls == calls
+    assert [result.stats.resumed for result in results] == [(RAW_PAIRS, ITEMS)] * 2
+
+
+def test_rebuild_command_dry_run(tmp_path, capsys):
+    _jobs(tmp_path)
+    args = [
+        "--batch", str(tmp_path / "img"),
+        "--src", "it",
+        "--dst", "fi",
+        "--out-dir", str(tmp_path / "out"),
+        "--transport", "stub",
+        "--work-dir", str(tmp_path / "work"),
+    ]  # fmt: skip
+    assert cli.run(args) == 0
+    (tmp_path / "out" / "ch-1.json").write_text("{}")
+    capsys.readouterr()
+
+    assert cli.run(["rebuild", *args, "--dry-run"]) == 0
+    out = capsys.readouterr().out
+    assert "OK       ch_0.jpg: up to date" in out
+    assert "REBUILD  ch_1.jpg (pack): output missing or edited" in out
+    assert (tmp_path / "out" / "ch-1.json").read_text() == "{}"
+
+    assert cli.run(["rebuild", *args]) == 0
+    assert cli.run(["rebuild", *args, "--dry-run"]) == 0
+    assert capsys.readouterr().out.endswith("0 to rebuild, 2 up to date.\n")
@@ -0,0 +1,127 @@
+import json
+import os
+from dataclasses import replace
+
+from phrasepack_importer import cli, renormalize as renormalize_module
+from phrasepack_importer.batch import ImportJob, import_job
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.renormalize import renormalize
+from phrasepack_importer.transport import StubClient, StubOptions
+from phrasepack_importer.workdir import WorkDir
+
+
+def _import(tmp_path, count=3):
+    workdir = WorkDir(tmp_path / "work")
+    session = GeminiSession(client=StubClient(StubOptions(pairs_per_image=4)))
+    jobs = []
+    for index in range(count):
+        image = tmp_path / f"ch_{index}.jpg"
+        image.write_bytes(f"page {index}".encode())
+        job = ImportJob(
+            image_path=image,
+            pack_id=f"ch-{index}",
+            title=f"Ch {index}",
+            src_lang="it",
+            dst_lang="fi",
+            output_path=tmp_path / "out" / f"ch-{index}.json",
+        )
+        import_job(job, model="gemini-test", session=session, workdir=workdir)
+        jobs.append(job)
+    return workdir, jobs
+
+
+def test_only_changed_packs_are_rewritten(tmp_path):
+    workdir, jobs = _import(tmp_path)
+    records = workdir.extracted_files()
+    assert len(records) == 3
+    original = jobs[1].output_path.read_bytes()
+    jobs[1].output_path.write_text("{}")
+    os.utime(jobs[0].output_path, (0, 0))
+
+    results = renormalize(records)
+
+    changed = [result.output_path for result in results if result.changed]
+    assert changed == [jobs[1].output_path.resolve()]
+    assert jobs[1].output_path.read_bytes() == original
+    assert jobs[0].output_path.stat().st_mtime == 0
+
+
+def test_process_pool_gives_the_same_results_in_order(tmp_path, monkeypatch):
+    workdir, jobs = _import(tmp_path)
+    records = workdir.extracted_files()
+    for job in jobs:
+        job.output_path.unlink()
+    monkeypatch.setattr(renormalize_module, "MIN_PACKS_PER_WORKER", 1)
+
+    results = renormalize(records, workers=2)
+
+    assert [result.record for result in results] == records
+    assert all(result.changed and result.item_count == 4 for result in results)
+    assert all(job.output_path.exists() for job in jobs)
+
+
+def test_renormalize_command_reports_bad_records(tmp_path, capsys):
+    workdir, jobs = _import(tmp_path, count=1)
+    bad = tmp_path / "bad.json"
+    bad.write_text(json.dumps({"version": 1, "extracted": {"items": []}}))
+
+    code = cli.run(["renormalize", *map(str, workdir.extracted_files()), str(bad), "--dry-run"])
+
+    out = capsys.readouterr().out
+    assert code == 1
+    assert "FAIL  bad.json: " in out
+    assert "0 would change, 1 unchanged, 1 failed." in out
+
+
+def test_relative_and_absolute_output_paths_share_one_record(tmp_path, monkeypatch):
+    workdir, [job] = _import(tmp_path, count=1)
+    monkeypatch.chdir(tmp_path)
+    relative = replace(job, output_path=job.output_path.relative_to(tmp_path))
+    session = GeminiSession(client=StubClient(StubOptions(pairs_per_image=4)))
+    import_job(relative, model="gemini-test", session=session, workdir=workdir)
+
+    assert len(workdir.extracted_files()) == 1
+
+
+def test_empty_and_unwritable_packs_fail_on_their_own(tmp_path):
+    workdir, jobs = _import(tmp_path)
+    records = workdir.extracted_files()
+    empty = json.loads(records[0].read_text(encoding="utf-8"))
+    empty["extracted"]["items"] = []
+    records[0].write_text(json.dumps(empty), encoding="utf-8")
+    jobs[1].output_path.unlink()
+    jobs[1].output_path.mkdir()  # a folder in the pack's place cannot be replaced
+    jobs[2].output_path.unlink()
+    original = jobs[0].output_path.read_bytes()
+
+    results = renormalize(records)
+
+    assert [result.ok for result in results] == [False, False, True]
+    assert "No items" in results[0].error
+    assert "Could not write" in results[1].error
+    assert jobs[0].output_path.read_bytes() == original
+    assert jobs[2].output_path.exists()
+
+
+def test_renormalized_packs_are_current_for_rebuild_and_resume(tmp_path, capsys):
+    (tmp_path / "img").mkdir()
+    for index in range(2):
+        (tmp_path / "img" / f"ch_{index}.jpg").write_bytes(f"page {index}".encode())
+    args = [
+        "--batch", str(tmp_path / "img"),
+        "--src", "it",
+        "--dst", "fi",
+        "--out-dir", str(tmp_path / "out"),
+        "--transport", "stub",
+        "--work-dir", str(tmp_path / "work"),
+    ]  # fmt: skip
+    assert cli.run(args) == 0
+    (tmp_path / "out" / "ch-1.json").write_text("{}")
+
+    assert cli.run(["renormalize", "--work-dir", str(tmp_path / "work")]) == 0
+    capsys.readouterr()
+    assert cli.run(["rebuild", *args, "--dry-run"]) == 0
+    assert capsys.readouterr().out.endswith("0 to rebuild, 2 up to date.\n")
+
+    assert cli.run([*args, "--resume"]) == 0
+    assert capsys.readouterr().out.count("resumed raw_pairs, items, pack") == 2
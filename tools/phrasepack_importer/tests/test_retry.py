@@ -0,0 +1,140 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from google.genai import errors
+
+from phrasepack_importer import gemini_client
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.retry import (
+    FATAL,
+    PARSE,
+    TRANSIENT,
+    RetryPolicy,
+    classify_error,
+    retry_after_seconds,
+)
+from phrasepack_importer.schema import ParseError
+
+FAST = RetryPolicy(base_delay=0.001, max_delay=0.001)
+
+
+def _api_error(code: int, *, headers=None, details=None) -> errors.APIError:
+    response = httpx.Response(code, headers=headers or {})
+    return errors.APIError(code, details or {"error": {"message": "boom"}}, response)
+
+
+def test_classify_error():
+    assert classify_error(_api_error(429)) == TRANSIENT
+    assert classify_error(_api_error(503)) == TRANSIENT
+    assert classify_error(_api_error(400)) == FATAL
+    assert classify_error(asyncio.TimeoutError()) == TRANSIENT
+    assert classify_error(httpx.ConnectError("reset")) == TRANSIENT
+    assert classify_error(ParseError("bad json")) == PARSE
+    assert classify_error(ValueError("bug")) == FATAL
+
+
+def test_retry_after_from_header_and_retry_info():
+    assert retry_after_seconds(_api_error(429, headers={"Retry-After": "7"})) == 7.0
+    details = {
+        "error": {
+            "code": 429,
+            "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "12s"}],
+        }
+    }
+    assert retry_after_seconds(_api_error(429, details=details)) == 12.0
+    assert retry_after_seconds(_api_error(429)) is None
+
+
+def test_retry_after_http_dates_with_and_without_a_zone():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    for zone in ("GMT", "-0000"):
+        header = when.strftime(f"%a, %d %b %Y %H:%M:%S {zone}")
+        delay = retry_after_seconds(_api_error(503, headers={"Retry-After": header}))
+        assert 25 <= delay <= 30
+
+
+def test_backoff_grows_with_jitter_and_respects_limits():
+    policy = RetryPolicy(base_delay=1, multiplier=2, max_delay=5, jitter=0.5, max_elapsed=10)
+
+    assert policy.backoff(1, rand=lambda: 0) == 0.5
+    assert policy.backoff(2, rand=lambda: 1) == 2
+    assert policy.backoff(10, rand=lambda: 1) == 5
+    assert policy.next_delay(_api_error(429, headers={"Retry-After": "3"}), attempt=1, elapsed=0) == 3
+    assert policy.next_delay(_api_error(429, headers={"Retry-After": "3"}), attempt=1, elapsed=8) is None
+    assert policy.next_delay(_api_error(400), attempt=1, elapsed=0) is None
+    assert policy.next_delay(_api_error(500), attempt=5, elapsed=0) is None
+
+
+class FlakyClient:
+    """Raises the given errors first, then answers with raw pairs."""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+        self.models = SimpleNamespace(generate_content=self._generate_content)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_async))
+
+    def _generate_content(self, *, model, contents, config):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return SimpleNamespace(text='{"pairs": [{"src": "ciao", "dst": "moi"}]}')
+
+    async def _generate_async(self, **kwargs):
+        return self._generate_content(**kwargs)
+
+
+def test_transient_errors_are_resent_and_logged():
+    events = []
+    client = FlakyClient([_api_error(429), _api_error(503)])
+    session = GeminiSession(client=client, retry_policy=FAST, on_retry=events.append)
+
+    payload = gemini_client.extract_raw_pairs(
+        image_bytes=b"image", prompt="prompt", model="gemini-test", session=session
+    )
+
+    assert payload.pairs[0].src == "ciao"
+    assert client.calls == 3
+    assert [(event.kind, event.attempt) for event in events] == [(TRANSIENT, 1), (TRANSIENT, 2)]
+    assert events[0].reason.startswith("429")
+    assert session.stats.retries == 2
+
+
+def test_fatal_errors_are_not_retried_async():
+    client = FlakyClient([_api_error(403)])
+    session = GeminiSession(client=client, retry_policy=FAST)
+
+    with pytest.raises(errors.APIError):
+        asyncio.run(
+            gemini_client.extract_raw_pairs_async(
+                image_bytes=b"image", prompt="prompt", model="gemini-test", session=session
+            )
+        )
+    assert client.calls == 1
+    assert session.retry_events == []
+
+
+def test_empty_response_is_reprompted_as_parse_retry():
+    texts = ["", '{"pairs": [{"src": "ciao", "dst": "moi"}]}']
+    prompts = []
+
+    def generate_content(*, model, contents, config):
+        prompts.append(contents[0])
+        return SimpleNamespace(text=texts.pop(0))
+
+    session = GeminiSession(client=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+
+    payload = gemini_client.extract_raw_pairs(
+        image_bytes=b"image",
+        prompt="prompt",
+        model="gemini-test",
+        allow_repair=False,
+        session=session,
+    )
+
+    assert payload.pairs[0].dst == "moi"
+    assert prompts[1].endswith("Return strictly valid JSON only.")
+    assert [event.kind for event in session.retry_events] == [PARSE]
@@ -1,11 +1,18 @@
+import json
+
 import pytest
 
 from phrasepack_importer.schema import (
     ParseError,
+    Phrasepack,
+    PhrasepackItem,
     assert_non_empty,
     assert_non_empty_pairs,
     parse_extracted_json,
     parse_raw_pairs_json,
+    phrasepack_json,
+    repair_json,
+    serialize_phrasepack,
 )
 
 
@@ -40,8 +47,10 @@ def test_assert_non_empty_filters_missing_dst():
 
 
 def test_parse_extracted_json_invalid():
-    with pytest.raises(ParseError):
+    with pytest.raises(ParseError, match="Invalid JSON"):
         parse_extracted_json("not-json")
+    with pytest.raises(ParseError, match="schema mismatch"):
+        parse_extracted_json('```json\n{"items": "ciao"}\n```')
 
 
 def test_parse_raw_pairs_json_valid():
@@ -53,3 +62,53 @@ def test_assert_non_empty_pairs_filters_blanks():
     payload = parse_raw_pairs_json('{"pairs": [{"src": " ", "dst": "moi"}]}')
     with pytest.raises(ParseError):
         assert_non_empty_pairs(payload.pairs)
+
+
+def test_repair_json_fixes_trailing_commas_and_quotes():
+    assert repair_json('{"pairs": [{"src": "a", "dst": "b"},],}') == (
+        '{"pairs": [{"src": "a", "dst": "b"}]}'
+    )
+    payload = parse_raw_pairs_json(repair_json("{'pairs': [{'src': 'ciao', 'dst': 'moi'}]}"))
+    assert payload.pairs[0].dst == "moi"
+    payload = parse_raw_pairs_json(repair_json('{“pairs”: [{“src”: “l’amico”, “dst”: “ystävä”}]}'))
+    assert payload.pairs[0].src == "l’amico"
+
+
+def test_repair_json_keeps_quoted_dialogue_inside_values():
+    raw = '{"pairs": [{"src": "dire “ciao”, poi “arrivederci”", "dst": "sanoa ”moi”"},]}'
+    payload = parse_raw_pairs_json(repair_json(raw))
+    assert payload.pairs[0].src == "dire “ciao”, poi “arrivederci”"
+    assert payload.pairs[0].dst == "sanoa ”moi”"
+
+    raw = '{“pairs”: [{“src”: “Ha detto “basta”.”, “dst”: “Hän sanoi ”riittää”.”}]}'
+    payload = parse_raw_pairs_json(repair_json(raw))
+    assert payload.pairs[0].src == "Ha detto “basta”."
+    assert payload.pairs[0].dst == "Hän sanoi ”riittää”."
+
+
+def test_repair_json_keeps_complete_items_of_truncated_output():
+    raw = '```json\n{"pairs": [{"src": "a", "dst": "b"}, {"src": "c", "dst": "d"}, {"src": "e", "d'
+    payload = parse_raw_pairs_json(repair_json(raw))
+    assert [pair.src for pair in payload.pairs] == ["a", "c"]
+
+    payload = parse_raw_pairs_json(repair_json('{"pairs": [{"src": "a", "dst": "b"}}'))
+    assert payload.pairs[0].dst == "b"
+
+
+def test_repair_json_returns_none_when_nothing_to_fix():
+    assert repair_json('{"pairs": []}') is None
+    assert repair_json("not-json") is None
+
+
+def test_phrasepack_json_matches_json_dumps_of_dict():
+    phrasepack = Phrasepack(
+        type="phrasepack",
+        id="p",
+        title='Säännöt "quoted" \\ tab\t ctrl\x01 \u2028 emoji 😀',
+        src="it",
+        dst="fi",
+        items=[PhrasepackItem(id="l-amico", src="l'amico", dst="ystävä")],
+    )
+
+    expected = json.dumps(serialize_phrasepack(phrasepack), ensure_ascii=False, indent=2) + "\n"
+    assert phrasepack_json(phrasepack) == expected.encode("utf-8")
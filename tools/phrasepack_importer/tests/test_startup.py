@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.startup import (
+    ENTRY_POINTS,
+    STARTUP_BUDGET_MS,
+    cli_import_ms,
+    heavy_imports,
+    import_profile,
+)
+
+
+@pytest.mark.parametrize("entry", sorted(ENTRY_POINTS))
+def test_cli_starts_without_heavy_imports_within_budget(entry):
+    profile = import_profile(ENTRY_POINTS[entry])
+
+    assert "phrasepack_importer.cli" in profile
+    assert heavy_imports(profile) == []
+    assert cli_import_ms(profile) <= STARTUP_BUDGET_MS
@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from phrasepack_importer import cli
+from phrasepack_importer.gemini_client import (
+    GeminiSession,
+    extract_pairs,
+    extract_pairs_async,
+)
+from phrasepack_importer.retry import RetryPolicy
+from phrasepack_importer.transport import (
+    RecordingClient,
+    ReplayClient,
+    StubClient,
+    StubOptions,
+    TranscriptMissError,
+)
+
+FAST = RetryPolicy(base_delay=0.001, max_delay=0.001, max_attempts=10, parse_attempts=5)
+
+
+def _extract(session, image=b"image"):
+    return extract_pairs(
+        image_bytes=image,
+        image_prompt="prompt 1",
+        transform_prompt="prompt 2",
+        model="gemini-test",
+        session=session,
+    )
+
+
+def test_stub_round_trips_pairs_through_both_steps():
+    client = StubClient(StubOptions(pairs_per_image=5))
+    payload = _extract(GeminiSession(client=client))
+
+    assert len(payload.items) == 5
+    assert payload.items[0].surface.startswith("parola ")
+    assert client.calls == 2
+
+
+def test_stub_errors_and_malformed_output_exercise_retry_and_repair():
+    client = StubClient(StubOptions(error_rate=0.3, malformed_rate=0.3, pairs_per_image=3, seed=7))
+    session = GeminiSession(client=client, retry_policy=FAST)
+
+    async def run_all():
+        return await asyncio.gather(
+            *[
+                extract_pairs_async(
+                    image_bytes=f"page {index}".encode(),
+                    image_prompt="prompt 1",
+                    transform_prompt="prompt 2",
+                    model="gemini-test",
+                    session=session,
+                )
+                for index in range(20)
+            ]
+        )
+
+    payloads = asyncio.run(run_all())
+
+    # Truncated responses keep only their complete items after local repair.
+    assert all(1 <= len(payload.items) <= 3 for payload in payloads)
+    assert client.errors and client.malformed
+    assert session.stats.retries >= client.errors
+    assert session.stats.local_repairs + session.stats.remote_repairs > 0
+
+
+@pytest.mark.parametrize("allow_repair", [True, False])
+def test_stub_malformed_output_reaches_remote_repair_and_reprompts(allow_repair):
+    client = StubClient(StubOptions(malformed_rate=1.0, pairs_per_image=3, seed=1))
+    session = GeminiSession(client=client, retry_policy=FAST)
+
+    for index in range(10):
+        extract_pairs(
+            image_bytes=f"page {index}".encode(),
+            image_prompt="prompt 1",
+            transform_prompt="prompt 2",
+            model="gemini-test",
+            session=session,
+            allow_repair=allow_repair,
+        )
+
+    # Unquoted keys defeat the local repair: a remote repair, or a re-prompt without one.
+    assert session.stats.local_repairs > 0
+    if allow_repair:
+        assert session.stats.remote_repairs > 0
+    else:
+        assert session.stats.remote_repairs == 0
+        assert session.stats.retries > 0
+
+
+def test_record_then_replay(tmp_path):
+    live = StubClient(StubOptions(pairs_per_image=2))
+    recorder = RecordingClient(lambda: live, tmp_path)
+    recorded = _extract(GeminiSession(client=recorder))
+    assert recorder.recorded == 2
+
+    replayed = _extract(GeminiSession(client=ReplayClient(tmp_path)))
+    assert replayed == recorded
+
+    closed = []
+    RecordingClient(lambda: live, tmp_path, close=lambda: closed.append(True)).close()
+    assert closed == [True]
+
+    with pytest.raises(TranscriptMissError):
+        _extract(GeminiSession(client=ReplayClient(tmp_path)), image=b"other page")
+
+
+def test_cli_stub_transport_writes_pack_offline(tmp_path, monkeypatch):
+    def no_network(**kwargs):
+        raise AssertionError("live client should not be created")
+
+    monkeypatch.setattr("google.genai.Client", no_network)
+    image = tmp_path / "page.jpg"
+    image.write_bytes(b"\xff\xd8\xff page")
+    out = tmp_path / "page.json"
+
+    code = cli.run(
+        [
+            "--image", str(image), "--id", "page", "--title", "Page",
+            "--src", "it", "--dst", "fi", "--out", str(out), "--transport", "stub",
+        ]
+    )
+
+    assert code == 0
+    assert out.exists()
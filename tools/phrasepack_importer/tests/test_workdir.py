@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from phrasepack_importer.batch import ImportJob, import_job
+from phrasepack_importer.gemini_client import GeminiSession
+from phrasepack_importer.pipeline import run_pipeline
+from phrasepack_importer.retry import NO_RETRY
+from phrasepack_importer.transport import StubClient, StubOptions
+from phrasepack_importer.workdir import ITEMS, PACK, RAW_PAIRS, WorkDir
+
+
+def test_checkpoints_are_keyed_by_inputs_and_read_only_on_resume(tmp_path):
+    WorkDir(tmp_path).put("abc", RAW_PAIRS, "model", "prompt", text="{}")
+
+    assert WorkDir(tmp_path).get("abc", RAW_PAIRS, "model", "prompt") is None
+    resumed = WorkDir(tmp_path, resume=True)
+    assert resumed.get("abc", RAW_PAIRS, "model", "prompt") == "{}"
+    assert resumed.get("abc", RAW_PAIRS, "model", "other prompt") is None
+    assert resumed.reused[RAW_PAIRS] == 1
+
+
+def test_file_checkpoint_is_dropped_when_the_file_changes(tmp_path):
+    output = tmp_path / "pack.json"
+    output.write_text("pack")
+    WorkDir(tmp_path).put_file("abc", PACK, "inputs", path=output, items=3)
+    resumed = WorkDir(tmp_path, resume=True)
+
+    assert resumed.get_file("abc", PACK, "inputs", path=output)["items"] == 3
+    output.write_text("edited")
+    assert resumed.get_file("abc", PACK, "inputs", path=output) is None
+
+
+class FlakyStub(StubClient):
+    """Stub whose step-2 (cleanup) calls fail while `fail_cleanup` is set."""
+
+    def __init__(self):
+        super().__init__(StubOptions(pairs_per_image=3))
+        self.fail_cleanup = False
+
+    def _generate_content(self, *, model, contents, config):
+        if self.fail_cleanup and "pairs" not in config.response_schema["properties"]:
+            raise KeyboardInterrupt  # the process is killed between the steps
+        return super()._generate_content(model=model, contents=contents, config=config)
+
+
+def _job(tmp_path):
+    image = tmp_path / "page.jpg"
+    image.write_bytes(b"\xff\xd8\xff page")
+    return ImportJob(
+        image_path=image,
+        pack_id="page",
+        title="Page",
+        src_lang="it",
+        dst_lang="fi",
+        output_path=tmp_path / "out" / "page.json",
+    )
+
+
+def test_resume_skips_completed_stages(tmp_path):
+    job = _job(tmp_path)
+    client = FlakyStub()
+    session = GeminiSession(client=client, retry_policy=NO_RETRY)
+
+    def run(*, resume):
+        workdir = WorkDir(tmp_path / "work", resume=resume)
+        calls = client.calls
+        stats = import_job(job, model="gemini-test", session=session, workdir=workdir)
+        return stats, client.calls - calls
+
+    client.fail_cleanup = True
+    with pytest.raises(KeyboardInterrupt):
+        run(resume=False)
+    assert not job.output_path.exists()
+
+    client.fail_cleanup = False
+    stats, calls = run(resume=True)
+    assert (stats.resumed, calls, stats.item_count) == ((RAW_PAIRS,), 1, 3)
+
+    stats, calls = run(resume=True)
+    assert (stats.resumed, calls) == ((RAW_PAIRS, ITEMS, PACK), 0)
+
+    job.output_path.write_text("{}")
+    stats, calls = run(resume=True)
+    assert (stats.resumed, calls) == ((RAW_PAIRS, ITEMS), 0)
+    assert len(json.loads(job.output_path.read_text())["items"]) == 3
+
+    stats, calls = run(resume=False)
+    assert (stats.resumed, calls) == ((), 2)
+
+
+def test_pipeline_resume_makes_no_calls_for_finished_pages(tmp_path):
+    jobs = []
+    for index in range(3):
+        image = tmp_path / f"page-{index}.jpg"
+        image.write_bytes(f"page {index}".encode())
+        jobs.append(
+            ImportJob(
+                image_path=image,
+                pack_id=f"page-{index}",
+                title=f"Page {index}",
+                src_lang="it",
+                dst_lang="fi",
+                output_path=tmp_path / "out" / f"page-{index}.json",
+            )
+        )
+    client = StubClient(StubOptions(pairs_per_image=2))
+
+    def run(*, resume):
+        results, _ = run_pipeline(
+            jobs,
+            model="gemini-test",
+            session=GeminiSession(client=client),
+            workdir=WorkDir(tmp_path / "work", resume=resume),
+        )
+        return results
+
+    assert all(result.ok for result in run(resume=False))
+    calls = client.calls
+    results = run(resume=True)
+
+    assert client.calls == calls
+    assert [result.stats.resumed for result in results] == [(RAW_PAIRS, ITEMS, PACK)] * 3